@@ -0,0 +1,101 @@
+# Load generator for the AsyncRedBlackTree server: starts the server in its
+# own process (TCP, or a Unix socket with --unix), opens many concurrent
+# client connections that each send one request at a time, and records the
+# round-trip latency of every request. Each --windows value is a separate
+# server run, showing what the batching window costs or saves. Run from the
+# repository root:
+#   python -m benchmarks.async_service --connections 64 --windows 0 0.0005 0.002
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from src.red_black_tree import RedBlackTree
+from src.async_red_black_tree import AsyncRedBlackTree
+from benchmarks.latency_histogram import LatencyHistogram
+from benchmarks.mixed_workload import generate_workload, parse_mix
+
+def run_server(address, preload, window, max_batch, ready):
+    async def main():
+        tree = AsyncRedBlackTree(RedBlackTree.from_iterable(preload), batch_window=window, max_batch=max_batch)
+        if "path" in address:
+            server = await tree.serve(path=address["path"])
+            ready.send(address)
+        else:
+            server = await tree.serve(port=0)
+            ready.send({"host": "127.0.0.1", "port": server.sockets[0].getsockname()[1]})
+        async with server:
+            await server.serve_forever()
+    asyncio.run(main())
+
+async def client(address, requests, histogram):
+    if "path" in address:
+        reader, writer = await asyncio.open_unix_connection(address["path"])
+    else:
+        reader, writer = await asyncio.open_connection(address["host"], address["port"])
+    clock = time.perf_counter_ns
+    for op, key in requests:
+        start = clock()
+        writer.write(f"{op} {key}\n".encode())
+        reply = await reader.readline()
+        histogram.record(clock() - start)
+        if reply.startswith(b"error"):
+            raise RuntimeError(reply.decode().strip())
+    writer.close()
+
+async def generate_load(address, workload, connections):
+    histograms = [LatencyHistogram() for _ in range(connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*[client(address, workload[i::connections], histograms[i])
+                           for i in range(connections)])
+    elapsed = time.perf_counter() - start
+    overall = LatencyHistogram()
+    for histogram in histograms:
+        overall.merge(histogram)
+    return overall, elapsed
+
+def async_service_test(args):
+    rng = random.Random(args.seed)
+    preload = rng.sample(range(args.key_space), min(args.preload, args.key_space))
+    workload = generate_workload(args.requests, parse_mix(args.mix), args.key_space, args.skew, rng)
+    print(f"{len(workload):,} requests over {args.connections} connections "
+          f"({'Unix socket' if args.unix else 'TCP'}), {len(preload):,} preloaded keys")
+    print(f"{'window ms':>10} {'requests/s':>12} {'p50 us':>9} {'p99 us':>9} {'p99.9 us':>9} {'max us':>9}")
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for window in args.windows:
+            address = {"path": os.path.join(directory, "tree.sock")} if args.unix else {}
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            server = multiprocessing.Process(target=run_server, daemon=True,
+                                             args=(address, preload, window, args.max_batch, sender))
+            server.start()
+            try:
+                histogram, elapsed = asyncio.run(generate_load(receiver.recv(), workload, args.connections))
+            finally:
+                server.terminate()
+                server.join()
+            summary = histogram.summary()
+            results.append({"window": window, "requests_per_s": len(workload) / elapsed, **summary})
+            print(f"{window * 1000:>10.2f} {len(workload) / elapsed:>12,.0f} {summary['p50'] / 1000:>9.1f} "
+                  f"{summary['p99'] / 1000:>9.1f} {summary['p99.9'] / 1000:>9.1f} {summary['max'] / 1000:>9.1f}")
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure request latency of the asyncio tree server.")
+    parser.add_argument("--connections", type=int, default=32, help="concurrent client connections")
+    parser.add_argument("--requests", type=int, default=50_000, help="total requests over all connections")
+    parser.add_argument("--mix", default="search=80,insert=15,delete=5", help="operation weights")
+    parser.add_argument("--key-space", type=int, default=200_000, help="keys are drawn from range(key_space)")
+    parser.add_argument("--preload", type=int, default=100_000, help="keys in the tree before the run")
+    parser.add_argument("--skew", choices=["uniform", "zipfian"], default="uniform")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0.0, 0.0005, 0.002],
+                        help="batching windows to compare, in seconds")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--unix", action="store_true", help="use a Unix socket instead of TCP")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    async_service_test(parse_args())
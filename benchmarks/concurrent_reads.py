@@ -0,0 +1,60 @@
+# Read throughput of ConcurrentRedBlackTree as reader threads are added, with
+# an optional writer running alongside. Run from the repository root, once on
+# a regular build and once on a free-threaded (3.13t) build to compare:
+#   python -m benchmarks.concurrent_reads [size] [seconds]
+import random
+import sys
+import threading
+import time
+from src.red_black_tree import RedBlackTree
+from src.concurrent_red_black_tree import ConcurrentRedBlackTree
+
+def run_readers(tree, keys, threads, seconds, with_writer):
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def reader(slot):
+        rng = random.Random(slot)
+        done = 0
+        while not stop.is_set():
+            for _ in range(100):
+                tree.search(keys[rng.randrange(len(keys))])
+            done += 100
+        counts[slot] = done
+
+    def writer():
+        rng = random.Random(-1)
+        while not stop.is_set():
+            key = keys[rng.randrange(len(keys))]
+            tree.delete(key)
+            tree.insert(key)
+
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    if with_writer:
+        workers.append(threading.Thread(target=writer))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / seconds
+
+def concurrent_reads_test(size, seconds):
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, {size:,} keys")
+    keys = random.sample(range(size * 10), size)
+    tree = ConcurrentRedBlackTree(RedBlackTree.from_iterable(keys))
+
+    print(f"{'Readers':>8} {'reads/s':>12} {'scaling':>8} {'reads/s (+writer)':>18}")
+    baseline = None
+    for threads in [1, 2, 4, 8]:
+        reads = run_readers(tree, keys, threads, seconds, with_writer=False)
+        mixed = run_readers(tree, keys, threads, seconds, with_writer=True)
+        baseline = baseline or reads
+        print(f"{threads:>8} {reads:>12,.0f} {reads / baseline:>7.2f}x {mixed:>18,.0f}")
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    concurrent_reads_test(size, seconds)
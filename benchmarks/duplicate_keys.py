@@ -0,0 +1,79 @@
+# Memory and per-operation latency of RedBlackTree's "multiset" policy (one
+# node per copy) against "counted" (one node per distinct key with a count),
+# on streams with more and more repeats: unique keys, zipfian keys,
+# timestamps at one-second resolution and a handful of status codes. Run
+# from the repository root:
+#   python -m benchmarks.duplicate_keys [size]
+import gc
+import itertools
+import random
+import sys
+import time
+import tracemalloc
+from src.red_black_tree import RedBlackTree
+
+def distributions(size, rng):
+    ranks = list(range(size))
+    rng.shuffle(ranks)
+    weights = list(itertools.accumulate(1 / rank ** 1.1 for rank in range(1, size + 1)))
+    return {
+        "unique": rng.sample(range(size * 10), size),
+        "zipfian": [ranks[i] for i in rng.choices(range(size), cum_weights=weights, k=size)],
+        # An event stream: about 50 events per second, slightly out of order.
+        "timestamps": [1_700_000_000 + (i + rng.randrange(-100, 100)) // 50 for i in range(size)],
+        "status codes": rng.choices([200, 201, 204, 301, 304, 400, 401, 403, 404, 500, 503],
+                                    weights=[70, 3, 2, 1, 8, 3, 2, 1, 6, 2, 2], k=size),
+    }
+
+def measure(duplicates, keys, probes):
+    # Built once under tracemalloc for the memory, which slows it down, and
+    # once more for the timings.
+    gc.collect()
+    tracemalloc.start()
+    tree = RedBlackTree(duplicates)
+    for key in keys:
+        tree.insert(key)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    gc.collect()
+    tree = RedBlackTree(duplicates)
+    start = time.perf_counter()
+    for key in keys:
+        tree.insert(key)
+    insert = time.perf_counter() - start
+    height = tree.validate()
+
+    start = time.perf_counter()
+    for key in probes:
+        tree.search(key)
+    search = time.perf_counter() - start
+    # count() walks every copy in a multiset, so it gets fewer probes.
+    count_probes = probes[:200]
+    start = time.perf_counter()
+    for key in count_probes:
+        tree.count(key)
+    count = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in keys:
+        tree.delete(key)
+    delete = time.perf_counter() - start
+    per_op = lambda seconds, n: seconds / n * 1e6
+    return (memory / len(keys), height, per_op(insert, len(keys)), per_op(search, len(probes)),
+            per_op(count, len(count_probes)), per_op(delete, len(keys)))
+
+def duplicate_keys_test(size):
+    rng = random.Random(0)
+    print(f"{size:,} keys; bytes per key, black height, µs per operation")
+    print(f"{'keys':<14} {'distinct':>9} {'policy':<9} {'bytes/key':>10} {'bh':>4} "
+          f"{'insert':>8} {'search':>8} {'count':>8} {'delete':>8}")
+    for name, keys in distributions(size, rng).items():
+        probes = rng.choices(keys, k=min(size, 20_000))
+        for duplicates in ["multiset", "counted"]:
+            memory, height, insert, search, count, delete = measure(duplicates, keys, probes)
+            print(f"{name:<14} {len(set(keys)):>9,} {duplicates:<9} {memory:>10.1f} {height:>4} "
+                  f"{insert:>8.2f} {search:>8.2f} {count:>8.2f} {delete:>8.2f}")
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    duplicate_keys_test(size)
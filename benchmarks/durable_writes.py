@@ -0,0 +1,75 @@
+# Durable write throughput of DurableRedBlackTree: one fsync per write, one
+# per N writes for several batch sizes, and one per write shared by
+# concurrent writer threads (group commit), against a plain in-memory tree.
+# Also times a checkpoint and a recovery. Run from the repository root (the
+# log goes to a temporary directory, so point TMPDIR at the disk to test):
+#   python -m benchmarks.durable_writes [writes]
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from src.red_black_tree import RedBlackTree
+from src.durable_red_black_tree import DurableRedBlackTree
+
+def timed_writes(tree, keys, threads=1):
+    def writer(part):
+        for key in part:
+            tree.insert(key)
+    workers = [threading.Thread(target=writer, args=(keys[i::threads],)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return len(keys) / (time.perf_counter() - start)
+
+def durable_writes_test(writes):
+    keys = random.Random(0).sample(range(writes * 10), writes)
+    directory = tempfile.mkdtemp(prefix="durable-writes-")
+    print(f"{writes:,} inserts, log in {directory}")
+    print(f"{'mode':<32} {'writes/s':>12} {'fsyncs':>8}")
+    try:
+        baseline = timed_writes(RedBlackTree(), keys)
+        print(f"{'in memory (no log)':<32} {baseline:>12,.0f} {'-':>8}")
+        runs = [(f"fsync every {n} write{'s' if n > 1 else ''}", n, 1) for n in [1, 8, 64, 512, 4096]]
+        runs += [(f"fsync every write, {t} threads", 1, t) for t in [4, 16]]
+        for label, fsync_every, threads in runs:
+            path = os.path.join(directory, label.replace(" ", "_").replace(",", ""))
+            calls = [0]
+            real_fsync = os.fsync
+            def counting_fsync(fd):
+                calls[0] += 1
+                real_fsync(fd)
+            os.fsync = counting_fsync
+            try:
+                with DurableRedBlackTree(path, fsync_every=fsync_every, checkpoint_every=None) as tree:
+                    rate = timed_writes(tree, keys, threads)
+            finally:
+                os.fsync = real_fsync
+            print(f"{label:<32} {rate:>12,.0f} {calls[0]:>8,}")
+
+        with DurableRedBlackTree(path, checkpoint_every=None) as tree:
+            start = time.perf_counter()
+            tree.checkpoint()
+            checkpoint = time.perf_counter() - start
+        start = time.perf_counter()
+        with DurableRedBlackTree(path) as tree:
+            restore = time.perf_counter() - start
+        print(f"\ncheckpoint of {writes:,} keys: {checkpoint * 1000:.0f} ms, "
+              f"recovery from it: {restore * 1000:.0f} ms")
+        shutil.rmtree(path)
+        with DurableRedBlackTree(path, fsync_every=4096, checkpoint_every=None) as tree:
+            tree.insert_many(keys)
+        start = time.perf_counter()
+        with DurableRedBlackTree(path) as tree:
+            replay = time.perf_counter() - start
+        print(f"recovery by replaying {writes:,} log records: {replay * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    durable_writes_test(writes)
@@ -0,0 +1,32 @@
+# Export cost for large trees: a depth-limited DOT view of the top levels,
+# which only visits the nodes shown, against a full DOT/JSON export. Run from
+# the repository root:
+#   python -m benchmarks.export_large [size] [max_depth]
+import io
+import sys
+import time
+from src.red_black_tree import RedBlackTree
+
+def timed(label, export):
+    out = io.StringIO()
+    start = time.perf_counter()
+    export(out)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:>10.1f} ms {len(out.getvalue()) / 1024:>10,.0f} KB")
+    return elapsed
+
+def export_large_test(size, max_depth):
+    print(f"{size:,} keys")
+    tree = RedBlackTree.from_sorted(range(size))
+    print(f"{'Export':<28} {'time':>13} {'output':>13}")
+    top = timed(f"DOT, top {max_depth + 1} levels", lambda out: tree.export_dot(out, max_depth=max_depth))
+    timed(f"JSON, top {max_depth + 1} levels", lambda out: tree.export_json(out, max_depth=max_depth))
+    if size <= 1_000_000:
+        timed("DOT, whole tree", lambda out: tree.export_dot(out))
+        timed("JSON, whole tree", lambda out: tree.export_json(out))
+    return top
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    max_depth = int(sys.argv[2]) if len(sys.argv) > 2 else 9
+    export_large_test(size, max_depth)
@@ -0,0 +1,46 @@
+# Per-operation search/delete cost of RedBlackTree against the original
+# implementation (recursive search, string colours, print on missing keys).
+# Run from the repository root:
+#   python -m benchmarks.hot_path [size]
+import contextlib
+import os
+import random
+import sys
+import time
+from src.red_black_tree import RedBlackTree
+from benchmarks.legacy_red_black_tree import LegacyRedBlackTree
+
+def time_per_op(operation, keys):
+    start = time.perf_counter_ns()
+    for key in keys:
+        operation(key)
+    return (time.perf_counter_ns() - start) / len(keys)
+
+def hot_path_test(size, sample=100_000):
+    keys = random.sample(range(0, size * 4, 2), size)  # even keys only
+    present = random.sample(keys, min(sample, size))
+    missing = [key + 1 for key in present]
+
+    results = {}
+    for name, factory in [("legacy", LegacyRedBlackTree), ("current", RedBlackTree)]:
+        tree = factory()
+        for key in keys:
+            tree.insert(key)
+        timings = {
+            "search (hit)": time_per_op(tree.search, present),
+            "search (miss)": time_per_op(tree.search, missing),
+        }
+        # The legacy delete prints for every missing key; send that to /dev/null.
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            timings["delete (miss)"] = time_per_op(tree.delete, missing)
+        timings["delete (hit)"] = time_per_op(tree.delete, present)
+        results[name] = timings
+
+    print(f"{size:,} keys, {len(present):,} operations each")
+    print(f"{'Operation':<15} {'Legacy ns/op':>13} {'Current ns/op':>14} {'Speedup':>8}")
+    for operation, legacy in results["legacy"].items():
+        current = results["current"][operation]
+        print(f"{operation:<15} {legacy:>13.0f} {current:>14.0f} {legacy / current:>7.2f}x")
+
+if __name__ == "__main__":
+    hot_path_test(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,70 @@
+# Import cost of the core tree modules, measured in fresh interpreters with
+# `python -X importtime`. Exits with status 1 if any of them takes longer than
+# the budget or pulls in anything outside the standard library, so it can be
+# used as a CI guard. Run from the repository root:
+#   python -m benchmarks.import_time [budget_ms] [runs]
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "red_black_tree",
+    "order_statistic_tree",
+    "avl",
+    "bst",
+    "compact_red_black_tree",
+    "persistent_red_black_tree",
+    "concurrent_red_black_tree",
+    "mapped_red_black_tree",
+]
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Prints the top-level names of every non-stdlib module loaded by the import.
+PROBE = """
+import sys
+import {module}
+print(",".join(sorted({{name.partition(".")[0] for name in sys.modules}}
+                      - set(sys.stdlib_module_names) - {{"{module}"}} - set(sys.builtin_module_names))))
+"""
+
+def run_import(module):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # measure with warm .pyc caches, as deployed
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+                            capture_output=True, text=True, env=env, cwd=SRC, check=True)
+    microseconds = None
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            microseconds = int(fields[1])
+    third_party = [name for name in result.stdout.strip().split(",") if name and not name.startswith("_")]
+    # Sibling modules in src/ are fine; anything else is a third-party dependency.
+    third_party = [name for name in third_party if name not in MODULES]
+    return microseconds, third_party
+
+def import_time_test(budget_ms, runs):
+    print(f"{'module':<28} {'median ms':>10} {'max ms':>8}  third-party imports")
+    failures = []
+    for module in MODULES:
+        run_import(module)  # warm the bytecode cache
+        samples = []
+        third_party = []
+        for _ in range(runs):
+            microseconds, third_party = run_import(module)
+            samples.append(microseconds / 1000)
+        median = statistics.median(samples)
+        print(f"{module:<28} {median:>10.2f} {max(samples):>8.2f}  {', '.join(third_party) or '-'}")
+        if median > budget_ms:
+            failures.append(f"{module} took {median:.1f} ms (budget {budget_ms} ms)")
+        if third_party:
+            failures.append(f"{module} imported {', '.join(third_party)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return not failures
+
+if __name__ == "__main__":
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 50.0
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sys.exit(0 if import_time_test(budget_ms, runs) else 1)
@@ -0,0 +1,72 @@
+# HDR-style latency histogram: values (nanoseconds) are counted in
+# log-linear buckets, so recording is O(1), memory stays a few KB however many
+# samples are taken, and every percentile is within 2^-(precision_bits - 1)
+# of the true value (1.6% with the default 7 bits). Values below
+# 2^precision_bits are counted exactly.
+class LatencyHistogram:
+    def __init__(self, precision_bits=7):
+        self.precision_bits = precision_bits
+        self._sub_count = 1 << precision_bits
+        self._half = self._sub_count >> 1
+        self._counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return shift * self._half + (value >> shift)
+
+    def _lowest(self, index):
+        if index < self._sub_count:
+            return index
+        shift = index // self._half - 1
+        return (index - shift * self._half) << shift
+
+    def record(self, value):
+        if value < 0:
+            value = 0
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.precision_bits != self.precision_bits:
+            raise ValueError("cannot merge histograms with different precision")
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    # Value at the given percentile (0-100): the highest value that falls in
+    # the same bucket as the sample of that rank, capped at the exact maximum.
+    def percentile(self, percent):
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                return min(self._lowest(index + 1) - 1, self.max)
+        return self.max
+
+    def summary(self, percents=(50, 90, 99, 99.9)):
+        result = {"count": self.count, "mean": self.mean(), "min": self.min or 0, "max": self.max or 0}
+        for percent in percents:
+            result[f"p{percent:g}"] = self.percentile(percent)
+        return result
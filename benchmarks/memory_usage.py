@@ -0,0 +1,33 @@
+# Bytes per key for the Node-object RedBlackTree versus the array-backed
+# CompactRedBlackTree. Run from the repository root:
+#   python -m benchmarks.memory_usage [size ...]
+import gc
+import random
+import sys
+import tracemalloc
+from src.red_black_tree import RedBlackTree
+from src.compact_red_black_tree import CompactRedBlackTree
+
+def measure_bytes(factory, keys):
+    gc.collect()
+    tracemalloc.start()
+    tree = factory()
+    for key in keys:
+        tree.insert(key)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, tree
+
+def memory_test(sizes):
+    print(f"{'Input Size':>12} {'Node bytes/key':>16} {'Compact bytes/key':>18} {'Ratio':>7}")
+    for size in sizes:
+        # Keys are created before tracing starts so only tree storage is counted.
+        keys = random.sample(range(size * 10), size)
+        node_bytes, _ = measure_bytes(RedBlackTree, keys)
+        compact_bytes, _ = measure_bytes(CompactRedBlackTree, keys)
+        print(f"{size:>12,} {node_bytes / size:>16.1f} {compact_bytes / size:>18.1f} "
+              f"{node_bytes / compact_bytes:>6.1f}x")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    memory_test(sizes)
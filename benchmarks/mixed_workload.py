@@ -0,0 +1,165 @@
+# Interleaved workload benchmark: replays a stream of searches, inserts and
+# deletes against each tree and records the latency of every single operation
+# in an HDR-style histogram, reporting throughput and tail latency (p99/p99.9)
+# rather than one total time. Run from the repository root:
+#   python -m benchmarks.mixed_workload --mix search=80,insert=15,delete=5
+#   python -m benchmarks.mixed_workload --record trace.txt   # save the stream
+#   python -m benchmarks.mixed_workload --trace trace.txt    # replay a saved/recorded stream
+#
+# Trace files have one operation per line, "<op> <integer key>", e.g.
+# "search 42"; lines starting with "#" are ignored.
+import argparse
+import gc
+import itertools
+import json
+import random
+import time
+from src.red_black_tree import RedBlackTree
+from src.avl import AVLTree
+from src.bst import BinarySearchTree
+from src.bplus_tree import BPlusTree
+from benchmarks.latency_histogram import LatencyHistogram
+
+STRUCTURES = {"rbt": RedBlackTree, "avl": AVLTree, "bst": BinarySearchTree, "bplus": BPlusTree}
+OPERATIONS = ["search", "insert", "delete"]
+
+# "search=80,insert=15,delete=5" -> {"search": 80.0, "insert": 15.0, "delete": 5.0}
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        op, _, weight = part.partition("=")
+        op = op.strip()
+        if op not in OPERATIONS:
+            raise ValueError(f"unknown operation {op!r} in mix (expected one of {', '.join(OPERATIONS)})")
+        mix[op] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError("mix weights must add up to more than 0")
+    return mix
+
+# A random operation stream. Keys are drawn from range(key_space), uniformly or
+# with a zipfian skew (s = 1.1 over shuffled ranks, so hot keys are spread over
+# the key range).
+def generate_workload(operations, mix, key_space, skew, rng):
+    ops = rng.choices(list(mix), weights=list(mix.values()), k=operations)
+    if skew == "zipfian":
+        weights = list(itertools.accumulate(1 / rank ** 1.1 for rank in range(1, key_space + 1)))
+        ranks = list(range(key_space))
+        rng.shuffle(ranks)
+        keys = [ranks[i] for i in rng.choices(range(key_space), cum_weights=weights, k=operations)]
+    else:
+        keys = [rng.randrange(key_space) for _ in range(operations)]
+    return list(zip(ops, keys))
+
+def load_trace(path):
+    workload = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            op, key = line.split()
+            if op not in OPERATIONS:
+                raise ValueError(f"{path}:{line_number}: unknown operation {op!r}")
+            workload.append((op, int(key)))
+    return workload
+
+def save_trace(workload, path):
+    with open(path, "w") as f:
+        for op, key in workload:
+            f.write(f"{op} {key}\n")
+
+# Cost of the two timer reads around an operation, reported so it can be kept
+# in mind when reading the fastest percentiles.
+def timer_overhead(samples=100_000):
+    clock = time.perf_counter_ns
+    histogram = LatencyHistogram()
+    for _ in range(samples):
+        start = clock()
+        histogram.record(clock() - start)
+    return histogram.percentile(50)
+
+# Replay the workload on a tree that already holds `preload`. Returns the
+# per-operation histograms, the combined one and the wall-clock time.
+def replay(factory, preload, workload, disable_gc):
+    tree = factory()
+    for key in preload:
+        tree.insert(key)
+    methods = {op: getattr(tree, op) for op in OPERATIONS}
+    histograms = {op: LatencyHistogram() for op in OPERATIONS}
+    record = {op: histograms[op].record for op in OPERATIONS}
+    clock = time.perf_counter_ns
+
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    if disable_gc:
+        gc.disable()
+    try:
+        wall_start = clock()
+        for op, key in workload:
+            start = clock()
+            methods[op](key)
+            record[op](clock() - start)
+        wall = clock() - wall_start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    overall = LatencyHistogram()
+    for histogram in histograms.values():
+        overall.merge(histogram)
+    return histograms, overall, wall
+
+def mixed_workload_test(workload, preload, structures, disable_gc):
+    print(f"{len(workload):,} operations on {len(preload):,} preloaded keys, "
+          f"timer overhead ~{timer_overhead()} ns per sample")
+    header = (f"{'structure':<10} {'op':<7} {'count':>9} {'ops/s':>11} "
+              f"{'p50 us':>8} {'p90 us':>8} {'p99 us':>8} {'p99.9 us':>9} {'max us':>9}")
+    print(header)
+    print("-" * len(header))
+    results = []
+    for structure in structures:
+        histograms, overall, wall = replay(STRUCTURES[structure], preload, workload, disable_gc)
+        rows = [("all", overall)] + [(op, histograms[op]) for op in OPERATIONS if histograms[op].count]
+        for op, histogram in rows:
+            summary = histogram.summary()
+            throughput = len(workload) / (wall / 1e9) if op == "all" else None
+            results.append({"structure": structure, "op": op, "wall_ns": wall,
+                            "ops_per_s": throughput, **summary})
+            print(f"{structure:<10} {op:<7} {summary['count']:>9,} "
+                  f"{(f'{throughput:,.0f}' if throughput else ''):>11} "
+                  f"{summary['p50'] / 1000:>8.2f} {summary['p90'] / 1000:>8.2f} "
+                  f"{summary['p99'] / 1000:>8.2f} {summary['p99.9'] / 1000:>9.2f} "
+                  f"{summary['max'] / 1000:>9.2f}")
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay an interleaved operation stream and report tail latency.")
+    parser.add_argument("--mix", default="search=80,insert=15,delete=5", help="operation weights")
+    parser.add_argument("--operations", type=int, default=200_000, help="length of the generated stream")
+    parser.add_argument("--key-space", type=int, default=200_000, help="keys are drawn from range(key_space)")
+    parser.add_argument("--preload", type=int, default=100_000, help="keys inserted before replaying")
+    parser.add_argument("--skew", choices=["uniform", "zipfian"], default="uniform")
+    parser.add_argument("--structures", nargs="+", default=list(STRUCTURES), choices=list(STRUCTURES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", metavar="PATH", help="replay this trace instead of generating a stream")
+    parser.add_argument("--record", metavar="PATH", help="save the replayed stream as a trace")
+    parser.add_argument("--disable-gc", action="store_true",
+                        help="pause the garbage collector (its pauses are part of real tail latency, so on by default)")
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    rng = random.Random(args.seed)
+    # Preload in random order so the unbalanced BST starts out reasonably shaped.
+    preload = rng.sample(range(args.key_space), min(args.preload, args.key_space))
+    if args.trace:
+        workload = load_trace(args.trace)
+    else:
+        workload = generate_workload(args.operations, parse_mix(args.mix), args.key_space, args.skew, rng)
+    if args.record:
+        save_trace(workload, args.record)
+    results = mixed_workload_test(workload, preload, args.structures, args.disable_gc)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
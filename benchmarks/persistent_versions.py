@@ -0,0 +1,55 @@
+# Memory cost of keeping old versions of a PersistentRedBlackTree alive, and
+# proof that they are reclaimed once released. Run from the repository root:
+#   python -m benchmarks.persistent_versions [size] [versions]
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from src.persistent_red_black_tree import PersistentRedBlackTree
+
+def build_tree(keys):
+    tree = PersistentRedBlackTree()
+    for key in keys:
+        tree.insert(key)
+    return tree
+
+def persistent_versions_test(size, versions):
+    keys = random.sample(range(size * 10), size)
+    updates = [random.randrange(size * 10) for _ in range(versions)]
+
+    # Timing run first; tracemalloc would distort it.
+    tree = build_tree(keys)
+    start = time.perf_counter_ns()
+    for key in updates:
+        tree.snapshot()
+        tree.insert(key)
+    elapsed = time.perf_counter_ns() - start
+
+    # Trace from the build on: updates replace path nodes allocated while
+    # building, and those frees only count if the allocations were traced.
+    gc.collect()
+    tracemalloc.start()
+    tree = build_tree(keys)
+    base, _ = tracemalloc.get_traced_memory()
+    snapshots = []
+    for key in updates:
+        snapshots.append(tree.snapshot())
+        tree.insert(key)
+    retained, _ = tracemalloc.get_traced_memory()
+
+    del snapshots
+    gc.collect()
+    released, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{size:,} keys, {versions:,} versions kept alive")
+    print(f"  insert + snapshot:       {elapsed / versions:,.0f} ns/op")
+    print(f"  memory per old version:  {(retained - released) / versions:,.0f} bytes")
+    # What remains is the live tree itself, which grew by one key per update.
+    print(f"  after dropping versions: {(released - base) / versions:,.0f} bytes/update still held")
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    versions = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    persistent_versions_test(size, versions)
@@ -0,0 +1,51 @@
+# Merging two indexes: join-based union_update() against inserting every key of
+# the smaller tree one at a time and against insert_many(), plus split and
+# the other set operations. Run from the repository root:
+#   python -m benchmarks.set_operations [size]
+import random
+import sys
+import time
+from src.red_black_tree import RedBlackTree
+
+def timed(label, operation):
+    start = time.perf_counter()
+    result = operation()
+    print(f"{label:<34} {time.perf_counter() - start:>10.3f} s")
+    return result
+
+def set_operations_test(size):
+    rng = random.Random(0)
+    big_keys = rng.sample(range(size * 10), size)
+    for small in [size // 1000, size // 100, size // 10, size]:
+        small_keys = rng.sample(range(size * 10), small)
+        print(f"\n{size:,} keys + {small:,} keys")
+        print(f"{'Operation':<34} {'time':>12}")
+
+        def fresh():
+            return RedBlackTree.from_iterable(big_keys), RedBlackTree.from_iterable(small_keys)
+
+        big, other = fresh()
+        def reinsert():
+            for key in other:
+                big.insert(key)
+            return big
+        timed("insert() every key", reinsert)
+
+        big, other = fresh()
+        timed("insert_many()", lambda: big.insert_many(list(other)))
+
+        big, other = fresh()
+        timed("union_update()", lambda: big.union_update(other))
+        assert len(big) == size + small
+
+        big, other = fresh()
+        timed("intersection_update()", lambda: big.intersection_update(other))
+        big, other = fresh()
+        timed("difference_update()", lambda: big.difference_update(other))
+
+    big = RedBlackTree.from_iterable(big_keys)
+    timed("\nsplit() at the median", lambda: big.split(size * 5))
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    set_operations_test(size)
@@ -0,0 +1,58 @@
+# Insert and search throughput of ShardedIndex from 1 to N worker processes,
+# against a single in-process RedBlackTree fed the same batches. Keys are
+# uniform over a known range, so the shards get equal-width boundaries up
+# front; the last line shows the same ingest starting with no boundaries and
+# relying on rebalance(). Run from the repository root on a multi-core box:
+#   python -m benchmarks.sharded_scaling [size] [batch] [max_workers]
+import os
+import random
+import sys
+import time
+from src.red_black_tree import RedBlackTree
+from src.sharded_index import ShardedIndex
+
+def throughput(operation, batches):
+    start = time.perf_counter()
+    for batch in batches:
+        operation(batch)
+    return sum(len(batch) for batch in batches) / (time.perf_counter() - start)
+
+def sharded_scaling_test(size, batch, max_workers):
+    key_space = size * 10
+    rng = random.Random(0)
+    keys = rng.sample(range(key_space), size)
+    probes = [rng.randrange(key_space) for _ in range(size)]
+    insert_batches = [keys[i:i + batch] for i in range(0, size, batch)]
+    search_batches = [probes[i:i + batch] for i in range(0, size, batch)]
+    print(f"{size:,} keys in batches of {batch:,}, {os.cpu_count()} CPUs")
+
+    tree = RedBlackTree()
+    tree_inserts = throughput(tree.insert_many, insert_batches)
+    tree_searches = throughput(tree.search_many, search_batches)
+    print(f"{'Workers':<10} {'inserts/s':>12} {'scaling':>8} {'searches/s':>12} {'scaling':>8}")
+    print(f"{'in-process':<10} {tree_inserts:>12,.0f} {'':>8} {tree_searches:>12,.0f}")
+
+    base_inserts = base_searches = None
+    workers = 1
+    while workers <= max_workers:
+        boundaries = [key_space * i // workers for i in range(1, workers)]
+        with ShardedIndex(workers, boundaries, rebalance_skew=None) as index:
+            inserts = throughput(index.insert_many, insert_batches)
+            searches = throughput(index.search_many, search_batches)
+            assert len(index) == size
+        base_inserts = base_inserts or inserts
+        base_searches = base_searches or searches
+        print(f"{workers:<10} {inserts:>12,.0f} {inserts / base_inserts:>7.2f}x "
+              f"{searches:>12,.0f} {searches / base_searches:>7.2f}x")
+        workers *= 2
+
+    with ShardedIndex(max_workers) as index:
+        inserts = throughput(index.insert_many, insert_batches)
+        print(f"\n{max_workers} workers, boundaries learned by rebalance: {inserts:,.0f} inserts/s, "
+              f"{index.rebalances} rebalances, shard sizes {index.shard_sizes()}")
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else max(os.cpu_count() or 1, 2)
+    sharded_scaling_test(size, batch, max_workers)
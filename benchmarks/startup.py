@@ -0,0 +1,44 @@
+# Time to get a searchable index at startup: re-inserting every key, the
+# O(n) from_sorted() bulk load, and mapping a dump() file with open_mmap().
+# Run from the repository root:
+#   python -m benchmarks.startup [size]
+import os
+import random
+import sys
+import tempfile
+import time
+from src.red_black_tree import RedBlackTree
+
+def timed(label, build, probes):
+    start = time.perf_counter()
+    tree = build()
+    ready = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in probes:
+        tree.search(key)
+    search = (time.perf_counter() - start) / len(probes)
+    print(f"{label:<22} {ready:>10.3f} s {search * 1e9:>12,.0f} ns")
+    return tree
+
+def startup_test(size):
+    keys = random.sample(range(size * 10), size)
+    probes = random.sample(keys, min(size, 100_000))
+    print(f"{size:,} keys")
+    print(f"{'Startup path':<22} {'ready in':>12} {'search/op':>15}")
+
+    def reinsert():
+        tree = RedBlackTree()
+        for key in keys:
+            tree.insert(key)
+        return tree
+
+    tree = timed("insert() every key", reinsert, probes)
+    timed("from_sorted()", lambda: RedBlackTree.from_sorted(tree.traverse()), probes)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.rbt")
+        tree.dump(path)
+        mapped = timed("open_mmap()", lambda: RedBlackTree.open_mmap(path), probes)
+        mapped.close()
+
+if __name__ == "__main__":
+    startup_test(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,174 +1,292 @@
-import time
+import argparse
+import csv
+import gc
+import itertools
+import json
+import math
 import random
-import matplotlib.pyplot as plt
+import statistics
+import sys
+import time
 from src.red_black_tree import RedBlackTree
+from src.order_statistic_tree import OrderStatisticTree
 from src.bst import BinarySearchTree
 from src.avl import AVLTree
+from src.bplus_tree import BPlusTree
+from src.instrumented_trees import InstrumentedRedBlackTree, InstrumentedAVLTree, InstrumentedBinarySearchTree
 
-# Function to measure insertion time for each tree type (non-recursive BST for better performance)
-def measure_insertion_time(tree, keys):
-    start_time = time.time()
-    for key in keys:
-        tree.insert(key)
-    end_time = time.time()
-    return end_time - start_time
+# Tree types under comparison, by the name used on the command line and in reports
+STRUCTURES = {
+    "rbt": RedBlackTree,
+    "ost": OrderStatisticTree,  # Red-Black Tree with subtree sizes
+    "avl": AVLTree,
+    "bst": BinarySearchTree,
+    "bplus": BPlusTree,  # wide list-backed nodes, for read-mostly data
+}
 
-# Function to measure deletion time for each tree type
-def measure_deletion_time(tree, keys):
-    # Insert all keys first
-    for key in keys:
-        tree.insert(key)
-    start_time = time.time()
-    for key in keys:
-        tree.delete(key)
-    end_time = time.time()
-    return end_time - start_time
+# Counting variants for --stats (there are none for the order-statistic tree
+# and the B+-tree)
+INSTRUMENTED = {
+    "rbt": InstrumentedRedBlackTree,
+    "avl": InstrumentedAVLTree,
+    "bst": InstrumentedBinarySearchTree,
+}
 
-# Function to measure search time for each tree type
-def measure_search_time(tree, keys):
-    # Insert all keys first
-    for key in keys:
-        tree.insert(key)
-    start_time = time.time()
-    for key in keys:
-        tree.search(key)
-    end_time = time.time()
-    return end_time - start_time
+PHASES = ["insert", "search", "delete", "traverse"]
+
+DISTRIBUTIONS = ["random", "sorted", "reverse", "zipfian", "duplicates"]
+
+# The unbalanced BST is O(n) per operation on ordered input; past this size it
+# would dominate the run, so those combinations are skipped.
+BST_ORDERED_LIMIT = 20_000
 
-# Function to measure traversal time for each tree type (In-Order Traversal)
-def measure_traversal_time(tree, keys):
-    # Insert all keys first
+# Key sequences for each distribution
+def make_keys(distribution, size, rng):
+    if distribution == "random":
+        return rng.sample(range(size * 10), size)
+    if distribution == "sorted":
+        return list(range(size))
+    if distribution == "reverse":
+        return list(range(size - 1, -1, -1))
+    if distribution == "zipfian":
+        # Popular keys repeat often (s = 1.1 over `size` distinct ranks), and
+        # ranks are shuffled so popularity is unrelated to key order.
+        weights = list(itertools.accumulate(1 / rank ** 1.1 for rank in range(1, size + 1)))
+        ranks = list(range(size))
+        rng.shuffle(ranks)
+        return [ranks[i] for i in rng.choices(range(size), cum_weights=weights, k=size)]
+    if distribution == "duplicates":
+        # About ten copies of every distinct key
+        return [rng.randrange(max(1, size // 10)) for _ in range(size)]
+    raise ValueError(f"unknown distribution {distribution!r}")
+
+def build(factory, keys):
+    tree = factory()
     for key in keys:
         tree.insert(key)
-    start_time = time.time()
-    tree.traverse()  # Assuming traverse_in_order() is defined in your tree classes
-    end_time = time.time()
-    return end_time - start_time
-
-# Main performance test
-def performance_test():
-    input_sizes = [100, 1000, 10000]  # Smaller sample sizes for faster testing
-    rbt_insertion_times = []
-    bst_insertion_times = []
-    avl_insertion_times = []
-
-    rbt_deletion_times = []
-    bst_deletion_times = []
-    avl_deletion_times = []
-
-    rbt_search_times = []
-    bst_search_times = []
-    avl_search_times = []
-
-    rbt_traversal_times = []
-    bst_traversal_times = []
-    avl_traversal_times = []
-
-    for size in input_sizes:
-        # Use random data for insertion, deletion, and search
-        keys = random.sample(range(size * 10), size)  # Randomized keys
-
-        # Create tree instances
-        rbt = RedBlackTree()
-        bst = BinarySearchTree()
-        avl = AVLTree()
-
-        # Measure times for insertion
-        rbt_insertion_time = measure_insertion_time(rbt, keys)
-        bst_insertion_time = measure_insertion_time(bst, keys)
-        avl_insertion_time = measure_insertion_time(avl, keys)
-
-        # Measure times for deletion
-        rbt_deletion_time = measure_deletion_time(rbt, keys)
-        bst_deletion_time = measure_deletion_time(bst, keys)
-        avl_deletion_time = measure_deletion_time(avl, keys)
-
-        # Measure times for search
-        rbt_search_time = measure_search_time(rbt, keys)
-        bst_search_time = measure_search_time(bst, keys)
-        avl_search_time = measure_search_time(avl, keys)
-
-        # Measure times for traversal
-        rbt_traversal_time = measure_traversal_time(rbt, keys)
-        bst_traversal_time = measure_traversal_time(bst, keys)
-        avl_traversal_time = measure_traversal_time(avl, keys)
-
-        # Store results for plotting
-        rbt_insertion_times.append(rbt_insertion_time)
-        bst_insertion_times.append(bst_insertion_time)
-        avl_insertion_times.append(avl_insertion_time)
-
-        rbt_deletion_times.append(rbt_deletion_time)
-        bst_deletion_times.append(bst_deletion_time)
-        avl_deletion_times.append(avl_deletion_time)
-
-        rbt_search_times.append(rbt_search_time)
-        bst_search_times.append(bst_search_time)
-        avl_search_times.append(avl_search_time)
-
-        rbt_traversal_times.append(rbt_traversal_time)
-        bst_traversal_times.append(bst_traversal_time)
-        avl_traversal_times.append(avl_traversal_time)
-
-        print(f"Input Size: {size}")
-        print(f"RBT Insertion Time: {rbt_insertion_time:.6f} seconds")
-        print(f"BST Insertion Time: {bst_insertion_time:.6f} seconds")
-        print(f"AVL Insertion Time: {avl_insertion_time:.6f} seconds")
-        print(f"RBT Deletion Time: {rbt_deletion_time:.6f} seconds")
-        print(f"BST Deletion Time: {bst_deletion_time:.6f} seconds")
-        print(f"AVL Deletion Time: {avl_deletion_time:.6f} seconds")
-        print(f"RBT Search Time: {rbt_search_time:.6f} seconds")
-        print(f"BST Search Time: {bst_search_time:.6f} seconds")
-        print(f"AVL Search Time: {avl_search_time:.6f} seconds")
-        print(f"RBT Traversal Time: {rbt_traversal_time:.6f} seconds")
-        print(f"BST Traversal Time: {bst_traversal_time:.6f} seconds")
-        print(f"AVL Traversal Time: {avl_traversal_time:.6f} seconds")
+    return tree
+
+# Time one phase on a fresh tree and return the elapsed nanoseconds. Only the
+# phase itself is timed; filling the tree beforehand is not.
+def run_phase(phase, factory, keys, probes):
+    tree = factory() if phase == "insert" else build(factory, keys)
+    gc.collect()
+    if phase == "insert":
+        start = time.perf_counter_ns()
+        for key in keys:
+            tree.insert(key)
+    elif phase == "search":
+        search = tree.search
+        start = time.perf_counter_ns()
+        for key in probes:
+            search(key)
+    elif phase == "delete":
+        delete = tree.delete
+        start = time.perf_counter_ns()
+        for key in probes:
+            delete(key)
+    else:
+        start = time.perf_counter_ns()
+        tree.traverse()
+    return time.perf_counter_ns() - start
+
+# Nearest-rank percentile
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+def measure(structure, phase, distribution, size, keys, probes, repeats, warmup, keep_gc):
+    factory = STRUCTURES[structure]
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    for run in range(warmup + repeats):
+        if not keep_gc:
+            gc.disable()
+        try:
+            elapsed = run_phase(phase, factory, keys, probes)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if run >= warmup:
+            samples.append(elapsed)
+    operations = 1 if phase == "traverse" else len(keys)
+    median = statistics.median(samples)
+    return {
+        "structure": structure,
+        "phase": phase,
+        "distribution": distribution,
+        "size": size,
+        "repeats": repeats,
+        "median_ms": median / 1e6,
+        "min_ms": min(samples) / 1e6,
+        "p90_ms": percentile(samples, 0.90) / 1e6,
+        "p99_ms": percentile(samples, 0.99) / 1e6,
+        "stdev_ms": (statistics.stdev(samples) if len(samples) > 1 else 0.0) / 1e6,
+        "ns_per_op": median / operations,
+    }
+
+def performance_test(sizes, distributions, structures, phases, repeats, warmup, seed, keep_gc):
+    results = []
+    header = (f"{'structure':<10} {'phase':<9} {'distribution':<12} {'size':>10} "
+              f"{'median ms':>11} {'p90 ms':>11} {'ns/op':>10}")
+    print(header)
+    print("-" * len(header))
+    for distribution, size in itertools.product(distributions, sizes):
+        rng = random.Random(seed)
+        keys = make_keys(distribution, size, rng)
+        # Searches and deletes hit every inserted key once, in random order.
+        probes = list(keys)
+        rng.shuffle(probes)
+        for structure, phase in itertools.product(structures, phases):
+            if structure == "bst" and distribution in ("sorted", "reverse") and size > BST_ORDERED_LIMIT:
+                print(f"{structure:<10} {phase:<9} {distribution:<12} {size:>10,} (skipped: degenerate BST)")
+                continue
+            row = measure(structure, phase, distribution, size, keys, probes, repeats, warmup, keep_gc)
+            results.append(row)
+            print(f"{structure:<10} {phase:<9} {distribution:<12} {size:>10,} "
+                  f"{row['median_ms']:>11.3f} {row['p90_ms']:>11.3f} {row['ns_per_op']:>10,.0f}")
+    return results
+
+# Relative overhead of one timing over a baseline, e.g. "+25%"
+def relative_to(elapsed, baseline):
+    if baseline == 0:
+        return "n/a"
+    return f"{elapsed / baseline - 1:+.0%}"
+
+# What the subtree sizes cost: the order-statistic tree's median insert and
+# delete times against the plain red-black tree's, for every size and
+# distribution where both were measured.
+def overhead_summary(results):
+    medians = {(r["structure"], r["phase"], r["distribution"], r["size"]): r["median_ms"] for r in results}
+    summary = []
+    for distribution, size in dict.fromkeys((r["distribution"], r["size"]) for r in results):
+        row = {"distribution": distribution, "size": size}
+        for phase in ["insert", "delete"]:
+            ost = medians.get(("ost", phase, distribution, size))
+            rbt = medians.get(("rbt", phase, distribution, size))
+            row[phase] = None if ost is None or rbt is None else relative_to(ost, rbt)
+        if row["insert"] is not None or row["delete"] is not None:
+            summary.append(row)
+    if summary:
+        header = f"{'distribution':<12} {'size':>10} {'insert':>8} {'delete':>8}"
         print()
+        print("Order-statistic tree (ost) overhead vs red-black tree (rbt), median time")
+        print(header)
+        print("-" * len(header))
+        for row in summary:
+            print(f"{row['distribution']:<12} {row['size']:>10,} {row['insert'] or '-':>8} {row['delete'] or '-':>8}")
+    return summary
 
-    # Plotting results for insertion time comparison
-    plt.figure(figsize=(12, 10))
+# Structural cost of the same workload: one untimed pass per structure on an
+# instrumented tree (insert every key, search and then delete every probe),
+# reported per operation so the tree types can be compared directly.
+def structural_stats(sizes, distributions, structures, seed):
+    results = []
+    header = (f"{'structure':<10} {'distribution':<12} {'size':>10} {'rotations':>10} "
+              f"{'recolours':>10} {'fixups':>8} {'compares':>9} {'ins depth':>10} {'del depth':>10}")
+    print()
+    print("Per-operation structural cost (inserts + deletes for rotations/recolours/fixups)")
+    print(header)
+    print("-" * len(header))
+    for distribution, size in itertools.product(distributions, sizes):
+        rng = random.Random(seed)
+        keys = make_keys(distribution, size, rng)
+        probes = list(keys)
+        rng.shuffle(probes)
+        for structure in structures:
+            if structure not in INSTRUMENTED:
+                continue
+            if structure == "bst" and distribution in ("sorted", "reverse") and size > BST_ORDERED_LIMIT:
+                continue
+            tree = INSTRUMENTED[structure]()
+            for key in keys:
+                tree.insert(key)
+            for key in probes:
+                tree.search(key)
+            for key in probes:
+                tree.delete(key)
+            stats = tree.stats()
+            updates = stats["operations"]["insert"] + stats["operations"]["delete"]
+            results.append({"structure": structure, "distribution": distribution, "size": size, **stats})
+            print(f"{structure:<10} {distribution:<12} {size:>10,} "
+                  f"{stats['rotations'] / updates:>10.3f} {stats['recolours'] / updates:>10.3f} "
+                  f"{stats['fixup_iterations'] / updates:>8.3f} {stats['comparisons_per_op']:>9.2f} "
+                  f"{stats['mean_depth']['insert']:>10.2f} {stats['mean_depth']['delete']:>10.2f}")
+    return results
+
+def write_json(results, path, stats=None, overhead=None):
+    report = {"python": sys.version, "results": results}
+    if overhead:
+        report["ost_overhead"] = overhead
+    if stats is not None:
+        report["structural_stats"] = stats
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
 
-    plt.subplot(2, 2, 1)
-    plt.plot(input_sizes, rbt_insertion_times, label='Red-Black Tree (Insertion)')
-    plt.plot(input_sizes, bst_insertion_times, label='Binary Search Tree (Insertion)')
-    plt.plot(input_sizes, avl_insertion_times, label='AVL Tree (Insertion)')
-    plt.xlabel('Input Size')
-    plt.ylabel('Insertion Time (seconds)')
-    plt.legend()
-    plt.title('Insertion Performance of Different Trees')
-
-    # Plotting results for deletion time comparison
-    plt.subplot(2, 2, 2)
-    plt.plot(input_sizes, rbt_deletion_times, label='Red-Black Tree (Deletion)')
-    plt.plot(input_sizes, bst_deletion_times, label='Binary Search Tree (Deletion)')
-    plt.plot(input_sizes, avl_deletion_times, label='AVL Tree (Deletion)')
-    plt.xlabel('Input Size')
-    plt.ylabel('Deletion Time (seconds)')
-    plt.legend()
-    plt.title('Deletion Performance of Different Trees')
-
-    # Plotting results for search time comparison
-    plt.subplot(2, 2, 3)
-    plt.plot(input_sizes, rbt_search_times, label='Red-Black Tree (Search)')
-    plt.plot(input_sizes, bst_search_times, label='Binary Search Tree (Search)')
-    plt.plot(input_sizes, avl_search_times, label='AVL Tree (Search)')
-    plt.xlabel('Input Size')
-    plt.ylabel('Search Time (seconds)')
-    plt.legend()
-    plt.title('Search Performance of Different Trees')
-
-    # Plotting results for traversal time comparison
-    plt.subplot(2, 2, 4)
-    plt.plot(input_sizes, rbt_traversal_times, label='Red-Black Tree (Traversal)')
-    plt.plot(input_sizes, bst_traversal_times, label='Binary Search Tree (Traversal)')
-    plt.plot(input_sizes, avl_traversal_times, label='AVL Tree (Traversal)')
-    plt.xlabel('Input Size')
-    plt.ylabel('Traversal Time (seconds)')
-    plt.legend()
-    plt.title('Traversal Performance of Different Trees')
+def write_csv(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
 
+# One subplot per phase: median time against input size for every structure
+# (first distribution only). Rendered off-screen unless show is set.
+def plot(results, path, show):
+    import matplotlib
+    if not show:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    distribution = results[0]["distribution"]
+    phases = [phase for phase in PHASES if any(r["phase"] == phase for r in results)]
+    plt.figure(figsize=(12, 10))
+    for i, phase in enumerate(phases, start=1):
+        plt.subplot(2, 2, i)
+        for structure in STRUCTURES:
+            rows = [r for r in results if r["structure"] == structure and r["phase"] == phase
+                    and r["distribution"] == distribution]
+            if rows:
+                plt.plot([r["size"] for r in rows], [r["median_ms"] for r in rows], marker="o", label=structure)
+        plt.xscale("log")
+        plt.xlabel("Input Size")
+        plt.ylabel("Median time (ms)")
+        plt.legend()
+        plt.title(f"{phase.capitalize()} ({distribution} keys)")
     plt.tight_layout()
-    plt.show()
+    if path:
+        plt.savefig(path)
+    if show:
+        plt.show()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the tree implementations in src/.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="input sizes (up to 10M; large sizes take a while)")
+    parser.add_argument("--distributions", nargs="+", default=["random"], choices=DISTRIBUTIONS)
+    parser.add_argument("--structures", nargs="+", default=list(STRUCTURES), choices=list(STRUCTURES))
+    parser.add_argument("--phases", nargs="+", default=PHASES, choices=PHASES)
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per measurement")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before the timed ones")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-gc", action="store_true",
+                        help="leave the garbage collector on while timing (off by default, like timeit)")
+    parser.add_argument("--stats", action="store_true",
+                        help="also count rotations, recolours, fixups, comparisons and descent depth")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--csv", metavar="PATH", help="write results as CSV")
+    parser.add_argument("--plot", metavar="PATH", help="save a plot (needs matplotlib)")
+    parser.add_argument("--show", action="store_true", help="display the plot in a window")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    performance_test()
+    args = parse_args()
+    results = performance_test(args.sizes, args.distributions, args.structures, args.phases,
+                               args.repeats, args.warmup, args.seed, args.keep_gc)
+    overhead = overhead_summary(results)
+    stats = structural_stats(args.sizes, args.distributions, args.structures, args.seed) if args.stats else None
+    if args.json:
+        write_json(results, args.json, stats, overhead)
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.plot or args.show:
+        plot(results, args.plot, args.show)
@@ -0,0 +1,248 @@
+import asyncio
+from itertools import islice
+
+try:
+    from .red_black_tree import RedBlackTree
+except ImportError:
+    from red_black_tree import RedBlackTree
+
+class AsyncRedBlackTree:
+    # asyncio front-end for a RedBlackTree. Single-key calls are queued, and
+    # everything queued within `batch_window` seconds (or as soon as
+    # `max_batch` requests are waiting) is applied as one batch, in one lock
+    # hold and in the order the requests were made; consecutive searches go
+    # through a single search_many(). The default window of 0 batches what
+    # arrives in the same pass of the event loop, which adds no latency; a
+    # longer window buys bigger batches at the cost of waiting for them.
+    #
+    # Operations over at least `offload_threshold` keys (big insert_many/
+    # delete_many/search_many calls, traverse()) run in `executor` (the
+    # loop's default one if None), so the event loop keeps serving other
+    # tasks meanwhile. An asyncio.Lock serialises batches and offloaded
+    # calls, so only one thread touches the tree at a time.
+    #
+    # Range scans (`async for key in tree.irange(...)`) read `page_size` keys
+    # per lock hold and resume from the last key, so long scans interleave
+    # with writes instead of holding up the loop.
+    def __init__(self, tree=None, batch_window=0.0, max_batch=256,
+                 offload_threshold=10_000, executor=None):
+        self.tree = tree if tree is not None else RedBlackTree()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.offload_threshold = offload_threshold
+        self.executor = executor
+        self.batches_applied = 0
+        self.requests_applied = 0
+        self._lock = asyncio.Lock()
+        self._pending = []
+        self._flush_handle = None
+        self._flushes = set()
+
+    def __len__(self):
+        return len(self.tree)
+
+    # Single-key operations; results are the same as the tree's own methods.
+    def search(self, key):
+        return self._enqueue("search", key, None)
+
+    def insert(self, key, value=None):
+        return self._enqueue("insert", key, value)
+
+    def delete(self, key):
+        return self._enqueue("delete", key, None)
+
+    async def contains(self, key):
+        return await self.search(key) is not None
+
+    def _enqueue(self, operation, key, value):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((operation, key, value, future))
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._start_flush)
+        return future
+
+    def _start_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._apply(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    # Apply everything queued so far now, without waiting for the window.
+    async def flush(self):
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes)
+
+    async def _apply(self, batch):
+        # Lock waiters are woken in FIFO order, so batches keep their order.
+        async with self._lock:
+            self.batches_applied += 1
+            self.requests_applied += len(batch)
+            start = 0
+            while start < len(batch):
+                end = start + 1
+                while end < len(batch) and batch[end][0] == batch[start][0]:
+                    end += 1
+                self._apply_run(batch[start:end])
+                start = end
+
+    # One run of same-kind requests. Searches share one search_many() call;
+    # writes are applied one at a time, since a batched write that failed
+    # halfway could not be safely replayed. If the batched search raises, it
+    # is replayed key by key so the error reaches only its own caller.
+    def _apply_run(self, run):
+        operation = run[0][0]
+        results = None
+        if operation == "search":
+            try:
+                results = self.tree.search_many([key for _, key, _, _ in run])
+            except Exception:
+                pass
+        for i, (_, key, value, future) in enumerate(run):
+            try:
+                if results is not None:
+                    result = results[i]
+                elif operation == "insert":
+                    result = self.tree.insert(key, value)
+                else:
+                    result = getattr(self.tree, operation)(key)
+            except Exception as error:
+                if not future.cancelled():
+                    future.set_exception(error)
+                continue
+            if not future.cancelled():
+                future.set_result(result)
+
+    # Bulk operations: inline when small, in the executor when large.
+    async def _run(self, size, function, *args):
+        async with self._lock:
+            if size < self.offload_threshold:
+                return function(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, function, *args)
+
+    async def insert_many(self, keys):
+        keys = list(keys)
+        await self.flush()
+        return await self._run(len(keys), self.tree.insert_many, keys)
+
+    async def delete_many(self, keys):
+        keys = list(keys)
+        await self.flush()
+        return await self._run(len(keys), self.tree.delete_many, keys)
+
+    async def search_many(self, keys):
+        keys = list(keys)
+        await self.flush()
+        return await self._run(len(keys), self.tree.search_many, keys)
+
+    async def traverse(self):
+        await self.flush()
+        return await self._run(len(self.tree), self.tree.traverse)
+
+    # Keys between minimum and maximum (None = unbounded), ascending. Each page
+    # restarts from the last key returned, skipping the copies of it already
+    # seen, so writes between pages are fine.
+    async def irange(self, minimum=None, maximum=None, inclusive=(True, True), page_size=1000):
+        await self.flush()
+        cursor, include_cursor = minimum, inclusive[0]
+        skip = 0
+        while True:
+            async with self._lock:
+                keys = self.tree.irange(cursor, maximum, (include_cursor, inclusive[1]))
+                page = list(islice(keys, skip, skip + page_size))
+            for key in page:
+                yield key
+            if len(page) < page_size:
+                return
+            last = page[-1]
+            if include_cursor and cursor is not None and page[0] == last == cursor:
+                skip += len(page)
+            else:
+                skip = sum(1 for key in page if key == last)
+            cursor, include_cursor = last, True
+            await asyncio.sleep(0)  # let queued requests in between pages
+
+    def __aiter__(self):
+        return self.irange()
+
+    # Serve the tree over TCP, or over a Unix socket when `path` is given.
+    # The protocol is one request per line, in the same "<op> <integer key>"
+    # form as the workload trace files:
+    #
+    #   search 42    ->  1 (found) or 0
+    #   insert 42    ->  ok
+    #   delete 42    ->  1 (removed) or 0
+    #   len          ->  number of keys
+    #   range 10 20  ->  the keys in [10, 20], space separated
+    #
+    # Anything else gets "error <message>". A client may pipeline requests;
+    # replies come back in request order.
+    async def serve(self, host="127.0.0.1", port=0, path=None):
+        if path is not None:
+            return await asyncio.start_unix_server(self._handle_connection, path)
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def _handle_connection(self, reader, writer):
+        replies = asyncio.Queue()
+
+        async def respond():
+            while True:
+                reply = await replies.get()
+                if reply is None:
+                    return
+                writer.write((await reply).encode() + b"\n")
+                if replies.empty():
+                    await writer.drain()
+
+        responder = asyncio.ensure_future(respond())
+        try:
+            async for line in reader:
+                replies.put_nowait(asyncio.ensure_future(self._execute(line.decode())))
+            replies.put_nowait(None)
+            await responder
+        except (asyncio.CancelledError, ConnectionResetError, BrokenPipeError):
+            # The server is shutting down or the client went away: the replies
+            # still queued have nowhere to go.
+            responder.cancel()
+            while not replies.empty():
+                reply = replies.get_nowait()
+                if reply is not None:
+                    reply.cancel()
+        finally:
+            # Nothing may escape, cancellation included: asyncio's streams log
+            # a traceback for a connection handler that ends cancelled.
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (asyncio.CancelledError, ConnectionResetError, BrokenPipeError):
+                pass
+
+    async def _execute(self, line):
+        parts = line.split()
+        try:
+            if not parts:
+                raise ValueError("empty request")
+            op, args = parts[0], [int(arg) for arg in parts[1:]]
+            if op == "search" and len(args) == 1:
+                return "1" if await self.search(args[0]) is not None else "0"
+            if op == "insert" and len(args) == 1:
+                await self.insert(args[0])
+                return "ok"
+            if op == "delete" and len(args) == 1:
+                return "1" if await self.delete(args[0]) else "0"
+            if op == "len" and not args:
+                await self.flush()
+                return str(len(self.tree))
+            if op == "range" and len(args) == 2:
+                return " ".join([str(key) async for key in self.irange(args[0], args[1])])
+            raise ValueError(f"bad request {line.strip()!r}")
+        except Exception as error:
+            return f"error {error}"
@@ -1,80 +1,138 @@
-# bst.py (for Binary Search Tree implementation)
+# avl.py (for AVL Tree implementation)
 class Node:
+    __slots__ = ("left", "right", "value", "height")
+
     def __init__(self, key):
         self.left = None
         self.right = None
         self.value = key
+        self.height = 1  # height of the subtree rooted here (a leaf is 1)
+
+def _height(node):
+    return node.height if node is not None else 0
 
 class AVLTree:
     def __init__(self):
         self.root = None
 
+    # Height of the whole tree (0 when empty); at most ~1.44 * log2(n + 2).
+    def height(self):
+        return _height(self.root)
+
     def insert(self, key):
         if self.root is None:
             self.root = Node(key)
-        else:
-            self._insert(self.root, key)
+            return
 
-    def _insert(self, root, key):
-        if key < root.value:
-            if root.left is None:
-                root.left = Node(key)
-            else:
-                self._insert(root.left, key)
+        # Iterative descent, remembering the path so we can rebalance upwards.
+        path = []
+        node = self.root
+        while node is not None:
+            path.append(node)
+            node = node.left if key < node.value else node.right
+
+        parent = path[-1]
+        if key < parent.value:
+            parent.left = Node(key)
         else:
-            if root.right is None:
-                root.right = Node(key)
-            else:
-                self._insert(root.right, key)
+            parent.right = Node(key)
+        self._rebalance_path(path)
 
     def search(self, key):
-        return self._search(self.root, key)
-
-    def _search(self, root, key):
-        if root is None or root.value == key:
-            return root
-        elif key < root.value:
-            return self._search(root.left, key)
-        else:
-            return self._search(root.right, key)
+        node = self.root
+        while node is not None:
+            if key == node.value:
+                return node
+            node = node.left if key < node.value else node.right
+        return None
 
     def delete(self, key):
-        self.root = self._delete(self.root, key)
+        path = []
+        node = self.root
+        while node is not None and key != node.value:
+            path.append(node)
+            node = node.left if key < node.value else node.right
+        if node is None:
+            return
 
-    def _delete(self, root, key):
-        if root is None:
-            return root
+        if node.left is not None and node.right is not None:
+            # Copy the in-order successor into this node and remove the successor.
+            path.append(node)
+            successor = node.right
+            while successor.left is not None:
+                path.append(successor)
+                successor = successor.left
+            node.value = successor.value
+            node = successor
 
-        if key < root.value:
-            root.left = self._delete(root.left, key)
-        elif key > root.value:
-            root.right = self._delete(root.right, key)
+        child = node.left if node.left is not None else node.right
+        if not path:
+            self.root = child
+            return
+        parent = path[-1]
+        if parent.left is node:
+            parent.left = child
         else:
-            if root.left is None:
-                return root.right
-            elif root.right is None:
-                return root.left
+            parent.right = child
+        self._rebalance_path(path)
+
+    # Walk the path bottom-up, fixing heights and rotating where a subtree's
+    # balance factor leaves [-1, 1]. Once a subtree ends up as tall as it was
+    # before the update, nothing above it can have changed.
+    def _rebalance_path(self, path):
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            old_height = node.height
+            subtree = self._rebalance(node)
+            if i == 0:
+                self.root = subtree
+            elif path[i - 1].left is node:
+                path[i - 1].left = subtree
+            else:
+                path[i - 1].right = subtree
+            if subtree.height == old_height:
+                break
 
-            min_larger_node = self._get_min(root.right)
-            root.value = min_larger_node.value
-            root.right = self._delete(root.right, min_larger_node.value)
+    def _rebalance(self, node):
+        left_height = _height(node.left)
+        right_height = _height(node.right)
+        if left_height - right_height > 1:
+            if _height(node.left.left) < _height(node.left.right):
+                node.left = self._rotate_left(node.left)  # left-right case
+            return self._rotate_right(node)
+        if right_height - left_height > 1:
+            if _height(node.right.right) < _height(node.right.left):
+                node.right = self._rotate_right(node.right)  # right-left case
+            return self._rotate_left(node)
+        node.height = max(left_height, right_height) + 1
+        return node
 
-        return root
+    def _rotate_left(self, node):
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        node.height = max(_height(node.left), _height(node.right)) + 1
+        pivot.height = max(node.height, _height(pivot.right)) + 1
+        return pivot
 
-    def _get_min(self, root):
-        while root.left is not None:
-            root = root.left
-        return root
+    def _rotate_right(self, node):
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        node.height = max(_height(node.left), _height(node.right)) + 1
+        pivot.height = max(_height(pivot.left), node.height) + 1
+        return pivot
 
     # Traverse method to perform an in-order traversal of the AVL Tree
     def traverse(self):
         result = []
-        self._inorder_traversal(self.root, result)
-        return result
-
-    # Helper method to recursively perform the in-order traversal
-    def _inorder_traversal(self, node, result):
-        if node:
-            self._inorder_traversal(node.left, result)  # Traverse left subtree
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
             result.append(node.value)  # Visit the node
-            self._inorder_traversal(node.right, result)  # Traverse right subtree
+            node = node.right
+        return result
@@ -0,0 +1,336 @@
+from bisect import bisect_left, bisect_right
+from itertools import repeat
+
+try:
+    from .red_black_tree import InvariantViolation
+except ImportError:
+    from red_black_tree import InvariantViolation
+
+# Leaves hold the keys, each with a count of how many times it was inserted,
+# and are chained left to right for scans. Inner nodes hold separators:
+# children[i] covers the keys in [keys[i - 1], keys[i]).
+class _Leaf:
+    __slots__ = ("keys", "counts", "next")
+
+    def __init__(self, keys, counts, next=None):
+        self.keys = keys
+        self.counts = counts
+        self.next = next
+
+class _Inner:
+    __slots__ = ("keys", "children")
+
+    def __init__(self, keys, children):
+        self.keys = keys
+        self.children = children
+
+class BPlusTree:
+    # B+-tree with wide nodes for read-mostly data. A node is a pair of
+    # Python lists of up to `order` keys, searched with bisect (a C binary
+    # search over one contiguous array of pointers), so a search touches
+    # log_{order/2}(n) nodes instead of the ~log2(n) scattered Node objects a
+    # red-black tree chases. Every node except the root stays at least half
+    # full. Same insert/search/delete/traverse interface as the other trees;
+    # like CompactRedBlackTree, search returns the stored key (or None).
+    #
+    # Equal keys share one leaf slot with a count, which keeps separators
+    # strict; traverse() and iteration repeat a key as often as it was
+    # inserted, like the multiset RedBlackTree.
+    def __init__(self, order=64):
+        if order < 3:
+            raise ValueError("order must be at least 3")
+        self.order = order
+        self.minimum = order // 2
+        self.root = _Leaf([], [])
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    # Build from keys in ascending order in O(n): pack full leaves, then
+    # each inner level, evening out the last two nodes of a level if the
+    # last one would be under half full.
+    @classmethod
+    def from_sorted(cls, keys, order=64):
+        tree = cls(order)
+        distinct, counts = [], []
+        for key in keys:
+            if distinct and not distinct[-1] < key:
+                if key < distinct[-1]:
+                    raise ValueError("from_sorted() requires keys in ascending order")
+                counts[-1] += 1
+            else:
+                distinct.append(key)
+                counts.append(1)
+        tree._count = sum(counts)
+        if not distinct:
+            return tree
+        bounds = tree._chunks(len(distinct), order, tree.minimum)
+        level = [_Leaf(distinct[lo:hi], counts[lo:hi]) for lo, hi in bounds]
+        for leaf, following in zip(level, level[1:]):
+            leaf.next = following
+        lows = [distinct[lo] for lo, _ in bounds]  # smallest key under each node
+        while len(level) > 1:
+            bounds = tree._chunks(len(level), order + 1, tree.minimum + 1)
+            level = [_Inner(lows[lo + 1:hi], level[lo:hi]) for lo, hi in bounds]
+            lows = [lows[lo] for lo, _ in bounds]
+        tree.root = level[0]
+        return tree
+
+    # Cut n items into (lo, hi) runs of at most `most` items for one level of
+    # a bulk load (keys for leaves, children for inner nodes), none of them
+    # under `least` unless there is only one.
+    def _chunks(self, n, most, least):
+        bounds = [(lo, min(lo + most, n)) for lo in range(0, n, most)]
+        if len(bounds) > 1 and bounds[-1][1] - bounds[-1][0] < least:
+            lo = bounds[-2][0]
+            mid = (lo + n + 1) // 2
+            bounds[-2:] = [(lo, mid), (mid, n)]
+        return bounds
+
+    def _leaf_for(self, key):
+        node = self.root
+        while type(node) is _Inner:
+            node = node.children[bisect_right(node.keys, key)]
+        return node
+
+    def search(self, key):
+        leaf = self._leaf_for(key)
+        keys = leaf.keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return keys[i]
+        return None
+
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    # The search() result for every key, in the order given. Probes are
+    # looked up in ascending order, and one that falls inside the leaf the
+    # previous probe ended in skips the descent from the root.
+    def search_many(self, keys):
+        keys = list(keys)
+        results = [None] * len(keys)
+        leaf = None
+        for i in sorted(range(len(keys)), key=keys.__getitem__):
+            key = keys[i]
+            if leaf is None or not leaf.keys or leaf.keys[-1] < key:
+                leaf = self._leaf_for(key)
+            leaf_keys = leaf.keys
+            j = bisect_left(leaf_keys, key)
+            if j < len(leaf_keys) and leaf_keys[j] == key:
+                results[i] = leaf_keys[j]
+        return results
+
+    def insert(self, key):
+        node = self.root
+        path = []
+        while type(node) is _Inner:
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+        keys = node.keys
+        i = bisect_left(keys, key)
+        self._count += 1
+        if i < len(keys) and keys[i] == key:
+            node.counts[i] += 1
+            return
+        keys.insert(i, key)
+        node.counts.insert(i, 1)
+        if len(keys) <= self.order:
+            return
+
+        # Split the full leaf, then push separators up as long as the parent
+        # overflows in turn.
+        mid = len(keys) // 2
+        new = _Leaf(keys[mid:], node.counts[mid:], node.next)
+        del keys[mid:]
+        del node.counts[mid:]
+        node.next = new
+        separator = new.keys[0]
+        while path:
+            parent, i = path.pop()
+            parent.keys.insert(i, separator)
+            parent.children.insert(i + 1, new)
+            if len(parent.keys) <= self.order:
+                return
+            mid = len(parent.keys) // 2
+            separator = parent.keys[mid]
+            new = _Inner(parent.keys[mid + 1:], parent.children[mid + 1:])
+            del parent.keys[mid:]
+            del parent.children[mid + 1:]
+            node = parent
+        self.root = _Inner([separator], [node, new])
+
+    # Removes one copy of key; returns False when it was not present.
+    def delete(self, key):
+        node = self.root
+        path = []
+        while type(node) is _Inner:
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+        keys = node.keys
+        i = bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return False
+        self._count -= 1
+        if node.counts[i] > 1:
+            node.counts[i] -= 1
+            return True
+        del keys[i]
+        del node.counts[i]
+
+        # Refill an underfull node from a sibling with keys to spare, or merge
+        # it into one; a merge takes a key out of the parent, which may leave
+        # that underfull in turn.
+        minimum = self.minimum
+        while path and len(node.keys) < minimum:
+            parent, i = path.pop()
+            children = parent.children
+            left = children[i - 1] if i > 0 else None
+            right = children[i + 1] if i + 1 < len(children) else None
+            if left is not None and len(left.keys) > minimum:
+                self._borrow_from_left(parent, i, left, node)
+                break
+            if right is not None and len(right.keys) > minimum:
+                self._borrow_from_right(parent, i, node, right)
+                break
+            if left is not None:
+                self._merge(parent, i - 1, left, node)
+            else:
+                self._merge(parent, i, node, right)
+            node = parent
+        root = self.root
+        if type(root) is _Inner and not root.keys:
+            self.root = root.children[0]
+        return True
+
+    def _borrow_from_left(self, parent, i, left, node):
+        if type(node) is _Leaf:
+            node.keys.insert(0, left.keys.pop())
+            node.counts.insert(0, left.counts.pop())
+            parent.keys[i - 1] = node.keys[0]
+        else:
+            node.keys.insert(0, parent.keys[i - 1])
+            node.children.insert(0, left.children.pop())
+            parent.keys[i - 1] = left.keys.pop()
+
+    def _borrow_from_right(self, parent, i, node, right):
+        if type(node) is _Leaf:
+            node.keys.append(right.keys.pop(0))
+            node.counts.append(right.counts.pop(0))
+            parent.keys[i] = right.keys[0]
+        else:
+            node.keys.append(parent.keys[i])
+            node.children.append(right.children.pop(0))
+            parent.keys[i] = right.keys.pop(0)
+
+    # Fold children[i + 1] (`right`) into children[i] (`left`).
+    def _merge(self, parent, i, left, right):
+        if type(left) is _Leaf:
+            left.keys.extend(right.keys)
+            left.counts.extend(right.counts)
+            left.next = right.next
+        else:
+            left.keys.append(parent.keys[i])
+            left.keys.extend(right.keys)
+            left.children.extend(right.children)
+        del parent.keys[i]
+        del parent.children[i + 1]
+
+    def _first_leaf(self):
+        node = self.root
+        while type(node) is _Inner:
+            node = node.children[0]
+        return node
+
+    def __iter__(self):
+        leaf = self._first_leaf()
+        while leaf is not None:
+            for key, count in zip(leaf.keys, leaf.counts):
+                yield from repeat(key, count)
+            leaf = leaf.next
+
+    def traverse(self):
+        result = []
+        leaf = self._first_leaf()
+        while leaf is not None:
+            for key, count in zip(leaf.keys, leaf.counts):
+                if count == 1:
+                    result.append(key)
+                else:
+                    result.extend(repeat(key, count))
+            leaf = leaf.next
+        return result
+
+    # Lazily yield keys between minimum and maximum (None means unbounded),
+    # ascending, by following the leaf chain from the first match.
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True)):
+        include_min, include_max = inclusive
+        if minimum is None:
+            leaf, i = self._first_leaf(), 0
+        else:
+            leaf = self._leaf_for(minimum)
+            i = (bisect_left if include_min else bisect_right)(leaf.keys, minimum)
+        while leaf is not None:
+            keys = leaf.keys
+            for j in range(i, len(keys)):
+                key = keys[j]
+                if maximum is not None and (maximum < key or (not include_max and not key < maximum)):
+                    return
+                yield from repeat(key, leaf.counts[j])
+            leaf, i = leaf.next, 0
+
+    def height(self):
+        levels = 1
+        node = self.root
+        while type(node) is _Inner:
+            node = node.children[0]
+            levels += 1
+        return levels
+
+    # Check the B+-tree invariants in O(n) without recursion: keys strictly
+    # ascending inside every node and within their separators' bounds, node
+    # sizes between minimum and order (the root excepted), every leaf at the
+    # same depth, the leaf chain visiting the leaves in order, and len()
+    # matching the counts. Raises InvariantViolation; returns the height.
+    def validate(self):
+        leaves = []
+        leaf_depth = None
+        stack = [(self.root, None, None, 1)]
+        while stack:
+            node, low, high, depth = stack.pop()
+            keys = node.keys
+            if node is not self.root and not self.minimum <= len(keys) <= self.order:
+                raise InvariantViolation(f"node with {len(keys)} keys, outside [{self.minimum}, {self.order}]")
+            if len(keys) > self.order:
+                raise InvariantViolation(f"root has {len(keys)} keys, more than {self.order}")
+            for a, b in zip(keys, keys[1:]):
+                if not a < b:
+                    raise InvariantViolation(f"key {b!r} is not above {a!r}")
+            if keys and ((low is not None and keys[0] < low) or (high is not None and not keys[-1] < high)):
+                raise InvariantViolation(f"keys {keys[0]!r}..{keys[-1]!r} outside their separators [{low!r}, {high!r})")
+            if type(node) is _Leaf:
+                if len(node.counts) != len(keys) or any(count < 1 for count in node.counts):
+                    raise InvariantViolation(f"bad counts {node.counts!r}")
+                if leaf_depth is None:
+                    leaf_depth = depth
+                elif depth != leaf_depth:
+                    raise InvariantViolation(f"leaves at depths {leaf_depth} and {depth}")
+                leaves.append(node)
+                continue
+            if len(node.children) != len(keys) + 1:
+                raise InvariantViolation(f"inner node with {len(keys)} keys has {len(node.children)} children")
+            if node is self.root and not keys:
+                raise InvariantViolation("inner root has a single child")
+            bounds = [low] + keys + [high]
+            for i in range(len(node.children) - 1, -1, -1):  # leftmost child popped first
+                stack.append((node.children[i], bounds[i], bounds[i + 1], depth + 1))
+        for leaf, following in zip(leaves, leaves[1:] + [None]):
+            if leaf.next is not following:
+                raise InvariantViolation("leaf chain skips or reorders leaves")
+        count = sum(sum(leaf.counts) for leaf in leaves)
+        if count != len(self):
+            raise InvariantViolation(f"{count} keys stored but len() == {len(self)}")
+        return leaf_depth
@@ -1,81 +1,96 @@
-import sys
-sys.setrecursionlimit(1000000)  # Increase limit as needed
-
 class Node:
     def __init__(self, key):
         self.key = key
         self.left = None
         self.right = None
 
+# Same node without a per-instance __dict__: smaller and faster to access,
+# which matches the node layout of the balanced trees it is compared against.
+class SlotNode:
+    __slots__ = ("key", "left", "right")
+
+    def __init__(self, key):
+        self.key = key
+        self.left = None
+        self.right = None
+
 class BinarySearchTree:
-    def __init__(self):
+    # Every operation is iterative, so even a degenerate (sorted-input) tree
+    # never touches the recursion limit; it is just O(n) per operation.
+    def __init__(self, slots=True):
         self.root = None
+        self.node_class = SlotNode if slots else Node
 
     def insert(self, key):
-        if not self.root:
-            self.root = Node(key)
-        else:
-            self._insert(self.root, key)
-
-    def _insert(self, node, key):
-        if not node:
-            return Node(key)
-        
-        if key < node.key:
-            node.left = self._insert(node.left, key)
-        else:
-            node.right = self._insert(node.right, key)
-
-        return node
+        new_node = self.node_class(key)
+        if self.root is None:
+            self.root = new_node
+            return
+
+        node = self.root
+        while True:
+            if key < node.key:
+                if node.left is None:
+                    node.left = new_node
+                    return
+                node = node.left
+            else:
+                if node.right is None:
+                    node.right = new_node
+                    return
+                node = node.right
 
     def search(self, key):
-        return self._search(self.root, key)
-
-    def _search(self, node, key):
-        if not node or node.key == key:
-            return node
-        elif key < node.key:
-            return self._search(node.left, key)
-        else:
-            return self._search(node.right, key)
+        node = self.root
+        while node is not None and node.key != key:
+            node = node.left if key < node.key else node.right
+        return node
 
     def delete(self, key):
-        self.root = self._delete(self.root, key)
-
-    def _delete(self, node, key):
-        if not node:
-            return node
-
-        if key < node.key:
-            node.left = self._delete(node.left, key)
-        elif key > node.key:
-            node.right = self._delete(node.right, key)
+        parent = None
+        node = self.root
+        while node is not None and node.key != key:
+            parent = node
+            node = node.left if key < node.key else node.right
+        if node is None:
+            return
+
+        if node.left is not None and node.right is not None:
+            # Copy the in-order successor's key here and unlink the successor.
+            successor_parent = node
+            successor = node.right
+            while successor.left is not None:
+                successor_parent = successor
+                successor = successor.left
+            node.key = successor.key
+            parent, node = successor_parent, successor
+
+        child = node.left if node.left is not None else node.right
+        if parent is None:
+            self.root = child
+        elif parent.left is node:
+            parent.left = child
         else:
-            if not node.left:
-                return node.right
-            elif not node.right:
-                return node.left
-
-            temp = self._min_value_node(node.right)
-            node.key = temp.key
-            node.right = self._delete(node.right, temp.key)
+            parent.right = child
 
-        return node
-
-    def _min_value_node(self, node):
-        current = node
-        while current.left:
-            current = current.left
-        return current
+    # Number of levels (0 when empty), counted breadth-first.
+    def height(self):
+        height = 0
+        level = [self.root] if self.root is not None else []
+        while level:
+            height += 1
+            level = [child for node in level for child in (node.left, node.right) if child is not None]
+        return height
 
     def traverse(self):
         result = []
-        self._inorder_traversal(self.root, result)
-        return result
-
-    def _inorder_traversal(self, node, result):
-        if node:
-            self._inorder_traversal(node.left, result)
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
             result.append(node.key)
-            self._inorder_traversal(node.right, result)
-
+            node = node.right
+        return result
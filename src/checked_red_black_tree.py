@@ -0,0 +1,112 @@
+import random
+
+try:
+    from .red_black_tree import InvariantViolation, RedBlackTree
+except ImportError:
+    from red_black_tree import InvariantViolation, RedBlackTree
+
+class CheckedRedBlackTree(RedBlackTree):
+    # Debug build of RedBlackTree that checks itself after every write, cheaply
+    # enough to leave on in a canary:
+    #
+    #   path_checks   after each insert/delete, re-check only the nodes on the
+    #                 path from the change up to the root, plus their children:
+    #                 parent pointers, red-red and local key order, and that
+    #                 the black height through the changed node matches the
+    #                 one down the root's left spine. That is O(log n) and
+    #                 catches corruption where it happens.
+    #   sample_rate   fraction of writes that also run the full O(n)
+    #                 validate(), to catch anything the local check cannot see.
+    #
+    # Bulk loads and rebuilds (from_sorted, large delete_many) always run
+    # validate(), as they already cost O(n). A run that insert_many splices in
+    # gets a path check at both of its ends, where the joins changed the tree.
+    def __init__(self, duplicates="multiset", path_checks=True, sample_rate=0.0, seed=None):
+        super().__init__(duplicates)
+        self.path_checks = path_checks
+        self.sample_rate = sample_rate
+        self._rng = random.Random(seed)
+        self.path_checks_run = 0
+        self.full_checks_run = 0
+
+    def _insert_from(self, current, key, value=None):
+        node = super()._insert_from(current, key, value)
+        self._after_write(node)
+        return node
+
+    def _delete_node(self, node):
+        # The lowest node that survives the splice: the spliced node's parent,
+        # or the successor itself when it moves straight into node's place.
+        if node.left is self.NIL or node.right is self.NIL:
+            spliced = node
+        else:
+            spliced = self.minimum(node.right)
+        anchor = spliced.parent
+        if anchor is node:
+            anchor = spliced if spliced is not node else None
+        super()._delete_node(node)
+        if anchor is None and self.root is not self.NIL:
+            anchor = self.root  # the root itself was spliced out
+        self._after_write(anchor)
+
+    def _insert_run(self, keys):
+        super()._insert_run(keys)
+        self._after_write(self._ceiling_node(keys[0]))
+        self._after_write(self._ceiling_node(keys[-1]))
+
+    def _rebuild(self, keys, values, counts=None):
+        super()._rebuild(keys, values, counts)
+        self.full_checks_run += 1
+        self.validate()
+
+    def _after_write(self, node):
+        if self.path_checks and node is not None:
+            self.path_checks_run += 1
+            self.check_path(node)
+        if self.sample_rate and self._rng.random() < self.sample_rate:
+            self.full_checks_run += 1
+            self.validate()
+
+    # Black height of the subtree rooted at node, following only its left
+    # spine. In a valid tree every path gives the same count.
+    def _spine_black_height(self, node):
+        height = 1
+        while node is not self.NIL:
+            if not node.red:
+                height += 1
+            node = node.left
+        return height
+
+    def check_path(self, node):
+        nil = self.NIL
+        if self.root is not nil and (self.root.red or self.root.parent is not None):
+            raise InvariantViolation(f"root {self.root.key!r} is red or has a parent")
+        strict = self.duplicates != "multiset"
+        black_height = self._spine_black_height(node)
+        limit = len(self)
+        steps = 0
+        while node is not None:
+            steps += 1
+            if steps > limit:
+                raise InvariantViolation("parent pointers form a cycle")
+            for child in (node.left, node.right):
+                if child is nil:
+                    continue
+                if child.parent is not node:
+                    raise InvariantViolation(f"{child.key!r} does not point back to its parent {node.key!r}")
+                if node.red and child.red:
+                    raise InvariantViolation(f"red node {node.key!r} has a red child {child.key!r}")
+            left, right = node.left, node.right
+            if left is not nil and (node.key < left.key or (strict and not left.key < node.key)):
+                raise InvariantViolation(f"left child {left.key!r} is out of order under {node.key!r}")
+            if right is not nil and (right.key < node.key or (strict and not node.key < right.key)):
+                raise InvariantViolation(f"right child {right.key!r} is out of order under {node.key!r}")
+            parent = node.parent
+            if parent is None:
+                if node is not self.root:
+                    raise InvariantViolation(f"{node.key!r} has no parent but is not the root")
+                if black_height != self._spine_black_height(node):
+                    raise InvariantViolation("black height through the changed path differs from the rest of the tree")
+            elif not parent.red:
+                black_height += 1
+            node = parent
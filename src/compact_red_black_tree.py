@@ -0,0 +1,521 @@
+from array import array
+
+# Slot 0 of every array is the NIL sentinel (black, no key).
+NIL = 0
+
+# What search() returns: a handle on one slot, read through to the arrays, so
+# it has the attributes callers use on a RedBlackTree Node (key, value, red,
+# color, count) without the tree keeping an object per key. Like a Node, it
+# tracks its slot and not its key: after that key is deleted the slot may be
+# reused for another one.
+class CompactNode:
+    __slots__ = ("tree", "index")
+    value = None  # no values are stored
+    count = 1     # duplicates are always kept as separate slots
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def key(self):
+        return self.tree.keys[self.index]
+
+    @property
+    def red(self):
+        return bool(self.tree._is_red(self.index))
+
+    @property
+    def color(self):
+        return "red" if self.red else "black"
+
+    def __eq__(self, other):
+        return type(other) is CompactNode and other.tree is self.tree and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    def __repr__(self):
+        return f"CompactNode({self.key!r}, {self.color})"
+
+class CompactRedBlackTree:
+    # Red-Black Tree whose nodes live in parallel typed arrays instead of one
+    # Python object per key. A node is just an int32 index into the arrays:
+    #   keys[i]                      - the key (typed array, or a list for arbitrary objects)
+    #   left[i], right[i], parent[i] - int32 indices, 0 meaning NIL
+    #   colour bitset                - bit i set means node i is red
+    # Deleted slots are threaded onto a free list (through `right`) and reused.
+    #
+    # It follows RedBlackTree's contract for what it has: insert, delete
+    # (False for a missing key), search (a node, here a CompactNode, or None),
+    # len/in, iteration both ways, traverse, irange, min/max and
+    # floor/ceiling/successor/predecessor. Duplicates are always kept, as with
+    # the default "multiset" policy. Left out: values and the mapping
+    # interface, the other duplicate policies, the batch operations
+    # (insert_many, search_many, delete_many), split/join and the set
+    # operations, copy, count/remove_all, validate, dump/open_mmap and the
+    # exporters. Use RedBlackTree where those are needed.
+    def __init__(self, key_type="q"):
+        # key_type is an array typecode ("q" for int64, "d" for float64, ...),
+        # or None to store arbitrary comparable objects in a plain list.
+        self.key_type = key_type
+        self.keys = array(key_type, [0]) if key_type else [None]
+        self.left = array("i", [NIL])
+        self.right = array("i", [NIL])
+        self.parent = array("i", [NIL])
+        self.colors = bytearray(1)
+        self.root = NIL
+        self.free = NIL
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    # Colour bitset helpers
+    def _is_red(self, i):
+        return (self.colors[i >> 3] >> (i & 7)) & 1
+
+    def _set_red(self, i):
+        self.colors[i >> 3] |= 1 << (i & 7)
+
+    def _set_black(self, i):
+        self.colors[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+    # Slot management
+    def _alloc(self, key):
+        i = self.free
+        if i != NIL:
+            self.free = self.right[i]
+            self.keys[i] = key
+            self.left[i] = NIL
+            self.right[i] = NIL
+            self.parent[i] = NIL
+        else:
+            i = len(self.left)
+            self.keys.append(key)
+            self.left.append(NIL)
+            self.right.append(NIL)
+            self.parent.append(NIL)
+            if (i >> 3) >= len(self.colors):
+                self.colors.append(0)
+        self._set_red(i)
+        return i
+
+    def _release(self, i):
+        if self.key_type is None:
+            self.keys[i] = None  # drop the reference so the key can be collected
+        self.left[i] = NIL
+        self.parent[i] = NIL
+        self._set_black(i)
+        self.right[i] = self.free
+        self.free = i
+
+    def insert(self, key):
+        keys = self.keys
+        left = self.left
+        right = self.right
+        parent = NIL
+        current = self.root
+        while current != NIL:
+            parent = current
+            if key < keys[current]:
+                current = left[current]
+            else:
+                current = right[current]
+
+        node = self._alloc(key)
+        self.parent[node] = parent
+        if parent == NIL:
+            self.root = node
+        elif key < keys[parent]:
+            left[parent] = node
+        else:
+            right[parent] = node
+        self.count += 1
+
+        self.fix_insert(node)
+
+    def fix_insert(self, node):
+        parent = self.parent
+        left = self.left
+        right = self.right
+        is_red = self._is_red
+        while node != self.root and is_red(parent[node]):
+            p = parent[node]
+            g = parent[p]
+            if p == left[g]:
+                uncle = right[g]
+                if is_red(uncle):
+                    self._set_black(p)
+                    self._set_black(uncle)
+                    self._set_red(g)
+                    node = g
+                else:
+                    if node == right[p]:
+                        node = p
+                        self.left_rotate(node)
+                        p = parent[node]
+                    self._set_black(p)
+                    self._set_red(g)
+                    self.right_rotate(g)
+            else:
+                uncle = left[g]
+                if is_red(uncle):
+                    self._set_black(p)
+                    self._set_black(uncle)
+                    self._set_red(g)
+                    node = g
+                else:
+                    if node == left[p]:
+                        node = p
+                        self.right_rotate(node)
+                        p = parent[node]
+                    self._set_black(p)
+                    self._set_red(g)
+                    self.left_rotate(g)
+        self._set_black(self.root)
+
+    def left_rotate(self, x):
+        left = self.left
+        right = self.right
+        parent = self.parent
+        y = right[x]
+        right[x] = left[y]
+        if left[y] != NIL:
+            parent[left[y]] = x
+        xp = parent[x]
+        parent[y] = xp
+        if xp == NIL:
+            self.root = y
+        elif x == left[xp]:
+            left[xp] = y
+        else:
+            right[xp] = y
+        left[y] = x
+        parent[x] = y
+
+    def right_rotate(self, x):
+        left = self.left
+        right = self.right
+        parent = self.parent
+        y = left[x]
+        left[x] = right[y]
+        if right[y] != NIL:
+            parent[right[y]] = x
+        xp = parent[x]
+        parent[y] = xp
+        if xp == NIL:
+            self.root = y
+        elif x == right[xp]:
+            right[xp] = y
+        else:
+            left[xp] = y
+        right[y] = x
+        parent[x] = y
+
+    def traverse(self):
+        # Iterative in-order walk with an explicit stack (depth is O(log n)).
+        keys = self.keys
+        left = self.left
+        right = self.right
+        result = []
+        stack = []
+        node = self.root
+        while stack or node != NIL:
+            while node != NIL:
+                stack.append(node)
+                node = left[node]
+            node = stack.pop()
+            result.append(keys[node])
+            node = right[node]
+        return result
+
+    def _find(self, key):
+        keys = self.keys
+        left = self.left
+        right = self.right
+        node = self.root
+        while node != NIL:
+            k = keys[node]
+            if key == k:
+                return node
+            node = left[node] if key < k else right[node]
+        return NIL
+
+    # Like RedBlackTree.search: the node holding key (a CompactNode), or None.
+    def search(self, key):
+        node = self._find(key)
+        return CompactNode(self, node) if node != NIL else None
+
+    def __contains__(self, key):
+        return self._find(key) != NIL
+
+    # In-order iteration follows parent links, like RedBlackTree's: no stack,
+    # and only the keys actually consumed cost anything.
+    def __iter__(self):
+        keys = self.keys
+        node = self.minimum(self.root) if self.root != NIL else NIL
+        while node != NIL:
+            yield keys[node]
+            node = self._successor(node)
+
+    def __reversed__(self):
+        keys = self.keys
+        node = self.maximum(self.root) if self.root != NIL else NIL
+        while node != NIL:
+            yield keys[node]
+            node = self._predecessor(node)
+
+    # Lazily yield keys between minimum and maximum (None means unbounded),
+    # in O(log n + k) for k keys consumed. Same signature as RedBlackTree.irange.
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        include_min, include_max = inclusive
+        keys = self.keys
+        if not reverse:
+            if minimum is None:
+                node = self.minimum(self.root) if self.root != NIL else NIL
+            elif include_min:
+                node = self._ceiling_node(minimum)
+            else:
+                node = self._higher_node(minimum)
+            while node != NIL:
+                key = keys[node]
+                if maximum is not None:
+                    if maximum < key or (not include_max and not key < maximum):
+                        return
+                yield key
+                node = self._successor(node)
+        else:
+            if maximum is None:
+                node = self.maximum(self.root) if self.root != NIL else NIL
+            elif include_max:
+                node = self._floor_node(maximum)
+            else:
+                node = self._lower_node(maximum)
+            while node != NIL:
+                key = keys[node]
+                if minimum is not None:
+                    if key < minimum or (not include_min and not minimum < key):
+                        return
+                yield key
+                node = self._predecessor(node)
+
+    # In-order neighbours of a slot (NIL past either end).
+    def _successor(self, node):
+        right = self.right
+        if right[node] != NIL:
+            return self.minimum(right[node])
+        parent = self.parent
+        while parent[node] != NIL and node == right[parent[node]]:
+            node = parent[node]
+        return parent[node]
+
+    def _predecessor(self, node):
+        left = self.left
+        if left[node] != NIL:
+            return self.maximum(left[node])
+        parent = self.parent
+        while parent[node] != NIL and node == left[parent[node]]:
+            node = parent[node]
+        return parent[node]
+
+    # Bisect-style navigation: the first slot >= / > key and the last slot
+    # <= / < key, NIL if there is none.
+    def _ceiling_node(self, key):
+        keys = self.keys
+        node = self.root
+        found = NIL
+        while node != NIL:
+            if keys[node] < key:
+                node = self.right[node]
+            else:
+                found = node
+                node = self.left[node]
+        return found
+
+    def _higher_node(self, key):
+        keys = self.keys
+        node = self.root
+        found = NIL
+        while node != NIL:
+            if key < keys[node]:
+                found = node
+                node = self.left[node]
+            else:
+                node = self.right[node]
+        return found
+
+    def _floor_node(self, key):
+        keys = self.keys
+        node = self.root
+        found = NIL
+        while node != NIL:
+            if key < keys[node]:
+                node = self.left[node]
+            else:
+                found = node
+                node = self.right[node]
+        return found
+
+    def _lower_node(self, key):
+        keys = self.keys
+        node = self.root
+        found = NIL
+        while node != NIL:
+            if keys[node] < key:
+                found = node
+                node = self.right[node]
+            else:
+                node = self.left[node]
+        return found
+
+    # Key-level navigation; each returns None when there is no such key.
+    def _key(self, node):
+        return self.keys[node] if node != NIL else None
+
+    def floor(self, key):
+        return self._key(self._floor_node(key))
+
+    def ceiling(self, key):
+        return self._key(self._ceiling_node(key))
+
+    def successor(self, key):
+        return self._key(self._higher_node(key))
+
+    def predecessor(self, key):
+        return self._key(self._lower_node(key))
+
+    def min(self):
+        return self._key(self.minimum(self.root)) if self.root != NIL else None
+
+    def max(self):
+        return self._key(self.maximum(self.root)) if self.root != NIL else None
+
+    def delete(self, key):
+        node = self._find(key)
+        if node == NIL:
+            return False
+
+        left = self.left
+        right = self.right
+        parent = self.parent
+        y = node
+        y_was_red = self._is_red(y)
+        if left[node] == NIL:
+            x = right[node]
+            self._transplant(node, x)
+        elif right[node] == NIL:
+            x = left[node]
+            self._transplant(node, x)
+        else:
+            y = self.minimum(right[node])
+            y_was_red = self._is_red(y)
+            x = right[y]
+            if parent[y] == node:
+                parent[x] = y
+            else:
+                self._transplant(y, right[y])
+                right[y] = right[node]
+                parent[right[y]] = y
+            self._transplant(node, y)
+            left[y] = left[node]
+            parent[left[y]] = y
+            if self._is_red(node):
+                self._set_red(y)
+            else:
+                self._set_black(y)
+
+        self._release(node)
+        self.count -= 1
+        if not y_was_red:
+            self.fix_delete(x)
+        return True
+
+    def _transplant(self, u, v):
+        parent = self.parent
+        up = parent[u]
+        if up == NIL:
+            self.root = v
+        elif u == self.left[up]:
+            self.left[up] = v
+        else:
+            self.right[up] = v
+        parent[v] = up
+
+    def minimum(self, node):
+        left = self.left
+        while left[node] != NIL:
+            node = left[node]
+        return node
+
+    def maximum(self, node):
+        right = self.right
+        while right[node] != NIL:
+            node = right[node]
+        return node
+
+    def fix_delete(self, x):
+        left = self.left
+        right = self.right
+        parent = self.parent
+        is_red = self._is_red
+        while x != self.root and not is_red(x):
+            p = parent[x]
+            if x == left[p]:
+                sibling = right[p]
+                if is_red(sibling):
+                    self._set_black(sibling)
+                    self._set_red(p)
+                    self.left_rotate(p)
+                    sibling = right[p]
+                if not is_red(left[sibling]) and not is_red(right[sibling]):
+                    self._set_red(sibling)
+                    x = p
+                else:
+                    if not is_red(right[sibling]):
+                        self._set_black(left[sibling])
+                        self._set_red(sibling)
+                        self.right_rotate(sibling)
+                        sibling = right[p]
+                    if is_red(p):
+                        self._set_red(sibling)
+                    else:
+                        self._set_black(sibling)
+                    self._set_black(p)
+                    self._set_black(right[sibling])
+                    self.left_rotate(p)
+                    x = self.root
+            else:
+                sibling = left[p]
+                if is_red(sibling):
+                    self._set_black(sibling)
+                    self._set_red(p)
+                    self.right_rotate(p)
+                    sibling = left[p]
+                if not is_red(right[sibling]) and not is_red(left[sibling]):
+                    self._set_red(sibling)
+                    x = p
+                else:
+                    if not is_red(left[sibling]):
+                        self._set_black(right[sibling])
+                        self._set_red(sibling)
+                        self.left_rotate(sibling)
+                        sibling = left[p]
+                    if is_red(p):
+                        self._set_red(sibling)
+                    else:
+                        self._set_black(sibling)
+                    self._set_black(p)
+                    self._set_black(left[sibling])
+                    self.right_rotate(p)
+                    x = self.root
+        self._set_black(x)
+
+    def nbytes(self):
+        # Bytes held by the node arrays themselves (excluding over-allocation).
+        size = len(self.left) * (self.left.itemsize * 3) + len(self.colors)
+        if self.key_type:
+            size += len(self.keys) * self.keys.itemsize
+        else:
+            size += len(self.keys) * 8  # one pointer per slot; key objects not counted
+        return size
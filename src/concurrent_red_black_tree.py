@@ -0,0 +1,164 @@
+import threading
+from contextlib import contextmanager
+
+try:
+    from .red_black_tree import RedBlackTree
+except ImportError:
+    from red_black_tree import RedBlackTree
+
+class ReadWriteLock:
+    # Any number of readers, or a single writer. Waiting writers hold back new
+    # readers so that a steady stream of reads cannot starve them.
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+class _Request:
+    __slots__ = ("operation", "args", "result", "error", "done")
+
+    def __init__(self, operation, args):
+        self.operation = operation
+        self.args = args
+        self.result = None
+        self.error = None
+        self.done = False
+
+def _item(node):
+    return (node.key, node.value) if node is not None else None
+
+class ConcurrentRedBlackTree:
+    # Thread-safe wrapper around a RedBlackTree. Reads share a read lock, so
+    # they never see a tree in the middle of a rotation. Writes are queued and
+    # applied by whichever writer gets the write lock first, which drains the
+    # whole queue in one go (flat combining) instead of taking the lock once
+    # per mutation.
+    def __init__(self, tree=None):
+        self.tree = tree if tree is not None else RedBlackTree()
+        self.lock = ReadWriteLock()
+        self._pending = []
+        self._pending_lock = threading.Lock()
+
+    # Reads. Nodes are never handed out: once the read lock is released a
+    # write can unlink a node, rewire its links or (in a tree that deletes by
+    # copying the successor in) change its key and value, so search copies
+    # out (key, value) while the lock is still held, or returns None.
+    def search(self, key):
+        with self.lock.read_locked():
+            return _item(self.tree.search(key))
+
+    def search_many(self, keys, presorted=False):
+        with self.lock.read_locked():
+            return [_item(node) for node in self.tree.search_many(keys, presorted)]
+
+    def __contains__(self, key):
+        with self.lock.read_locked():
+            return self.tree.search(key) is not None
+
+    def get(self, key, default=None):
+        with self.lock.read_locked():
+            return self.tree.get(key, default)
+
+    def __len__(self):
+        with self.lock.read_locked():
+            return len(self.tree)
+
+    def floor(self, key):
+        with self.lock.read_locked():
+            return self.tree.floor(key)
+
+    def ceiling(self, key):
+        with self.lock.read_locked():
+            return self.tree.ceiling(key)
+
+    def traverse(self):
+        with self.lock.read_locked():
+            return self.tree.traverse()
+
+    # Range scans are materialised under the read lock; handing out a live
+    # generator would keep the lock held for as long as the caller iterates.
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        with self.lock.read_locked():
+            return list(self.tree.irange(minimum, maximum, inclusive, reverse))
+
+    # Writes
+    def insert(self, key, value=None):
+        self._submit(self.tree.insert, (key, value))
+
+    def delete(self, key):
+        return self._submit(self.tree.delete, (key,))
+
+    def insert_many(self, keys, presorted=False):
+        self._submit(self.tree.insert_many, (keys, presorted))
+
+    def delete_many(self, keys, presorted=False):
+        return self._submit(self.tree.delete_many, (keys, presorted))
+
+    def _submit(self, operation, args):
+        request = _Request(operation, args)
+        with self._pending_lock:
+            self._pending.append(request)
+        # By the time we hold the lock, an earlier writer may already have
+        # applied our request along with its own.
+        with self.lock.write_locked():
+            if not request.done:
+                self._apply_pending()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _apply_pending(self):
+        while True:
+            with self._pending_lock:
+                batch = self._pending
+                self._pending = []
+            if not batch:
+                return
+            for request in batch:
+                try:
+                    request.result = request.operation(*request.args)
+                except Exception as error:
+                    request.error = error
+                request.done = True
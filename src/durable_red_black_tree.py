@@ -0,0 +1,328 @@
+import os
+import struct
+import threading
+import zlib
+
+try:
+    from .red_black_tree import RedBlackTree
+except ImportError:
+    from red_black_tree import RedBlackTree
+
+# Write-ahead log records are fixed-size (little-endian):
+#   op (1 = insert, 2 = delete), key typecode ("q" int64 / "d" float64),
+#   8-byte key, CRC32 of the first 10 bytes
+# A record's sequence number (LSN) is its segment's base LSN plus its
+# position, counting from 1, so LSNs are never stored.
+INSERT, DELETE = 1, 2
+BODY = struct.Struct("<Bc8s")
+CRC = struct.Struct("<I")
+RECORD_SIZE = BODY.size + CRC.size
+KEY_FORMATS = {b"q": struct.Struct("<q"), b"d": struct.Struct("<d")}
+
+# checkpoint-<lsn>.rbt is a dump() of the tree after the first <lsn> records;
+# wal-<lsn>.log holds the records after <lsn>.
+CHECKPOINT_NAME = "checkpoint-{:020d}.rbt"
+SEGMENT_NAME = "wal-{:020d}.log"
+
+def _encode(op, key):
+    if isinstance(key, float):
+        typecode = b"d"
+    elif isinstance(key, int):
+        typecode = b"q"
+    else:
+        raise TypeError(f"only int and float keys can be logged, not {type(key).__name__}")
+    try:
+        body = BODY.pack(op, typecode, KEY_FORMATS[typecode].pack(key))
+    except struct.error:
+        raise OverflowError(f"key {key!r} does not fit in 64 bits") from None
+    return body + CRC.pack(zlib.crc32(body))
+
+# The records of one segment, stopping at the first torn or corrupt one, and
+# the byte length of that valid prefix.
+def _read_segment(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    records = []
+    end = 0
+    while end + RECORD_SIZE <= len(data):
+        body = data[end:end + BODY.size]
+        (checksum,) = CRC.unpack_from(data, end + BODY.size)
+        if zlib.crc32(body) != checksum:
+            break
+        op, typecode, raw = BODY.unpack(body)
+        if op not in (INSERT, DELETE) or typecode not in KEY_FORMATS:
+            break
+        records.append((op, KEY_FORMATS[typecode].unpack(raw)[0]))
+        end += RECORD_SIZE
+    return records, end
+
+def _numbered(directory, prefix, suffix):
+    files = []
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(suffix):
+            number = name[len(prefix):-len(suffix)]
+            if number.isdigit():
+                files.append((int(number), os.path.join(directory, name)))
+    return sorted(files)
+
+def _fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # e.g. Windows, where directories cannot be opened
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class DurableRedBlackTree:
+    # A RedBlackTree whose inserts and deletes survive a crash. Every write is
+    # applied to the tree and appended to a write-ahead log in `directory`;
+    # opening the directory again restores the latest checkpoint and replays
+    # the log after it. Like dump(), it stores int and float keys only, and
+    # no values.
+    #
+    #   fsync_every       1 (default): a write returns only once its record
+    #                     is on disk. Threads writing at the same time share
+    #                     fsyncs (group commit): one of them writes and syncs
+    #                     everything logged so far while the others wait for
+    #                     it, and new writes keep queueing behind it.
+    #                     N > 1: fsync once every N records instead; a crash
+    #                     can lose the last N - 1 acknowledged writes. commit()
+    #                     syncs early.
+    #   checkpoint_every  after this many records, checkpoint(): dump() the
+    #                     tree, start a new log segment and delete the old
+    #                     checkpoint and segments, bounding recovery time.
+    #                     None to only checkpoint by hand.
+    #
+    # Writes hold a lock while they change the tree, and so do reads, so one
+    # instance can be shared between threads; a checkpoint holds it for the
+    # whole O(n) dump.
+    #
+    # Reads are not isolated from unsynced writes: a write changes the tree
+    # first and is fsynced after the lock is released, so another thread can
+    # see a key whose record is not on disk yet (read uncommitted), and would
+    # lose it in a crash before that fsync. Call commit() before acting on
+    # what a read returned when that matters.
+    #
+    # If writing or fsyncing the log fails, the log is marked failed and every
+    # later write, commit() and checkpoint() raises OSError, as do the writers
+    # still waiting for that sync. Retrying is not safe: part of the batch may
+    # already be in the file, and a second fsync can report success for pages
+    # the kernel has already dropped. Records are numbered by position, so a
+    # lost or doubled one would misnumber every record after it. Reads keep
+    # working, but the tree may hold writes that never reached the log; reopen
+    # the directory to get back what did.
+    def __init__(self, directory, fsync_every=1, checkpoint_every=1_000_000, duplicates="multiset"):
+        if fsync_every < 1:
+            raise ValueError("fsync_every must be at least 1")
+        if duplicates == "counted":
+            raise ValueError("checkpoints are dump() files, which cannot store the counts of a 'counted' tree")
+        self.directory = directory
+        self.fsync_every = fsync_every
+        self.checkpoint_every = checkpoint_every
+        self._lock = threading.Lock()
+        self._synced = threading.Condition(self._lock)
+        self._syncing = False
+        self._buffer = []
+        self._failure = None  # the exception that failed the log, if any
+        os.makedirs(directory, exist_ok=True)
+        self.tree, self._checkpoint_lsn, self._lsn, segment = self._recover(duplicates)
+        self._durable_lsn = self._lsn
+        self._file = open(segment, "ab")
+
+    # Load the newest checkpoint, replay every logged record after it and
+    # cut any torn record off the end of the log. Returns the tree, the
+    # checkpoint's LSN, the last LSN and the segment to append to.
+    def _recover(self, duplicates):
+        checkpoints = _numbered(self.directory, "checkpoint-", ".rbt")
+        tree = RedBlackTree(duplicates)
+        base = 0
+        if checkpoints:
+            base, path = checkpoints[-1]
+            with RedBlackTree.open_mmap(path, verify=True) as mapped:
+                tree = RedBlackTree.from_sorted(mapped, duplicates=duplicates)
+
+        lsn = base
+        segment = None
+        segment_end = 0
+        segments = _numbered(self.directory, "wal-", ".log")
+        for i, (start, path) in enumerate(segments):
+            records, end = _read_segment(path)
+            if start > lsn:
+                raise ValueError(f"log records {lsn + 1} to {start} are missing from {self.directory}")
+            if end < os.path.getsize(path):
+                if i != len(segments) - 1:
+                    raise ValueError(f"{path} is corrupt before the end of the log")
+                with open(path, "r+b") as f:  # a write torn by the crash
+                    f.truncate(end)
+                    os.fsync(f.fileno())
+            self._replay(tree, records[max(0, lsn - start):])
+            segment, segment_end = path, start + len(records)
+            lsn = max(lsn, segment_end)
+        if segment is None or segment_end < lsn:
+            # Only segments from before the checkpoint: start a fresh one.
+            segment = os.path.join(self.directory, SEGMENT_NAME.format(lsn))
+        return tree, base, lsn, segment
+
+    # Apply records in order, a run of inserts or deletes at a time.
+    @staticmethod
+    def _replay(tree, records):
+        start = 0
+        while start < len(records):
+            op = records[start][0]
+            end = start
+            while end < len(records) and records[end][0] == op:
+                end += 1
+            keys = [key for _, key in records[start:end]]
+            if op == INSERT:
+                tree.insert_many(keys)
+            else:
+                tree.delete_many(keys)
+            start = end
+
+    # Reads
+    def __len__(self):
+        with self._lock:
+            return len(self.tree)
+
+    def search(self, key):
+        with self._lock:
+            return self.tree.search(key)
+
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    def traverse(self):
+        with self._lock:
+            return self.tree.traverse()
+
+    # Writes
+    def insert(self, key):
+        self._write(INSERT, [key], lambda keys: self.tree.insert(keys[0]))
+
+    # Returns False (and logs nothing) when the key is not in the tree.
+    def delete(self, key):
+        return self._write(DELETE, [key], lambda keys: self.tree.delete(keys[0]))
+
+    # One log append and at most one fsync for the whole batch.
+    def insert_many(self, keys):
+        self._write(INSERT, list(keys), self.tree.insert_many)
+
+    # Each key removes one copy, as with RedBlackTree.delete_many; keys that
+    # are not in the tree are logged too and skipped again on replay.
+    def delete_many(self, keys):
+        return self._write(DELETE, list(keys), self.tree.delete_many)
+
+    def _write(self, op, keys, apply):
+        records = [_encode(op, key) for key in keys]  # bad keys fail before any change
+        with self._lock:
+            self._check_log()
+            result = apply(keys)
+            if result is False or not records:
+                return result
+            self._buffer.extend(records)
+            self._lsn += len(records)
+            lsn = self._lsn
+        if self.fsync_every == 1:
+            self._sync(lsn)
+        elif lsn - self._durable_lsn >= self.fsync_every:
+            self._sync(lsn)
+        if self.checkpoint_every is not None and lsn - self._checkpoint_lsn >= self.checkpoint_every:
+            self._checkpoint(self.checkpoint_every)
+        return result
+
+    # Make every write made so far durable.
+    def commit(self):
+        with self._lock:
+            self._check_log()
+            lsn = self._lsn
+        self._sync(lsn)
+
+    # Group commit: return once the log is durable up to `lsn`. If no other
+    # thread is syncing, this one takes everything buffered so far, writes
+    # and fsyncs it without holding the lock, then wakes the waiters;
+    # otherwise it waits for that sync and checks again.
+    def _sync(self, lsn):
+        with self._synced:
+            while self._durable_lsn < lsn:
+                self._check_log()
+                if self._syncing:
+                    self._synced.wait()
+                    continue
+                buffer, self._buffer = self._buffer, []
+                target = self._lsn
+                self._syncing = True
+                self._lock.release()
+                try:
+                    self._file.write(b"".join(buffer))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                except BaseException as error:
+                    self._failure = error
+                    raise
+                finally:
+                    self._lock.acquire()
+                    self._syncing = False
+                    self._synced.notify_all()
+                self._durable_lsn = target
+
+    def _check_log(self):
+        if self._failure is not None:
+            raise OSError(f"the write-ahead log in {self.directory} failed; "
+                          "reopen the directory to recover") from self._failure
+
+    # Write a checkpoint of the current tree and drop the log before it.
+    # The checkpoint file is renamed into place only once complete (see
+    # dump_tree), and old files are deleted only after the new segment
+    # exists, so a crash at any point leaves a recoverable directory.
+    def checkpoint(self):
+        self._checkpoint(1)
+
+    # Checkpoint if at least `records` were logged since the last one; writers
+    # that cross checkpoint_every together thus take only one checkpoint.
+    def _checkpoint(self, records):
+        with self._synced:
+            while self._syncing:
+                self._synced.wait()
+            self._check_log()
+            if self._lsn - self._checkpoint_lsn < records:
+                return
+            try:
+                if self._buffer:
+                    self._file.write(b"".join(self._buffer))
+                    self._buffer = []
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except BaseException as error:
+                self._failure = error
+                raise
+            self._durable_lsn = lsn = self._lsn
+            self.tree.dump(os.path.join(self.directory, CHECKPOINT_NAME.format(lsn)))
+            segment = os.path.join(self.directory, SEGMENT_NAME.format(lsn))
+            new_file = open(segment, "ab")
+            _fsync_directory(self.directory)
+            self._file.close()
+            self._file = new_file
+            for number, path in _numbered(self.directory, "checkpoint-", ".rbt"):
+                if number < lsn:
+                    os.remove(path)
+            for number, path in _numbered(self.directory, "wal-", ".log"):
+                if number < lsn:
+                    os.remove(path)
+            _fsync_directory(self.directory)
+            self._checkpoint_lsn = lsn
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self.commit()
+            finally:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,282 @@
+import ast
+import inspect
+import textwrap
+
+try:
+    from .red_black_tree import RedBlackTree
+    from .avl import AVLTree
+    from .bst import BinarySearchTree
+except ImportError:
+    from red_black_tree import RedBlackTree
+    from avl import AVLTree
+    from bst import BinarySearchTree
+
+# Opt-in structural counters for the three tree types. Each class here is a
+# subclass that counts as it goes; the plain trees are untouched and pay
+# nothing for it.
+#
+#   rotations         single rotations (a double rotation counts as two)
+#   recolours         colour writes that actually flip a node, inside the fixups
+#   fixup_iterations  passes of the fix_insert/fix_delete loops (RBT) or nodes
+#                     visited while rebalancing upwards (AVL)
+#   comparisons       every comparison the tree makes between two keys
+#   depth             per operation, a histogram {nodes compared with: count}
+#                     for every insert, search and delete
+#
+# All of them are counted as the real code runs: rotations through the
+# overridden rotation methods, recolours and fixup passes of the Red-Black
+# Tree by instrumented fixups (see _counting_fixup), and comparisons and depth
+# by the keys themselves. An instrumented tree wraps every key it is given in
+# a _CountingKey, which counts each comparison with another wrapped key, so
+# comparisons made anywhere (batch operations and their finger searches,
+# split, set operations, sorting a batch) are included. The keys stored in
+# the tree stay wrapped: traverse() and iteration unwrap them, but nodes and
+# the other methods hand out the wrappers, which compare, hash and print like
+# the keys they hold.
+
+# Rewrite the source of one of RedBlackTree's fixup methods into a counting
+# version of it: every `node.red = ...` becomes self._recolour(node, ...), and
+# every pass of a while loop adds one to fixup_iterations. The plain tree
+# keeps its colour writes inline, and there is still only one copy of each
+# algorithm. Raises TypeError if the method has no loop or colour write left
+# to count, rather than silently counting nothing.
+class _CountFixups(ast.NodeTransformer):
+    def __init__(self):
+        self.loops = self.recolours = 0
+
+    def visit_While(self, node):
+        self.generic_visit(node)
+        self.loops += 1
+        node.body.insert(0, ast.parse("self._stats.fixup_iterations += 1").body[0])
+        return node
+
+    def visit_Assign(self, node):
+        target = node.targets[0]
+        if len(node.targets) != 1 or not isinstance(target, ast.Attribute) or target.attr != "red":
+            return node
+        self.recolours += 1
+        call = ast.parse("self._recolour(node, red)").body[0]
+        call.value.args = [target.value, node.value]
+        return call
+
+def _counting_fixup(function):
+    source = textwrap.dedent(inspect.getsource(function))
+    module = ast.parse(source)
+    ast.increment_lineno(module, function.__code__.co_firstlineno - 1)
+    counter = _CountFixups()
+    module = ast.fix_missing_locations(counter.visit(module))
+    if not counter.loops or not counter.recolours:
+        raise TypeError(f"cannot instrument {function.__qualname__}: no fixup loop or colour writes found")
+    namespace = {}
+    exec(compile(module, inspect.getsourcefile(function), "exec"), function.__globals__, namespace)
+    return namespace[function.__name__]
+
+# Counts comparisons between two wrapped keys. While an operation is being
+# recorded it also notes which keys (and so which nodes) took part, for the
+# depth histogram.
+class _CountingKey:
+    __slots__ = ("key", "stats")
+
+    def __init__(self, key, stats):
+        self.key = key
+        self.stats = stats
+
+    def _unwrap(self, other):
+        if type(other) is not _CountingKey:
+            return other
+        stats = self.stats
+        stats.comparisons += 1
+        if stats.visited is not None:
+            stats.visited.add(id(self))
+            stats.visited.add(id(other))
+        return other.key
+
+    def __eq__(self, other):
+        return self.key == self._unwrap(other)
+
+    def __ne__(self, other):
+        return self.key != self._unwrap(other)
+
+    def __lt__(self, other):
+        return self.key < self._unwrap(other)
+
+    def __le__(self, other):
+        return self.key <= self._unwrap(other)
+
+    def __gt__(self, other):
+        return self.key > self._unwrap(other)
+
+    def __ge__(self, other):
+        return self.key >= self._unwrap(other)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return repr(self.key)
+
+def _unwrapped(key):
+    return key.key if type(key) is _CountingKey else key
+
+class TreeStats:
+    OPERATIONS = ("insert", "search", "delete")
+
+    def __init__(self):
+        self.visited = None
+        self.reset()
+
+    def reset(self):
+        self.rotations = 0
+        self.recolours = 0
+        self.fixup_iterations = 0
+        self.comparisons = 0
+        self.operations = dict.fromkeys(self.OPERATIONS, 0)
+        self.depth = {op: {} for op in self.OPERATIONS}
+
+    def record_depth(self, op, depth):
+        self.operations[op] += 1
+        histogram = self.depth[op]
+        histogram[depth] = histogram.get(depth, 0) + 1
+
+    def as_dict(self):
+        total = sum(self.operations.values())
+        mean_depth = {}
+        for op, histogram in self.depth.items():
+            count = sum(histogram.values())
+            mean_depth[op] = sum(d * c for d, c in histogram.items()) / count if count else 0.0
+        return {
+            "operations": dict(self.operations),
+            "rotations": self.rotations,
+            "recolours": self.recolours,
+            "fixup_iterations": self.fixup_iterations,
+            "comparisons": self.comparisons,
+            "comparisons_per_op": self.comparisons / total if total else 0.0,
+            "mean_depth": mean_depth,
+            "depth": {op: dict(sorted(histogram.items())) for op, histogram in self.depth.items()},
+        }
+
+class _StatsMixin:
+    def stats(self):
+        return self._stats.as_dict()
+
+    def reset_stats(self):
+        self._stats.reset()
+
+    def _wrap(self, key):
+        return _CountingKey(key, self._stats)
+
+    # Run method(key, *args) on a wrapped key and record the operation's depth:
+    # the number of nodes whose keys it compared with key or with each other
+    # (key itself, which an insert stores in its new node, is not counted).
+    def _recorded(self, op, method, key, *args):
+        key = self._wrap(key)
+        stats = self._stats
+        stats.visited = set()
+        try:
+            return method(key, *args)
+        finally:
+            visited, stats.visited = stats.visited, None
+            visited.discard(id(key))
+            stats.record_depth(op, len(visited))
+
+    def traverse(self):
+        return [_unwrapped(key) for key in super().traverse()]
+
+    def search(self, key):
+        return self._recorded("search", super().search, key)
+
+    def delete(self, key):
+        return self._recorded("delete", super().delete, key)
+
+    def insert(self, key):
+        self._recorded("insert", super().insert, key)
+
+class InstrumentedRedBlackTree(_StatsMixin, RedBlackTree):
+    def __init__(self, duplicates="multiset"):
+        self._stats = TreeStats()
+        super().__init__(duplicates)
+
+    def __iter__(self):
+        return map(_unwrapped, super().__iter__())
+
+    def traverse(self):
+        return list(self)
+
+    def insert(self, key, value=None):
+        self._recorded("insert", super(_StatsMixin, self).insert, key, value)
+
+    def search(self, key, node=None):
+        if node is not None:
+            return RedBlackTree.search(self, self._wrap(key), node)
+        return self._recorded("search", super(_StatsMixin, self).search, key)
+
+    # RedBlackTree.delete looks the key up with self.search, which would count
+    # every delete as a search as well.
+    def delete(self, key):
+        return self._recorded("delete", self._delete, key)
+
+    def _delete(self, key):
+        node = RedBlackTree.search(self, key)
+        if node is None:
+            return False
+        self._remove_one(node)
+        return True
+
+    # Batch operations and split count their comparisons but no depth; each
+    # key of a batch counts as one operation.
+    def insert_many(self, keys, presorted=False):
+        keys = [self._wrap(key) for key in keys]
+        self._stats.operations["insert"] += len(keys)
+        super().insert_many(keys, presorted)
+
+    def search_many(self, keys, presorted=False):
+        keys = [self._wrap(key) for key in keys]
+        self._stats.operations["search"] += len(keys)
+        return super().search_many(keys, presorted)
+
+    def delete_many(self, keys, presorted=False):
+        keys = [self._wrap(key) for key in keys]
+        self._stats.operations["delete"] += len(keys)
+        return super().delete_many(keys, presorted)
+
+    def split(self, key):
+        return super().split(self._wrap(key))
+
+    def left_rotate(self, x):
+        self._stats.rotations += 1
+        super().left_rotate(x)
+
+    def right_rotate(self, x):
+        self._stats.rotations += 1
+        super().right_rotate(x)
+
+    fix_insert = _counting_fixup(RedBlackTree.fix_insert)
+    fix_delete = _counting_fixup(RedBlackTree.fix_delete)
+
+    # Counts only the writes that actually flip a node's colour.
+    def _recolour(self, node, red):
+        if node.red != red:
+            self._stats.recolours += 1
+            node.red = red
+
+class InstrumentedAVLTree(_StatsMixin, AVLTree):
+    def __init__(self):
+        self._stats = TreeStats()
+        super().__init__()
+
+    def _rebalance(self, node):
+        self._stats.fixup_iterations += 1
+        return super()._rebalance(node)
+
+    def _rotate_left(self, node):
+        self._stats.rotations += 1
+        return super()._rotate_left(node)
+
+    def _rotate_right(self, node):
+        self._stats.rotations += 1
+        return super()._rotate_right(node)
+
+class InstrumentedBinarySearchTree(_StatsMixin, BinarySearchTree):
+    def __init__(self, slots=True):
+        self._stats = TreeStats()
+        super().__init__(slots)
@@ -0,0 +1,182 @@
+import mmap
+import os
+import struct
+import zlib
+
+# File layout (little-endian):
+#   header:  magic, format version, key typecode ("q" int64 / "d" float64),
+#            node count, root index, CRC32 of the node records
+#   records: one fixed-size record per node in breadth-first order, so the
+#            top levels every search touches share the first pages:
+#            key, left index, right index (-1 for NIL), flags (bit 0 = red)
+MAGIC = b"RBT1"
+VERSION = 1
+HEADER = struct.Struct("<4sHcxQiI")
+RECORD_FORMATS = {b"q": struct.Struct("<qiiB3x"), b"d": struct.Struct("<diiB3x")}
+
+def _key_typecode(tree):
+    typecode = b"q"
+    for key in tree:
+        if isinstance(key, float):
+            typecode = b"d"
+        elif not isinstance(key, int):
+            raise TypeError(f"only int and float keys can be dumped, not {type(key).__name__}")
+    return typecode
+
+# Write a RedBlackTree to `path` in the binary format above. The file is
+# written next to the target and renamed into place, so readers never see a
+# partial file.
+def dump_tree(tree, path):
+    typecode = _key_typecode(tree)
+    record = RECORD_FORMATS[typecode]
+    nil = tree.NIL
+    chunks = []
+    order = [tree.root] if tree.root is not nil else []
+    i = 0
+    while i < len(order):
+        node = order[i]
+        i += 1
+        left = right = -1
+        if node.left is not nil:
+            left = len(order)
+            order.append(node.left)
+        if node.right is not nil:
+            right = len(order)
+            order.append(node.right)
+        chunks.append(record.pack(node.key, left, right, 1 if node.red else 0))
+    payload = b"".join(chunks)
+    header = HEADER.pack(MAGIC, VERSION, typecode, len(order), 0 if order else -1,
+                         zlib.crc32(payload))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class MappedRedBlackTree:
+    # Read-only Red-Black Tree served straight from a file written by
+    # RedBlackTree.dump(). Nothing is deserialised up front: every lookup
+    # unpacks only the records on its path from the memory map, so opening is
+    # O(1) and processes mapping the same file share it through the page cache.
+    def __init__(self, path, verify=False):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < HEADER.size:
+                raise ValueError(f"{path} is too short to be a tree file")
+            magic, version, typecode, count, root, checksum = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION or typecode not in RECORD_FORMATS:
+                raise ValueError(f"{path} is not a version {VERSION} tree file")
+            self._record = RECORD_FORMATS[typecode]
+            if len(self._mm) != HEADER.size + count * self._record.size:
+                raise ValueError(f"{path} is truncated")
+            # Checking the CRC reads the whole file, so it is opt-in.
+            if verify and zlib.crc32(self._mm[HEADER.size:]) != checksum:
+                raise ValueError(f"{path} failed its checksum")
+        except Exception:
+            self._mm.close()
+            raise
+        self._count = count
+        self._root = root
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _node(self, index):
+        return self._record.unpack_from(self._mm, HEADER.size + index * self._record.size)
+
+    # Returns the stored key, or None (records have no node object to return).
+    def search(self, key):
+        index = self._root
+        while index != -1:
+            node_key, left, right, _ = self._node(index)
+            if key == node_key:
+                return node_key
+            index = left if key < node_key else right
+        return None
+
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    def floor(self, key):
+        index = self._root
+        found = None
+        while index != -1:
+            node_key, left, right, _ = self._node(index)
+            if key < node_key:
+                index = left
+            else:
+                found = node_key
+                index = right
+        return found
+
+    def ceiling(self, key):
+        index = self._root
+        found = None
+        while index != -1:
+            node_key, left, right, _ = self._node(index)
+            if node_key < key:
+                index = right
+            else:
+                found = node_key
+                index = left
+        return found
+
+    def traverse(self):
+        return list(self)
+
+    def __iter__(self):
+        return self.irange()
+
+    # Lazy range scan with an explicit stack of O(log n) pending records
+    # (there are no parent pointers on disk). Same signature as RedBlackTree.irange.
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        include_min, include_max = inclusive
+
+        def below_min(key):
+            return minimum is not None and (key < minimum or (not include_min and not minimum < key))
+
+        def above_max(key):
+            return maximum is not None and (maximum < key or (not include_max and not key < maximum))
+
+        # Descend to the first key in range, stacking the nodes still to visit.
+        stack = []
+        index = self._root
+        while index != -1:
+            node = self._node(index)
+            node_key, left, right, _ = node
+            if not reverse:
+                if below_min(node_key):
+                    index = right
+                else:
+                    stack.append(node)
+                    index = left
+            else:
+                if above_max(node_key):
+                    index = left
+                else:
+                    stack.append(node)
+                    index = right
+
+        while stack:
+            node_key, left, right, _ = stack.pop()
+            if (above_max(node_key) if not reverse else below_min(node_key)):
+                return
+            yield node_key
+            index = right if not reverse else left
+            while index != -1:
+                node = self._node(index)
+                stack.append(node)
+                index = node[1] if not reverse else node[2]
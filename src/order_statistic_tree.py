@@ -0,0 +1,133 @@
+try:
+    from .red_black_tree import InvariantViolation, Node, RedBlackTree
+except ImportError:
+    from red_black_tree import InvariantViolation, Node, RedBlackTree
+
+class SizedNode(Node):
+    __slots__ = ("size",)
+
+    def __init__(self, key, red=True, parent=None, left=None, right=None, value=None):
+        super().__init__(key, red, parent, left, right, value)
+        self.size = 1  # number of keys in the subtree rooted here
+
+class OrderStatisticTree(RedBlackTree):
+    # Red-Black Tree augmented with subtree sizes, which gives O(log n)
+    # rank/select/count_range. The sizes are kept up to date by the rotations,
+    # fix_insert (on the way in) and _delete_node (before the splice).
+    node_class = SizedNode
+
+    def __init__(self, duplicates="multiset"):
+        super().__init__(duplicates)
+        self.NIL.size = 0
+
+    def _build_sorted(self, keys, values, lo, hi, parent, depth, red_depth):
+        node = super()._build_sorted(keys, values, lo, hi, parent, depth, red_depth)
+        if node is not self.NIL:
+            node.size = node.left.size + node.right.size + 1
+        return node
+
+    def fix_insert(self, node):
+        # Every ancestor of the new leaf gains one key before any rotation runs.
+        parent = node.parent
+        while parent is not None:
+            parent.size += 1
+            parent = parent.parent
+        super().fix_insert(node)
+
+    def _fix_join(self, node):
+        # _join hung node in with whole subtrees below it: recompute its size
+        # and every ancestor's, then rebalance (the rotations keep sizes right).
+        ancestor = node
+        while ancestor is not None:
+            ancestor.size = ancestor.left.size + ancestor.right.size + 1
+            ancestor = ancestor.parent
+        RedBlackTree.fix_insert(self, node)
+
+    def left_rotate(self, x):
+        size = x.size
+        super().left_rotate(x)
+        x.parent.size = size
+        x.size = x.left.size + x.right.size + 1
+
+    def right_rotate(self, x):
+        size = x.size
+        super().right_rotate(x)
+        x.parent.size = size
+        x.size = x.left.size + x.right.size + 1
+
+    def _delete_node(self, node):
+        # The node that physically leaves its position is `node` itself, or its
+        # successor when it has two children; all of that node's ancestors lose
+        # one key. The successor then takes over `node`'s (already reduced) size.
+        if node.left is self.NIL or node.right is self.NIL:
+            spliced = node
+        else:
+            spliced = self.minimum(node.right)
+        parent = spliced.parent
+        while parent is not None:
+            parent.size -= 1
+            parent = parent.parent
+        if spliced is not node:
+            spliced.size = node.size
+        super()._delete_node(node)
+
+    # Split pieces and set-operation leftovers are sized from their roots.
+    def _split_counts(self, left, right, total):
+        return left.size, right.size
+
+    def _subtree_count(self, node):
+        return node.size
+
+    def _validate_node(self, node):
+        if node.size != node.left.size + node.right.size + 1:
+            raise InvariantViolation(f"size of {node.key!r} is {node.size}, expected {node.left.size + node.right.size + 1}")
+
+    # Number of keys strictly less than key.
+    def rank(self, key):
+        node = self.root
+        rank = 0
+        while node is not self.NIL:
+            if node.key < key:
+                rank += node.left.size + 1
+                node = node.right
+            else:
+                node = node.left
+        return rank
+
+    def _count_le(self, key):
+        node = self.root
+        count = 0
+        while node is not self.NIL:
+            if key < node.key:
+                node = node.left
+            else:
+                count += node.left.size + 1
+                node = node.right
+        return count
+
+    # The k-th smallest key (0-based; negative k counts from the end).
+    def select(self, k):
+        size = self.root.size
+        if k < 0:
+            k += size
+        if not 0 <= k < size:
+            raise IndexError("select index out of range")
+        node = self.root
+        while True:
+            left_size = node.left.size
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.key
+            else:
+                k -= left_size + 1
+                node = node.right
+
+    # Number of keys with lo <= key <= hi.
+    def count_range(self, lo, hi):
+        if hi < lo:
+            return 0
+        return self._count_le(hi) - self.rank(lo)
+
+    def __len__(self):
+        return self.root.size
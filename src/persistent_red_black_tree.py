@@ -0,0 +1,291 @@
+class PersistentNode:
+    # A write copies the nodes it touches (path copying) and changes only
+    # those copies, which no version can reach until the write publishes its
+    # new root, so a node is never modified once it is published.
+    __slots__ = ("key", "red", "left", "right", "value")
+
+    def __init__(self, key, red=True, left=None, right=None, value=None):
+        self.key = key
+        self.red = red
+        self.left = left
+        self.right = right
+        self.value = value
+
+    def copy(self):
+        return PersistentNode(self.key, self.red, self.left, self.right, self.value)
+
+def _is_red(node):
+    return node is not None and node.red
+
+class PersistentRedBlackTree:
+    # Copy-on-write Red-Black Tree. insert/delete copy the O(log n) nodes on the
+    # search path (plus the few siblings the fixup recolours) and leave every
+    # other subtree shared with older versions, so snapshot() is O(1) and a
+    # snapshot can be read while the tree keeps changing. There are no parent
+    # pointers (they would make sharing impossible); the fixups walk an explicit
+    # stack of copied ancestors instead. Old versions are reclaimed by the
+    # garbage collector once nothing references their root.
+    #
+    # The current version is the (root, count) pair in _version, replaced by
+    # one assignment at the end of every write, so a snapshot taken from
+    # another thread while a write is running sees the version before it.
+    def __init__(self):
+        self._version = (None, 0)
+
+    @classmethod
+    def _from_root(cls, root, count):
+        tree = cls()
+        tree._version = (root, count)
+        return tree
+
+    @property
+    def root(self):
+        return self._version[0]
+
+    # An independent handle on the current version. Further changes to either
+    # tree never show up in the other.
+    def snapshot(self):
+        return self._from_root(*self._version)
+
+    def __len__(self):
+        return self._version[1]
+
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    def search(self, key):
+        node = self.root
+        while node is not None:
+            if key == node.key:
+                return node
+            node = node.left if key < node.key else node.right
+        return None
+
+    def traverse(self):
+        return list(self)
+
+    def __iter__(self):
+        return (node.key for node in self._nodes())
+
+    def items(self):
+        return ((node.key, node.value) for node in self._nodes())
+
+    def _nodes(self):
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    # Point old's parent (the last copied ancestor on the path) at new, and
+    # return the root of the version being built: new, if old was its root.
+    @staticmethod
+    def _replace_child(root, path, old, new):
+        if not path:
+            return new
+        if path[-1].left is old:
+            path[-1].left = new
+        else:
+            path[-1].right = new
+        return root
+
+    def insert(self, key, value=None):
+        old_root, count = self._version
+        leaf = PersistentNode(key, True, value=value)
+        if old_root is None:
+            leaf.red = False
+            self._version = (leaf, count + 1)
+            return
+
+        # Copy the search path; `path` holds the copies from the root down.
+        path = []
+        root = node = old_root.copy()
+        while True:
+            path.append(node)
+            if key < node.key:
+                if node.left is None:
+                    node.left = leaf
+                    break
+                node.left = node.left.copy()
+                node = node.left
+            else:
+                if node.right is None:
+                    node.right = leaf
+                    break
+                node.right = node.right.copy()
+                node = node.right
+
+        x = leaf
+        while path and path[-1].red:
+            parent = path.pop()
+            grandparent = path.pop()  # a red parent is never the root
+            if parent is grandparent.left:
+                uncle = grandparent.right
+                if _is_red(uncle):
+                    uncle = uncle.copy()
+                    grandparent.right = uncle
+                    parent.red = False
+                    uncle.red = False
+                    grandparent.red = True
+                    x = grandparent
+                    continue
+                if x is parent.right:
+                    parent.right = x.left
+                    x.left = parent
+                    grandparent.left = x
+                    parent = x
+                grandparent.left = parent.right
+                parent.right = grandparent
+            else:
+                uncle = grandparent.left
+                if _is_red(uncle):
+                    uncle = uncle.copy()
+                    grandparent.left = uncle
+                    parent.red = False
+                    uncle.red = False
+                    grandparent.red = True
+                    x = grandparent
+                    continue
+                if x is parent.left:
+                    parent.left = x.right
+                    x.right = parent
+                    grandparent.right = x
+                    parent = x
+                grandparent.right = parent.left
+                parent.left = grandparent
+            parent.red = False
+            grandparent.red = True
+            root = self._replace_child(root, path, grandparent, parent)
+            break
+        root.red = False
+        self._version = (root, count + 1)
+
+    # Returns False when the key is not in the tree.
+    def delete(self, key):
+        if self.search(key) is None:
+            return False
+        old_root, count = self._version
+
+        path = []
+        root = node = old_root.copy()
+        while key != node.key:
+            path.append(node)
+            if key < node.key:
+                node.left = node.left.copy()
+                node = node.left
+            else:
+                node.right = node.right.copy()
+                node = node.right
+
+        if node.left is not None and node.right is not None:
+            # Move the successor's entry into this (already copied) node and
+            # remove the successor instead.
+            target = node
+            path.append(node)
+            node.right = node.right.copy()
+            node = node.right
+            while node.left is not None:
+                path.append(node)
+                node.left = node.left.copy()
+                node = node.left
+            target.key = node.key
+            target.value = node.value
+
+        child = node.left if node.left is not None else node.right
+        x_is_left = bool(path) and path[-1].left is node
+        root = self._replace_child(root, path, node, child)
+        if not node.red:
+            if _is_red(child):
+                black_child = child.copy()
+                black_child.red = False
+                root = self._replace_child(root, path, child, black_child)
+            else:
+                root = self._fix_delete(root, path, x_is_left)
+        self._version = (root, count - 1)
+        return True
+
+    # Resolve a missing black on the (possibly empty) child of path[-1] on the
+    # given side, copying every node that is recoloured or relinked. Returns
+    # the root of the version being built.
+    def _fix_delete(self, root, path, x_is_left):
+        while path:
+            parent = path[-1]
+            if x_is_left:
+                sibling = parent.right.copy()
+                parent.right = sibling
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    parent.right = sibling.left
+                    sibling.left = parent
+                    path.pop()
+                    root = self._replace_child(root, path, parent, sibling)
+                    path.append(sibling)
+                    path.append(parent)
+                    sibling = parent.right.copy()
+                    parent.right = sibling
+                if not _is_red(sibling.left) and not _is_red(sibling.right):
+                    sibling.red = True
+                    path.pop()
+                    if parent.red:
+                        parent.red = False
+                        return root
+                    x_is_left = bool(path) and path[-1].left is parent
+                    continue
+                if not _is_red(sibling.right):
+                    nephew = sibling.left.copy()
+                    sibling.left = nephew.right
+                    nephew.right = sibling
+                    nephew.red = False
+                    sibling.red = True
+                    parent.right = nephew
+                    sibling = nephew
+                sibling.right = sibling.right.copy()
+                sibling.red = parent.red
+                parent.red = False
+                sibling.right.red = False
+                parent.right = sibling.left
+                sibling.left = parent
+            else:
+                sibling = parent.left.copy()
+                parent.left = sibling
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    parent.left = sibling.right
+                    sibling.right = parent
+                    path.pop()
+                    root = self._replace_child(root, path, parent, sibling)
+                    path.append(sibling)
+                    path.append(parent)
+                    sibling = parent.left.copy()
+                    parent.left = sibling
+                if not _is_red(sibling.left) and not _is_red(sibling.right):
+                    sibling.red = True
+                    path.pop()
+                    if parent.red:
+                        parent.red = False
+                        return root
+                    x_is_left = bool(path) and path[-1].left is parent
+                    continue
+                if not _is_red(sibling.left):
+                    nephew = sibling.right.copy()
+                    sibling.right = nephew.left
+                    nephew.left = sibling
+                    nephew.red = False
+                    sibling.red = True
+                    parent.left = nephew
+                    sibling = nephew
+                sibling.left = sibling.left.copy()
+                sibling.red = parent.red
+                parent.red = False
+                sibling.left.red = False
+                parent.left = sibling.right
+                sibling.right = parent
+            path.pop()
+            return self._replace_child(root, path, parent, sibling)
+        return root
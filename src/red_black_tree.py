@@ -1,31 +1,256 @@
-import networkx as nx
-import matplotlib.pyplot as plt
+from collections.abc import ItemsView, KeysView, ValuesView
+from bisect import bisect_left
+from itertools import islice, repeat
+from operator import itemgetter, lt
 
 class Node:
-    def __init__(self, key, color="red", parent=None, left=None, right=None):
+    __slots__ = ("key", "red", "parent", "left", "right", "value")
+    count = 1  # copies of key; only CountedNode stores its own
+
+    def __init__(self, key, red=True, parent=None, left=None, right=None, value=None):
         self.key = key
-        self.color = color  # "red" or "black"
+        self.red = red  # True for red, False for black
         self.parent = parent
         self.left = left
         self.right = right
+        self.value = value
+
+    @property
+    def color(self):
+        return "red" if self.red else "black"
+
+# Node of a "counted" tree: one per distinct key, with the number of times
+# the key is in the tree.
+class CountedNode(Node):
+    __slots__ = ("count",)
+
+    def __init__(self, key, red=True, parent=None, left=None, right=None, value=None):
+        super().__init__(key, red, parent, left, right, value)
+        self.count = 1
+
+# Marks "no default given" for pop()
+_MISSING = object()
+
+# One black NIL sentinel per node class, shared by every tree using that
+# class, so whole subtrees can move between trees (split/join) without
+# relinking their leaves. Its parent pointer is written but never read.
+_SENTINELS = {}
+
+# Raised by validate() for the first broken invariant found.
+class InvariantViolation(AssertionError):
+    pass
+
+# Duplicate-key policies: "multiset" keeps one node per inserted key (equal
+# keys go right), "replace" keeps one node per key and overwrites its value,
+# "counted" keeps one node per key with a count of its copies, so the tree
+# grows with the distinct keys rather than the inserts (the value is
+# overwritten as with "replace").
+DUPLICATE_POLICIES = ("multiset", "replace", "counted")
+
+# Raise ValueError unless the list `keys` is in ascending order, in O(m).
+def _check_ascending(keys, message):
+    if any(map(lt, islice(keys, 1, None), keys)):
+        raise ValueError(message)
+
+# Sort a batch of keys; NumPy arrays are sorted and unboxed in C with a single
+# tolist() call rather than element by element. presorted=True skips the
+# sort but still checks the order, as an unsorted batch would corrupt the
+# finger searches.
+def _sorted_batch(keys, presorted=False):
+    is_array = hasattr(keys, "dtype") and hasattr(keys, "tolist")
+    if not presorted:
+        if not is_array:
+            return sorted(keys)
+        keys = keys.copy()
+        keys.sort()
+        return keys.tolist()
+    keys = keys.tolist() if is_array else list(keys)
+    _check_ascending(keys, "presorted=True requires keys in ascending order")
+    return keys
+
+# Like _sorted_batch, but also returns each sorted key's original position.
+def _sorted_batch_with_order(keys, presorted=False):
+    if presorted:
+        keys = _sorted_batch(keys, presorted)
+        return keys, range(len(keys))
+    if hasattr(keys, "dtype") and hasattr(keys, "argsort"):
+        order = keys.argsort(kind="stable")
+        return keys[order].tolist(), order.tolist()
+    keys = list(keys)
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return [keys[i] for i in order], order
+
+# Keep only the last of each run of equal keys in sorted parallel lists.
+def _dedupe_sorted(keys, values):
+    out_keys = []
+    out_values = []
+    for key, value in zip(keys, values):
+        if out_keys and not out_keys[-1] < key:
+            out_values[-1] = value
+        else:
+            out_keys.append(key)
+            out_values.append(value)
+    return out_keys, out_values
+
+# Collapse each run of equal keys in sorted parallel lists into one entry,
+# adding up their counts (1 each if counts is None) and keeping the last value.
+def _count_sorted(keys, values, counts=None):
+    out_keys = []
+    out_values = []
+    out_counts = []
+    for key, value, count in zip(keys, values, repeat(1) if counts is None else counts):
+        if out_keys and not out_keys[-1] < key:
+            out_values[-1] = value
+            out_counts[-1] += count
+        else:
+            out_keys.append(key)
+            out_values.append(value)
+            out_counts.append(count)
+    return out_keys, out_values, out_counts
+
+# Views returned by keys()/values()/items(), walking the tree in key order.
+class RedBlackKeysView(KeysView):
+    def __reversed__(self):
+        return reversed(self._mapping)
+
+class RedBlackValuesView(ValuesView):
+    def __iter__(self):
+        for node in self._mapping._copies():
+            yield node.value
+
+    def __reversed__(self):
+        for node in self._mapping._copies(reverse=True):
+            yield node.value
+
+class RedBlackItemsView(ItemsView):
+    # ItemsView's version checks only the value of the first node for the
+    # key; in a multiset any node in the run of equal keys can hold it.
+    def __contains__(self, item):
+        key, value = item
+        tree = self._mapping
+        node = tree._ceiling_node(key)
+        while node is not None and not key < node.key:
+            if node.value is value or node.value == value:
+                return True
+            node = tree._successor(node)
+        return False
+
+    def __iter__(self):
+        for node in self._mapping._copies():
+            yield (node.key, node.value)
+
+    def __reversed__(self):
+        for node in self._mapping._copies(reverse=True):
+            yield (node.key, node.value)
 
 class RedBlackTree:
-    def __init__(self):
-        self.NIL = Node(key=None, color="black")  # Sentinel NIL node (black)
+    node_class = Node
+
+    # delete_many() batches at least this large relative to the tree are
+    # applied by rebuilding the tree from the surviving keys (O(n + m))
+    # instead of descending once per key.
+    BULK_MERGE_RATIO = 1.0
+
+    # insert_many() splices a stretch of batch keys that all fall between the
+    # same two neighbours in the tree in as one subtree (see _insert_run) once
+    # it is longer than about 2 * BULK_RUN_FACTOR * log2(n + m) keys, instead
+    # of descending once per key.
+    BULK_RUN_FACTOR = 2
+
+    def __init__(self, duplicates="multiset"):
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError(f"duplicates must be one of {DUPLICATE_POLICIES}, not {duplicates!r}")
+        self.duplicates = duplicates
+        if duplicates == "counted":
+            if self.node_class is not Node:
+                raise ValueError(f"{type(self).__name__} does not support duplicates='counted'")
+            self.node_class = CountedNode
+        nil = _SENTINELS.get(self.node_class)
+        if nil is None:
+            nil = _SENTINELS[self.node_class] = self.node_class(key=None, red=False)
+        self.NIL = nil  # Sentinel NIL node (black)
+        self.root = self.NIL
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    # Build a tree from keys already in ascending order in O(n), without rotations.
+    # The middle key of every range becomes the subtree root, so all leaves sit on
+    # the last two levels; colouring the deepest level red keeps black heights equal.
+    # `values`, if given, is a parallel iterable of payloads.
+    @classmethod
+    def from_sorted(cls, keys, values=None, duplicates="multiset"):
+        keys = list(keys)
+        _check_ascending(keys, "from_sorted() requires keys in ascending order")
+        values = list(values) if values is not None else [None] * len(keys)
+        if len(values) != len(keys):
+            raise ValueError("from_sorted() needs exactly one value per key")
+
+        tree = cls(duplicates=duplicates)
+        tree._rebuild(keys, values)
+        return tree
+
+    # Same as from_sorted() for keys in any order.
+    @classmethod
+    def from_iterable(cls, keys, values=None, duplicates="multiset"):
+        if values is None:
+            return cls.from_sorted(sorted(keys), duplicates=duplicates)
+        items = sorted(zip(keys, values), key=itemgetter(0))
+        return cls.from_sorted([k for k, _ in items], [v for _, v in items], duplicates)
+
+    # `counts`, if given, is the number of copies of each key; only "counted"
+    # trees keep it.
+    def _rebuild(self, keys, values, counts=None):
+        if self.duplicates == "replace":
+            keys, values = _dedupe_sorted(keys, values)
+        elif self.duplicates == "counted":
+            keys, values, counts = _count_sorted(keys, values, counts)
         self.root = self.NIL
+        if keys:
+            red_depth = len(keys).bit_length() - 1
+            self.root = self._build_sorted(keys, values, 0, len(keys), None, 0, red_depth)
+        if self.duplicates == "counted":
+            for node, count in zip(self._nodes(), counts):
+                node.count = count
+            self._count = sum(counts)
+        else:
+            self._count = len(keys)
+
+    def _build_sorted(self, keys, values, lo, hi, parent, depth, red_depth):
+        if lo >= hi:
+            return self.NIL
+        mid = (lo + hi) // 2
+        red = depth == red_depth and depth > 0
+        node = self.node_class(key=keys[mid], red=red, parent=parent, value=values[mid])
+        node.left = self._build_sorted(keys, values, lo, mid, node, depth + 1, red_depth)
+        node.right = self._build_sorted(keys, values, mid + 1, hi, node, depth + 1, red_depth)
+        return node
 
-    def insert(self, key):
-        new_node = Node(key=key, color="red", left=self.NIL, right=self.NIL)
+    def insert(self, key, value=None):
+        self._insert_from(self.root, key, value)
+
+    # Insert below `current`, which must be the root or a node whose subtree
+    # range admits `key` (see _climb); returns the new (or updated) node.
+    def _insert_from(self, current, key, value=None):
+        distinct = self.duplicates != "multiset"
         parent = None
-        current = self.root
 
-        while current != self.NIL:
+        while current is not self.NIL:
+            if distinct and key == current.key:
+                current.value = value
+                if self.duplicates == "counted":
+                    current.count += 1
+                    self._count += 1
+                return current
             parent = current
-            if new_node.key < current.key:
+            if key < current.key:
                 current = current.left
             else:
                 current = current.right
 
+        new_node = self.node_class(key=key, red=True, left=self.NIL, right=self.NIL, value=value)
+
         new_node.parent = parent
         if parent is None:
             self.root = new_node
@@ -34,49 +259,51 @@ class RedBlackTree:
         else:
             parent.right = new_node
 
+        self._count += 1
         self.fix_insert(new_node)
+        return new_node
 
     def fix_insert(self, node):
-        while node.parent and node.parent.color == "red":
-            if node.parent == node.parent.parent.left:
+        while node.parent is not None and node.parent.red:
+            if node.parent is node.parent.parent.left:
                 uncle = node.parent.parent.right
-                if uncle.color == "red":
-                    node.parent.color = "black"
-                    uncle.color = "black"
-                    node.parent.parent.color = "red"
+                if uncle.red:
+                    node.parent.red = False
+                    uncle.red = False
+                    node.parent.parent.red = True
                     node = node.parent.parent
                 else:
-                    if node == node.parent.right:
+                    if node is node.parent.right:
                         node = node.parent
                         self.left_rotate(node)
-                    node.parent.color = "black"
-                    node.parent.parent.color = "red"
+                    node.parent.red = False
+                    node.parent.parent.red = True
                     self.right_rotate(node.parent.parent)
             else:
                 uncle = node.parent.parent.left
-                if uncle.color == "red":
-                    node.parent.color = "black"
-                    uncle.color = "black"
-                    node.parent.parent.color = "red"
+                if uncle.red:
+                    node.parent.red = False
+                    uncle.red = False
+                    node.parent.parent.red = True
                     node = node.parent.parent
                 else:
-                    if node == node.parent.left:
+                    if node is node.parent.left:
                         node = node.parent
                         self.right_rotate(node)
-                    node.parent.color = "black"
-                    node.parent.parent.color = "red"
+                    node.parent.red = False
+                    node.parent.parent.red = True
                     self.left_rotate(node.parent.parent)
-        self.root.color = "black"
+        self.root.red = False
 
     def left_rotate(self, x):
         y = x.right
         x.right = y.left
-        if y.left != self.NIL:
+        if y.left is not self.NIL:
             y.left.parent = x
         y.parent = x.parent
         if x.parent is None:
             self.root = y
-        elif x == x.parent.left:
+        elif x is x.parent.left:
             x.parent.left = y
         else:
             x.parent.right = y
@@ -86,12 +313,12 @@ class RedBlackTree:
     def right_rotate(self, x):
         y = x.left
         x.left = y.right
-        if y.right != self.NIL:
+        if y.right is not self.NIL:
             y.right.parent = x
         y.parent = x.parent
         if x.parent is None:
             self.root = y
-        elif x == x.parent.right:
+        elif x is x.parent.right:
             x.parent.right = y
         else:
             x.parent.left = y
@@ -99,149 +326,968 @@ class RedBlackTree:
         x.parent = y
 
     def traverse(self):
-        result = []
-        self._inorder_helper(self.root, result)
-        return result
+        return list(self)
 
-    def _inorder_helper(self, node, result):
-        if node != self.NIL:
-            self._inorder_helper(node.left, result)
-            result.append(node.key)
-            self._inorder_helper(node.right, result)
+    # Every node once per copy of its key (so once, unless "counted").
+    def _copies(self, reverse=False):
+        if self.duplicates != "counted":
+            return self._nodes(reverse)
+        return (node for node in self._nodes(reverse) for _ in range(node.count))
 
-    def search(self, key, node=None):
-        if node is None:
-            node = self.root
+    def _nodes(self, reverse=False):
+        if self.root is self.NIL:
+            return
+        if reverse:
+            node = self.maximum(self.root)
+            while node is not None:
+                yield node
+                node = self._predecessor(node)
+        else:
+            node = self.minimum(self.root)
+            while node is not None:
+                yield node
+                node = self._successor(node)
 
-        if node == self.NIL or key == node.key:
-            return node if node != self.NIL else None
+    # In-order iteration follows parent pointers, so it needs no recursion or
+    # stack and only does work for the keys actually consumed. The copies of a
+    # key in a "counted" tree are repeated as they are consumed, too.
+    def __iter__(self):
+        if self.duplicates == "counted":
+            for node in self._nodes():
+                yield from repeat(node.key, node.count)
+            return
+        if self.root is self.NIL:
+            return
+        node = self.minimum(self.root)
+        while node is not None:
+            yield node.key
+            node = self._successor(node)
+
+    def __reversed__(self):
+        if self.duplicates == "counted":
+            for node in self._nodes(reverse=True):
+                yield from repeat(node.key, node.count)
+            return
+        if self.root is self.NIL:
+            return
+        node = self.maximum(self.root)
+        while node is not None:
+            yield node.key
+            node = self._predecessor(node)
 
-        if key < node.key:
-            return self.search(key, node.left)
+    # Lazily yield keys between minimum and maximum (None means unbounded),
+    # in O(log n + k) for k keys consumed. Same signature as SortedList.irange.
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), reverse=False):
+        include_min, include_max = inclusive
+        counted = self.duplicates == "counted"
+        if not reverse:
+            if minimum is None:
+                node = self.minimum(self.root) if self.root is not self.NIL else None
+            elif include_min:
+                node = self._ceiling_node(minimum)
+            else:
+                node = self._higher_node(minimum)
+            while node is not None:
+                if maximum is not None:
+                    if maximum < node.key or (not include_max and not node.key < maximum):
+                        return
+                if counted:
+                    yield from repeat(node.key, node.count)
+                else:
+                    yield node.key
+                node = self._successor(node)
         else:
-            return self.search(key, node.right)
+            if maximum is None:
+                node = self.maximum(self.root) if self.root is not self.NIL else None
+            elif include_max:
+                node = self._floor_node(maximum)
+            else:
+                node = self._lower_node(maximum)
+            while node is not None:
+                if minimum is not None:
+                    if node.key < minimum or (not include_min and not minimum < node.key):
+                        return
+                if counted:
+                    yield from repeat(node.key, node.count)
+                else:
+                    yield node.key
+                node = self._predecessor(node)
 
+    def search(self, key, node=None):
+        nil = self.NIL
+        if node is None:
+            node = self.root
+        while node is not nil:
+            node_key = node.key
+            if key == node_key:
+                return node
+            node = node.left if key < node_key else node.right
+        return None
+
+    # Returns False (instead of raising) when the key is not in the tree.
+    # Removes one copy of a key that is in the tree more than once.
     def delete(self, key):
         node = self.search(key)
         if node is None:
-            print(f"Key {key} not found in the tree. No deletion performed.")
-            return
+            return False
+        self._remove_one(node)
+        return True
+
+    # Multiset interface. With "counted" each of these is one O(log n)
+    # descent; with "multiset" they visit every copy of the key.
+    def count(self, key):
+        if self.duplicates == "multiset":
+            copies = 0
+            node = self._ceiling_node(key)
+            while node is not None and not key < node.key:
+                copies += 1
+                node = self._successor(node)
+            return copies
+        node = self.search(key)
+        return node.count if node is not None else 0
+
+    def remove_one(self, key):
+        return self.delete(key)
+
+    # Returns the number of copies removed.
+    def remove_all(self, key):
+        removed = 0
+        node = self.search(key)
+        while node is not None:
+            removed += node.count
+            self._delete_node(node)
+            node = self.search(key)
+        return removed
 
+    # Drop one copy of node's key: the node itself, unless it counts several.
+    def _remove_one(self, node):
+        if node.count > 1:
+            node.count -= 1
+            self._count -= 1
+        else:
+            self._delete_node(node)
+
+    def _delete_node(self, node):
+        self._count -= node.count
         y = node
-        y_original_color = y.color
-        if node.left == self.NIL:
+        y_was_red = y.red
+        if node.left is self.NIL:
             x = node.right
+            x_parent = node.parent
             self._transplant(node, node.right)
-        elif node.right == self.NIL:
+        elif node.right is self.NIL:
             x = node.left
+            x_parent = node.parent
             self._transplant(node, node.left)
         else:
             y = self.minimum(node.right)
-            y_original_color = y.color
+            y_was_red = y.red
             x = y.right
-            if y.parent == node:
-                x.parent = y
+            if y.parent is node:
+                x_parent = y
             else:
+                x_parent = y.parent
                 self._transplant(y, y.right)
                 y.right = node.right
                 y.right.parent = y
             self._transplant(node, y)
             y.left = node.left
             y.left.parent = y
-            y.color = node.color
+            y.red = node.red
 
-        if y_original_color == "black":
-            self.fix_delete(x)
+        if not y_was_red:
+            self.fix_delete(x, x_parent)
 
     def _transplant(self, u, v):
         if u.parent is None:
             self.root = v
-        elif u == u.parent.left:
+        elif u is u.parent.left:
             u.parent.left = v
         else:
             u.parent.right = v
         v.parent = u.parent
 
     def minimum(self, node):
-        while node.left != self.NIL:
+        while node.left is not self.NIL:
             node = node.left
         return node
 
-    def fix_delete(self, x):
-        while x != self.root and x.color == "black":
-            if x == x.parent.left:
-                sibling = x.parent.right
-                if sibling.color == "red":
-                    sibling.color = "black"
-                    x.parent.color = "red"
-                    self.left_rotate(x.parent)
-                    sibling = x.parent.right
-                if sibling.left.color == "black" and sibling.right.color == "black":
-                    sibling.color = "red"
-                    x = x.parent
+    def maximum(self, node):
+        while node.right is not self.NIL:
+            node = node.right
+        return node
+
+    # In-order neighbours of a node (None past either end).
+    def _successor(self, node):
+        if node.right is not self.NIL:
+            return self.minimum(node.right)
+        while node.parent is not None and node is node.parent.right:
+            node = node.parent
+        return node.parent
+
+    def _predecessor(self, node):
+        if node.left is not self.NIL:
+            return self.maximum(node.left)
+        while node.parent is not None and node is node.parent.left:
+            node = node.parent
+        return node.parent
+
+    # Bisect-style navigation: the first node >= / > key and the last node <= / < key.
+    def _ceiling_node(self, key):
+        node = self.root
+        found = None
+        while node is not self.NIL:
+            if node.key < key:
+                node = node.right
+            else:
+                found = node
+                node = node.left
+        return found
+
+    def _higher_node(self, key):
+        node = self.root
+        found = None
+        while node is not self.NIL:
+            if key < node.key:
+                found = node
+                node = node.left
+            else:
+                node = node.right
+        return found
+
+    def _floor_node(self, key):
+        node = self.root
+        found = None
+        while node is not self.NIL:
+            if key < node.key:
+                node = node.left
+            else:
+                found = node
+                node = node.right
+        return found
+
+    def _lower_node(self, key):
+        node = self.root
+        found = None
+        while node is not self.NIL:
+            if node.key < key:
+                found = node
+                node = node.right
+            else:
+                node = node.left
+        return found
+
+    # Key-level navigation; each returns None when there is no such key.
+    def floor(self, key):
+        node = self._floor_node(key)
+        return node.key if node is not None else None
+
+    def ceiling(self, key):
+        node = self._ceiling_node(key)
+        return node.key if node is not None else None
+
+    def successor(self, key):
+        node = self._higher_node(key)
+        return node.key if node is not None else None
+
+    def predecessor(self, key):
+        node = self._lower_node(key)
+        return node.key if node is not None else None
+
+    def min(self):
+        return self.minimum(self.root).key if self.root is not self.NIL else None
+
+    def max(self):
+        return self.maximum(self.root).key if self.root is not self.NIL else None
+
+    # Batch operations. Keys are processed in ascending order and every descent
+    # starts from the previous one's finger, climbing only as far as needed.
+    # Keys go in a block of `run` = BULK_RUN_FACTOR * log2(n + m) descents at
+    # a time. After each block, if the next `run` keys all sort below the key
+    # that follows the last one inserted, every batch key in that gap goes in
+    # at once with one split and two joins, so a long stretch of new keys
+    # (appended at the end, filling a hole, or into an empty tree) costs
+    # O(stretch + log n) rather than one descent per key. Any stretch of
+    # 2 * run keys is caught; shorter ones may go in by descent.
+    def insert_many(self, keys, presorted=False):
+        keys = _sorted_batch(keys, presorted)
+        run = max(1, self.BULK_RUN_FACTOR * (len(self) + len(keys)).bit_length())
+        finger = None
+        i = 0
+        while i < len(keys):
+            for key in keys[i:i + run]:
+                finger = self._insert_from(self._climb(finger, key), key)
+            i += run
+            if i + run <= len(keys) and key < keys[i]:
+                bound = self._successor(finger)
+                if bound is None or keys[i + run - 1] < bound.key:
+                    end = len(keys) if bound is None else bisect_left(keys, bound.key, i + run)
+                    self._insert_run(keys[i:end])
+                    finger = None
+                    i = end
+
+    # Splice in sorted keys that all fall strictly between two neighbouring
+    # keys of the tree: build them into a subtree in O(len(keys)), split the
+    # tree where they go and join the three parts, O(log n).
+    def _insert_run(self, keys):
+        run = type(self)(duplicates=self.duplicates)
+        run._rebuild(keys, [None] * len(keys))
+        count = len(self) + len(run)
+        run_root, run_bh = run._take_root()
+        root, black_height = self._take_root()
+        low, low_bh, high, high_bh = self._split(root, black_height, keys[0], False)
+        root, black_height = self._join2(low, low_bh, run_root, run_bh)
+        root, _ = self._join2(root, black_height, high, high_bh)
+        self.root = self._detached_root(root)
+        self._count = count
+
+    def delete_many(self, keys, presorted=False):
+        keys = _sorted_batch(keys, presorted)
+        if not keys:
+            return 0
+        if len(keys) >= self.BULK_MERGE_RATIO * len(self):
+            # Each batch entry removes one matching key, like delete() would.
+            remaining_keys = []
+            remaining_values = []
+            remaining_counts = []
+            removed = 0
+            j = 0
+            for node in self._nodes():
+                key = node.key
+                copies = node.count
+                while j < len(keys) and keys[j] < key:
+                    j += 1
+                while copies and j < len(keys) and keys[j] == key:
+                    j += 1
+                    copies -= 1
+                    removed += 1
+                if copies:
+                    remaining_keys.append(key)
+                    remaining_values.append(node.value)
+                    remaining_counts.append(copies)
+            if removed:
+                self._rebuild(remaining_keys, remaining_values, remaining_counts)
+            return removed
+        removed = 0
+        finger = None
+        for key in keys:
+            node, last = self._finger_search(finger, key)
+            if node is None:
+                finger = last
+                continue
+            # The predecessor survives the delete and is <= every later key
+            # (as is node itself if only one of its copies goes).
+            finger = node if node.count > 1 else self._predecessor(node)
+            self._remove_one(node)
+            removed += 1
+        return removed
+
+    # Returns the search() result for every key, in the order given.
+    def search_many(self, keys, presorted=False):
+        keys, order = _sorted_batch_with_order(keys, presorted)
+        results = [None] * len(keys)
+        finger = None
+        for i, key in zip(order, keys):
+            results[i], finger = self._finger_search(finger, key)
+        return results
+
+    # Climb from the finger (a node whose subtree lower bound is <= key) until
+    # the subtree's upper bound is above key. None means start from the root.
+    def _climb(self, node, key):
+        if node is None:
+            return self.root
+        parent = node.parent
+        while parent is not None and not (node is parent.left and key < parent.key):
+            node = parent
+            parent = node.parent
+        return node
+
+    def _finger_search(self, finger, key):
+        node = self._climb(finger, key)
+        last = None
+        while node is not self.NIL:
+            if key == node.key:
+                return node, node
+            last = node
+            node = node.left if key < node.key else node.right
+        return None, last
+
+    # Split, join and set operations (join-based, after Blelloch, Ferizovic
+    # and Sun, "Just Join for Parallel Ordered Sets"). They move whole
+    # subtrees between trees instead of re-inserting keys, so the trees they
+    # are given are consumed: their nodes end up in the result and they are
+    # left empty. Use copy() first to keep an input. All of them work on
+    # detached subtree roots paired with their black height (black nodes from
+    # the root down to NIL), using self only for its rotations. Each keeps
+    # len() exact from the sizes of the pieces it moves.
+
+    # Independent tree with the same keys and values, in O(n).
+    def copy(self):
+        nodes = list(self._nodes())
+        tree = type(self)(duplicates=self.duplicates)
+        tree._rebuild([node.key for node in nodes], [node.value for node in nodes], [node.count for node in nodes])
+        return tree
+
+    # Split into (keys < key, keys >= key); self is left empty. The split
+    # itself is O(log n); sizing the halves costs O(min(|left|, |right|))
+    # more (see _split_counts).
+    def split(self, key):
+        total = len(self)
+        root, black_height = self._take_root()
+        left, left_bh, right, right_bh = self._split(root, black_height, key, False)
+        self.root = self.NIL  # _join used self as scratch space
+        left_count, right_count = self._split_counts(left, right, total)
+        return self._adopt(left, left_count), self._adopt(right, right_count)
+
+    # A tree holding left's keys, then key, then right's keys, in
+    # O(|black height difference| + 1) = O(log n). Every key in left must be
+    # <= key <= every key in right (strictly, unless the policy is "multiset");
+    # both trees are left empty.
+    @classmethod
+    def join(cls, left, key, right, value=None):
+        result = cls(duplicates=left.duplicates)
+        result._check_joinable(left, right)
+        strict = left.duplicates != "multiset"
+        nil = result.NIL
+        if left.root is not nil:
+            highest = left.maximum(left.root).key
+            if key < highest or (strict and not highest < key):
+                raise ValueError("join() needs every key in left to be below key")
+        if right.root is not nil:
+            lowest = right.minimum(right.root).key
+            if lowest < key or (strict and not key < lowest):
+                raise ValueError("join() needs every key in right to be above key")
+        count = len(left) + 1 + len(right)
+        left_root, left_bh = left._take_root()
+        right_root, right_bh = right._take_root()
+        mid = result.node_class(key=key, value=value, left=nil, right=nil)
+        root, _ = result._join(left_root, left_bh, mid, right_root, right_bh)
+        result.root = root
+        result._count = count
+        return result
+
+    # In-place set operations, named like set's: self becomes the result and
+    # other is consumed, i.e. left empty (pass other.copy() to keep it).
+    # They cost O(m log(n/m + 1)) for trees of sizes m <= n: other is walked
+    # from the root down, self is split around each of its keys, and the
+    # recursion stops as soon as either side runs out.
+
+    # Keys from both trees; for "replace" trees a key in both keeps other's
+    # value (like dict.update). In "multiset" mode every copy is kept; in
+    # "counted" mode the counts of a key in both add up (other's value wins).
+    def union_update(self, other):
+        total = len(self) + len(other)
+        self._count = total - self._set_operation(other, self._union)
+
+    # Keep the entries of self whose key is also in other.
+    def intersection_update(self, other):
+        self._count = self._set_operation(other, self._intersection)
+
+    # Keep the entries of self whose key is not in other.
+    def difference_update(self, other):
+        total = len(self)
+        self._count = total - self._set_operation(other, self._difference)
+
+    # Run operation on the two detached roots and install the result as
+    # self's root. Returns the number of keys operation tallied: dropped by
+    # _union and _difference, kept by _intersection.
+    def _set_operation(self, other, operation):
+        self._check_joinable(self, other)
+        if self.duplicates != other.duplicates:
+            raise ValueError("set operations need trees with the same duplicates policy")
+        a, a_bh = self._take_root()
+        b, b_bh = other._take_root()
+        self._tally = 0
+        root, _ = operation(a, a_bh, b, b_bh)
+        self.root = self._detached_root(root)
+        return self._tally
+
+    def _check_joinable(self, left, right):
+        if left.NIL is not self.NIL or right.NIL is not self.NIL:
+            raise TypeError("only trees with the same node class can be joined")
+
+    # Detach this tree's root, leaving the tree empty.
+    def _take_root(self):
+        root = self.root
+        black_height = self._black_height(root)
+        self.root = self.NIL
+        self._count = 0
+        if root is not self.NIL:
+            root.parent = None
+        return root, black_height
+
+    # A new tree of the same type around a detached root holding count keys.
+    def _adopt(self, root, count):
+        tree = type(self)(duplicates=self.duplicates)
+        tree.root = self._detached_root(root)
+        tree._count = count
+        return tree
+
+    # A detached subtree root made fit to be a tree's root.
+    def _detached_root(self, root):
+        if root is not self.NIL:
+            root.parent = None
+            if root.red:
+                root.red = False
+        return root
+
+    # Key counts of the two halves of a split of a tree of `total` keys. The
+    # nodes carry no subtree sizes, so this walks both halves side by side
+    # and stops when the smaller one runs out: O(min(|left|, |right|)).
+    # Subclasses with subtree sizes answer in O(1).
+    def _split_counts(self, left, right, total):
+        halves = [self._node_counts(left), self._node_counts(right)]
+        seen = [0, 0]
+        while True:
+            for side in (0, 1):
+                count = next(halves[side], None)
+                if count is None:
+                    return (seen[0], total - seen[0]) if side == 0 else (total - seen[1], seen[1])
+                seen[side] += count
+
+    # Keys in the detached subtree under node, in O(its size).
+    def _subtree_count(self, node):
+        return sum(self._node_counts(node))
+
+    # node.count for every node of the subtree, in no particular order.
+    def _node_counts(self, node):
+        nil = self.NIL
+        stack = [node] if node is not nil else []
+        while stack:
+            node = stack.pop()
+            yield node.count
+            if node.right is not nil:
+                stack.append(node.right)
+            if node.left is not nil:
+                stack.append(node.left)
+
+    def _black_height(self, node):
+        height = 0
+        while node is not self.NIL:
+            if not node.red:
+                height += 1
+            node = node.left
+        return height
+
+    # Join two detached subtrees around the detached node mid. Walks down the
+    # spine of the taller tree to a black node as tall as the other tree, hangs
+    # mid there as a red node and fixes it up like an insertion.
+    def _join(self, left, left_bh, mid, right, right_bh):
+        nil = self.NIL
+        if left.red:
+            left.red = False
+            left_bh += 1
+        if right.red:
+            right.red = False
+            right_bh += 1
+        mid.parent = None
+        if left_bh == right_bh:
+            mid.red = False
+            mid.left = left
+            mid.right = right
+            if left is not nil:
+                left.parent = mid
+            if right is not nil:
+                right.parent = mid
+            self.root = mid
+            self._fix_join(mid)
+            return mid, left_bh + 1
+
+        if left_bh > right_bh:
+            root = node = left
+            height = left_bh
+            while node.red or height > right_bh:
+                if not node.red:
+                    height -= 1
+                parent = node  # node may end up as NIL, whose parent is meaningless
+                node = node.right
+            parent.right = mid
+            mid.left = node
+            mid.right = right
+        else:
+            root = node = right
+            height = right_bh
+            while node.red or height > left_bh:
+                if not node.red:
+                    height -= 1
+                parent = node
+                node = node.left
+            parent.left = mid
+            mid.left = left
+            mid.right = node
+        mid.red = True
+        mid.parent = parent
+        if mid.left is not nil:
+            mid.left.parent = mid
+        if mid.right is not nil:
+            mid.right.parent = mid
+        # The fixup keeps the black height unless it ends with a recolouring at
+        # the root (two red children turned black), which adds one.
+        both_red = root.left.red and root.right.red
+        self.root = root
+        self._fix_join(mid)
+        grew = self.root is root and both_red and not root.left.red and not root.right.red
+        return self.root, max(left_bh, right_bh) + grew
+
+    # Rebalance after _join hung `node` (with its subtrees) into the tree.
+    def _fix_join(self, node):
+        if node.parent is not None and node.parent.red:
+            self.fix_insert(node)
+
+    # Join without a middle key: the last node of left becomes the middle.
+    def _join2(self, left, left_bh, right, right_bh):
+        if left is self.NIL:
+            return right, right_bh
+        rest, rest_bh, last = self._split_last(left, left_bh)
+        return self._join(rest, rest_bh, last, right, right_bh)
+
+    # Detach the children of node (a detached subtree root) and return them
+    # with their black height.
+    def _open(self, node, black_height):
+        nil = self.NIL
+        left, right = node.left, node.right
+        if left is not nil:
+            left.parent = None
+        if right is not nil:
+            right.parent = None
+        node.left = node.right = nil
+        return left, right, black_height - (0 if node.red else 1)
+
+    def _split_last(self, node, black_height):
+        left, right, child_bh = self._open(node, black_height)
+        if right is self.NIL:
+            return left, child_bh, node
+        rest, rest_bh, last = self._split_last(right, child_bh)
+        root, root_bh = self._join(left, child_bh, node, rest, rest_bh)
+        return root, root_bh, last
+
+    # Split a detached subtree into keys below key and the rest; with
+    # inclusive=True keys equal to key go to the first part instead.
+    def _split(self, node, black_height, key, inclusive):
+        nil = self.NIL
+        if node is nil:
+            return nil, 0, nil, 0
+        goes_left = not key < node.key if inclusive else node.key < key
+        # Same as self._open(node, black_height), inlined: this is the hot loop.
+        left, right = node.left, node.right
+        if left is not nil:
+            left.parent = None
+        if right is not nil:
+            right.parent = None
+        node.left = node.right = nil
+        child_bh = black_height - (0 if node.red else 1)
+        if goes_left:
+            low, low_bh, high, high_bh = self._split(right, child_bh, key, inclusive)
+            low, low_bh = self._join(left, child_bh, node, low, low_bh)
+        else:
+            low, low_bh, high, high_bh = self._split(left, child_bh, key, inclusive)
+            high, high_bh = self._join(high, high_bh, node, right, child_bh)
+        return low, low_bh, high, high_bh
+
+    # (keys < key, keys == key, keys > key)
+    def _split3(self, node, black_height, key):
+        low, low_bh, rest, rest_bh = self._split(node, black_height, key, False)
+        equal, equal_bh, high, high_bh = self._split(rest, rest_bh, key, True)
+        return low, low_bh, equal, equal_bh, high, high_bh
+
+    def _union(self, a, a_bh, b, b_bh):
+        nil = self.NIL
+        if a is nil:
+            return b, b_bh
+        if b is nil:
+            return a, a_bh
+        b_left, b_right, child_bh = self._open(b, b_bh)
+        if self.duplicates == "multiset":
+            low, low_bh, high, high_bh = self._split(a, a_bh, b.key, False)
+        else:
+            low, low_bh, equal, _, high, high_bh = self._split3(a, a_bh, b.key)  # b's entry wins
+            if equal is not nil:
+                if self.duplicates == "counted":
+                    b.count += equal.count
+                else:
+                    self._tally += self._subtree_count(equal)
+        left, left_bh = self._union(low, low_bh, b_left, child_bh)
+        right, right_bh = self._union(high, high_bh, b_right, child_bh)
+        return self._join(left, left_bh, b, right, right_bh)
+
+    def _intersection(self, a, a_bh, b, b_bh):
+        nil = self.NIL
+        if a is nil or b is nil:
+            return nil, 0
+        b_left, b_right, child_bh = self._open(b, b_bh)
+        low, low_bh, equal, equal_bh, high, high_bh = self._split3(a, a_bh, b.key)
+        self._tally += self._subtree_count(equal)
+        left, left_bh = self._intersection(low, low_bh, b_left, child_bh)
+        right, right_bh = self._intersection(high, high_bh, b_right, child_bh)
+        left, left_bh = self._join2(left, left_bh, equal, equal_bh)
+        return self._join2(left, left_bh, right, right_bh)
+
+    def _difference(self, a, a_bh, b, b_bh):
+        nil = self.NIL
+        if a is nil:
+            return nil, 0
+        if b is nil:
+            return a, a_bh
+        b_left, b_right, child_bh = self._open(b, b_bh)
+        low, low_bh, equal, _, high, high_bh = self._split3(a, a_bh, b.key)
+        self._tally += self._subtree_count(equal)
+        left, left_bh = self._difference(low, low_bh, b_left, child_bh)
+        right, right_bh = self._difference(high, high_bh, b_right, child_bh)
+        return self._join2(left, left_bh, right, right_bh)
+
+    # Mapping interface, modelled on sortedcontainers.SortedDict. With the
+    # "multiset" policy these act on the first node search() finds for a key;
+    # with "counted", on the key's node, so del and pop drop every copy.
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    def __getitem__(self, key):
+        node = self.search(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+
+    def __setitem__(self, key, value):
+        node = self.search(key)
+        if node is None:
+            self.insert(key, value)
+        else:
+            node.value = value
+
+    def __delitem__(self, key):
+        node = self.search(key)
+        if node is None:
+            raise KeyError(key)
+        self._delete_node(node)
+
+    def get(self, key, default=None):
+        node = self.search(key)
+        return node.value if node is not None else default
+
+    def setdefault(self, key, default=None):
+        node = self.search(key)
+        if node is None:
+            self.insert(key, default)
+            return default
+        return node.value
+
+    def pop(self, key, default=_MISSING):
+        node = self.search(key)
+        if node is None:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        value = node.value
+        self._delete_node(node)
+        return value
+
+    # Remove and return the (key, value) at position index in items() order,
+    # the last one by default, like SortedDict.popitem ("counted" trees drop
+    # every copy of the key, as pop() does). O(log n) for 0 and -1, O(n) for
+    # other positions.
+    def popitem(self, index=-1):
+        if self.root is self.NIL:
+            raise KeyError("popitem(): tree is empty")
+        if index < 0:
+            node = next(islice(self._copies(reverse=True), -index - 1, None), None)
+        else:
+            node = next(islice(self._copies(), index, None), None)
+        if node is None:
+            raise IndexError("popitem index out of range")
+        self._delete_node(node)
+        return node.key, node.value
+
+    # Set every key of a mapping or iterable of pairs, then of kwargs, like
+    # dict.update.
+    def update(self, other=(), **kwargs):
+        pairs = ((key, other[key]) for key in other.keys()) if hasattr(other, "keys") else other
+        for key, value in pairs:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def clear(self):
+        self.root = self.NIL
+        self._count = 0
+
+    def keys(self):
+        return RedBlackKeysView(self)
+
+    def values(self):
+        return RedBlackValuesView(self)
+
+    def items(self):
+        return RedBlackItemsView(self)
+
+    # `parent` is x's parent, passed in because x may be the shared NIL
+    # sentinel, whose own parent pointer means nothing.
+    def fix_delete(self, x, parent):
+        while x is not self.root and not x.red:
+            if x is parent.left:
+                sibling = parent.right
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    self.left_rotate(parent)
+                    sibling = parent.right
+                if not sibling.left.red and not sibling.right.red:
+                    sibling.red = True
+                    x = parent
+                    parent = x.parent
                 else:
-                    if sibling.right.color == "black":
-                        sibling.left.color = "black"
-                        sibling.color = "red"
+                    if not sibling.right.red:
+                        sibling.left.red = False
+                        sibling.red = True
                         self.right_rotate(sibling)
-                        sibling = x.parent.right
-                    sibling.color = x.parent.color
-                    x.parent.color = "black"
-                    sibling.right.color = "black"
-                    self.left_rotate(x.parent)
+                        sibling = parent.right
+                    sibling.red = parent.red
+                    parent.red = False
+                    sibling.right.red = False
+                    self.left_rotate(parent)
                     x = self.root
             else:
-                sibling = x.parent.left
-                if sibling.color == "red":
-                    sibling.color = "black"
-                    x.parent.color = "red"
-                    self.right_rotate(x.parent)
-                    sibling = x.parent.left
-                if sibling.right.color == "black" and sibling.left.color == "black":
-                    sibling.color = "red"
-                    x = x.parent
+                sibling = parent.left
+                if sibling.red:
+                    sibling.red = False
+                    parent.red = True
+                    self.right_rotate(parent)
+                    sibling = parent.left
+                if not sibling.right.red and not sibling.left.red:
+                    sibling.red = True
+                    x = parent
+                    parent = x.parent
                 else:
-                    if sibling.left.color == "black":
-                        sibling.right.color = "black"
-                        sibling.color = "red"
+                    if not sibling.left.red:
+                        sibling.right.red = False
+                        sibling.red = True
                         self.left_rotate(sibling)
-                        sibling = x.parent.left
-                    sibling.color = x.parent.color
-                    x.parent.color = "black"
-                    sibling.left.color = "black"
-                    self.right_rotate(x.parent)
+                        sibling = parent.left
+                    sibling.red = parent.red
+                    parent.red = False
+                    sibling.left.red = False
+                    self.right_rotate(parent)
                     x = self.root
-        x.color = "black"
-
-    def visualize(self):
-        G = nx.DiGraph()
-
-        def add_edges(node):
-            if node != self.NIL:
-                # Add the current node with its color attribute
-                G.add_node(node.key, color=node.color)
-                
-                if node.left != self.NIL:
-                    G.add_edge(node.key, node.left.key, color=node.left.color)
-                    add_edges(node.left)
-                if node.right != self.NIL:
-                    G.add_edge(node.key, node.right.key, color=node.right.color)
-                    add_edges(node.right)
-
-        add_edges(self.root)
-
-        # Now, extract the color from the node attribute
-        node_colors = ["red" if G.nodes[node]["color"] == "red" else "lightgray" for node in G.nodes]
-        edge_colors = [G[u][v]["color"] for u, v in G.edges]
-
-        # Positions for nodes in a 2D plane
-        pos = nx.spring_layout(G)
-        
-        # Drawing the graph
-        nx.draw(G, pos, with_labels=True, node_size=500, node_color=node_colors, edge_color=edge_colors, font_weight="bold", font_size=10)
-
-        plt.title("Red-Black Tree Visualization")
-        plt.show()
+        x.red = False
+
+    # Check every Red-Black invariant in O(n) without recursion: black NIL and
+    # root, consistent parent pointers, no red node with a red child, equal
+    # black height on every path, keys in order (strictly, unless "multiset"),
+    # positive counts and len() matching the keys reachable. Raises InvariantViolation for
+    # the first problem found; returns the black height otherwise.
+    def validate(self):
+        nil = self.NIL
+        if nil.red:
+            raise InvariantViolation("NIL sentinel is red")
+        if self.root is not nil:
+            if self.root.parent is not None:
+                raise InvariantViolation(f"root {self.root.key!r} has a parent")
+            if self.root.red:
+                raise InvariantViolation(f"root {self.root.key!r} is red")
+
+        # In-order pass over child pointers only, so a broken parent pointer
+        # cannot derail it; counting bounds it even if the links form a cycle.
+        strict = self.duplicates != "multiset"
+        expected = len(self)
+        count = 0
+        copies = 0
+        previous = None
+        stack = []
+        node = self.root
+        while stack or node is not nil:
+            while node is not nil:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            count += 1
+            if count > expected:
+                raise InvariantViolation(f"more than len() == {expected} nodes reachable")
+            if previous is not None and (node.key < previous.key or (strict and not previous.key < node.key)):
+                raise InvariantViolation(f"key {node.key!r} is out of order after {previous.key!r}")
+            if node.count < 1:
+                raise InvariantViolation(f"key {node.key!r} has a count of {node.count}")
+            copies += node.count
+            previous = node
+            node = node.right
+        if copies != expected:
+            raise InvariantViolation(f"{copies} keys reachable but len() == {expected}")
+
+        # Post-order pass for colours, parent pointers and black heights.
+        heights = []
+        stack = [(self.root, False)] if self.root is not nil else []
+        while stack:
+            node, children_done = stack.pop()
+            if node is nil:
+                heights.append(1)
+                continue
+            if not children_done:
+                for child in (node.left, node.right):
+                    if child is not nil:
+                        if child.parent is not node:
+                            raise InvariantViolation(f"{child.key!r} does not point back to its parent {node.key!r}")
+                        if node.red and child.red:
+                            raise InvariantViolation(f"red node {node.key!r} has a red child {child.key!r}")
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+            right = heights.pop()
+            left = heights.pop()
+            if left != right:
+                raise InvariantViolation(f"black heights differ below {node.key!r}: {left} on the left, {right} on the right")
+            self._validate_node(node)
+            heights.append(left + (0 if node.red else 1))
+        return heights[0] if heights else 1
+
+    # Hook for subclasses with extra per-node invariants; called once per node
+    # by validate() after both subtrees have been checked.
+    def _validate_node(self, node):
+        pass
+
+    # Write the keys to a compact binary file (values are not stored); see
+    # mapped_red_black_tree.py for the format.
+    def dump(self, path):
+        if self.duplicates == "counted":
+            raise ValueError("dump() cannot store the copy counts of a 'counted' tree")
+        try:
+            from .mapped_red_black_tree import dump_tree
+        except ImportError:
+            from mapped_red_black_tree import dump_tree
+        dump_tree(self, path)
+
+    # Open a dump() file as a read-only, memory-mapped tree without loading it.
+    @staticmethod
+    def open_mmap(path, verify=False):
+        try:
+            from .mapped_red_black_tree import MappedRedBlackTree
+        except ImportError:
+            from mapped_red_black_tree import MappedRedBlackTree
+        return MappedRedBlackTree(path, verify)
+
+    # Export the tree (or the subtree under `root`, down to `max_depth` levels)
+    # as Graphviz DOT or JSON; see tree_export.py. `target` is a path or an
+    # open text file.
+    def export_dot(self, target, max_depth=None, root=None):
+        try:
+            from .tree_export import write_dot
+        except ImportError:
+            from tree_export import write_dot
+        write_dot(self, target, root, max_depth)
+
+    def export_json(self, target, max_depth=None, root=None):
+        try:
+            from .tree_export import write_json
+        except ImportError:
+            from tree_export import write_json
+        write_json(self, target, root, max_depth)
+
+    # Draw the tree (needs networkx and matplotlib, which are imported only here).
+    # Large trees are best drawn with a max_depth.
+    def visualize(self, max_depth=None, root=None):
+        try:
+            from .visualization import visualize
+        except ImportError:
+            from visualization import visualize
+        visualize(self, max_depth=max_depth, root=root)
 
 # Example usage:
 if __name__ == "__main__":
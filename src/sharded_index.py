@@ -0,0 +1,295 @@
+import multiprocessing
+import os
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+try:
+    from .red_black_tree import RedBlackTree
+except ImportError:
+    from red_black_tree import RedBlackTree
+
+# The tree owned by one worker process. The parent calls its methods by name
+# over a pipe; every batch it receives is already sorted and inside the
+# shard's key range.
+class _Shard:
+    def __init__(self, duplicates):
+        self.duplicates = duplicates
+        self.tree = RedBlackTree(duplicates)
+
+    def insert_many(self, keys):
+        self.tree.insert_many(keys, presorted=True)
+        return len(self.tree)
+
+    def delete_many(self, keys):
+        removed = self.tree.delete_many(keys, presorted=True)
+        return removed, len(self.tree)
+
+    def search_many(self, keys):
+        return [node is not None for node in self.tree.search_many(keys, presorted=True)]
+
+    # One page of a range scan: `limit` keys after skipping the first `skip`
+    # (the duplicates of `minimum` the previous page already returned).
+    def scan(self, minimum, maximum, inclusive, skip, limit):
+        return list(islice(self.tree.irange(minimum, maximum, inclusive), skip, skip + limit))
+
+    # The keys at the given ascending in-order positions, in one pass.
+    def keys_at(self, ranks):
+        keys = []
+        iterator = iter(self.tree)
+        position = 0
+        for rank in ranks:
+            keys.append(next(islice(iterator, rank - position, None)))
+            position = rank + 1
+        return keys
+
+    # Cut the tree down to [lo, hi) (None = unbounded) with split(), and
+    # return the keys that fell outside, in order.
+    def take_outside(self, lo, hi):
+        outside = []
+        if lo is not None:
+            below, self.tree = self.tree.split(lo)
+            outside.extend(below)
+        if hi is not None:
+            self.tree, above = self.tree.split(hi)
+            outside.extend(above)
+        return outside, len(self.tree)
+
+    # Merge a sorted batch of keys moved here by a rebalance.
+    def load(self, keys):
+        self.tree.union_update(RedBlackTree.from_sorted(keys, duplicates=self.duplicates))
+        return len(self.tree)
+
+def _shard_worker(conn, duplicates):
+    shard = _Shard(duplicates)
+    while True:
+        operation, args = conn.recv()
+        if operation == "close":
+            conn.close()
+            return
+        try:
+            conn.send((True, getattr(shard, operation)(*args)))
+        except Exception as error:
+            conn.send((False, error))
+
+class ShardedIndex:
+    # A key-range partitioned index: one RedBlackTree per worker process, so
+    # inserts and searches on different shards run on different cores instead
+    # of queueing behind one GIL. Shard i holds the keys in
+    # [boundaries[i - 1], boundaries[i]), and batches are sorted once in the
+    # parent, cut at the boundaries and sent to every shard over its pipe
+    # before any reply is read, so the shards work in parallel.
+    #
+    # Without `boundaries`, every key goes to the first shard until the index
+    # holds `min_rebalance_size` keys; from then on, whenever the largest
+    # shard reaches `rebalance_skew` times the average, rebalance() picks new
+    # boundaries at equal-count quantiles and moves the keys across (split()
+    # in the shard losing them, union_update() in the one gaining them). Pass
+    # rebalance_skew=None to only rebalance by hand.
+    #
+    # Single-key insert/search/delete work but pay a pipe round trip each;
+    # the batch methods are the fast path.
+    def __init__(self, workers=None, boundaries=None, duplicates="multiset",
+                 rebalance_skew=2.0, min_rebalance_size=10_000, start_method=None):
+        workers = workers or os.cpu_count() or 1
+        boundaries = list(boundaries) if boundaries is not None else []
+        if len(boundaries) > workers - 1:
+            raise ValueError(f"{workers} shards take at most {workers - 1} boundaries")
+        if any(b < a for a, b in zip(boundaries, boundaries[1:])):
+            raise ValueError("boundaries must be in ascending order")
+        self.boundaries = boundaries
+        self.rebalance_skew = rebalance_skew
+        self.min_rebalance_size = min_rebalance_size
+        self.rebalances = 0
+        self._sizes = [0] * workers
+        context = multiprocessing.get_context(start_method)
+        self._conns = []
+        self._processes = []
+        for _ in range(workers):
+            parent_end, child_end = context.Pipe()
+            process = context.Process(target=_shard_worker, args=(child_end, duplicates), daemon=True)
+            process.start()
+            child_end.close()
+            self._conns.append(parent_end)
+            self._processes.append(process)
+
+    @property
+    def workers(self):
+        return len(self._conns)
+
+    def shard_sizes(self):
+        return list(self._sizes)
+
+    def __len__(self):
+        return sum(self._sizes)
+
+    def close(self):
+        for conn, process in zip(self._conns, self._processes):
+            if process.is_alive():
+                conn.send(("close", ()))
+            process.join()
+            conn.close()
+        self._conns = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Send every request first, then collect the replies, so all the shards
+    # involved run at the same time. `requests` maps shard -> (operation, args).
+    def _call(self, requests):
+        for shard, request in requests.items():
+            self._conns[shard].send(request)
+        results = {}
+        error = None
+        for shard in requests:
+            ok, result = self._conns[shard].recv()
+            if ok:
+                results[shard] = result
+            elif error is None:
+                error = result  # keep reading, so no reply is left in a pipe
+        if error is not None:
+            raise error
+        return results
+
+    # Cut sorted keys into one slice per shard: shard i gets the keys in
+    # [boundaries[i - 1], boundaries[i]).
+    def _route(self, keys):
+        cuts = [0] + [bisect_left(keys, boundary) for boundary in self.boundaries] + [len(keys)]
+        return {shard: keys[cuts[shard]:cuts[shard + 1]]
+                for shard in range(len(cuts) - 1) if cuts[shard] < cuts[shard + 1]}
+
+    def _shard_of(self, key):
+        return bisect_right(self.boundaries, key)
+
+    # Writes
+    def insert_many(self, keys):
+        keys = sorted(keys)
+        if not keys:
+            return
+        results = self._call({shard: ("insert_many", (batch,)) for shard, batch in self._route(keys).items()})
+        for shard, size in results.items():
+            self._sizes[shard] = size
+        self._maybe_rebalance()
+
+    def delete_many(self, keys):
+        keys = sorted(keys)
+        results = self._call({shard: ("delete_many", (batch,)) for shard, batch in self._route(keys).items()})
+        removed = 0
+        for shard, (count, size) in results.items():
+            removed += count
+            self._sizes[shard] = size
+        self._maybe_rebalance()
+        return removed
+
+    def insert(self, key):
+        self.insert_many([key])
+
+    def delete(self, key):
+        return self.delete_many([key]) == 1
+
+    # Reads. Like CompactRedBlackTree.search, a hit returns the key itself.
+    def search_many(self, keys):
+        keys = list(keys)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        ordered = [keys[i] for i in order]
+        results = self._call({shard: ("search_many", (batch,)) for shard, batch in self._route(ordered).items()})
+        found = [hit for shard in sorted(results) for hit in results[shard]]
+        answers = [None] * len(keys)
+        for i, hit in zip(order, found):
+            if hit:
+                answers[i] = keys[i]
+        return answers
+
+    def search(self, key):
+        return self.search_many([key])[0]
+
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    # Keys between minimum and maximum (None = unbounded) in ascending order,
+    # fetched `page_size` keys at a time. Shard ranges are disjoint and
+    # ordered, so merging the shards' streams is just reading them one after
+    # the other. Each page is routed from its first key with the current
+    # boundaries, so a scan stays correct across writes and rebalances made
+    # between pages (and sees whatever they changed, like irange on a tree).
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True), page_size=10_000):
+        include_min, include_max = inclusive
+        cursor, include_cursor, skip = minimum, include_min, 0
+        while True:
+            shard = self._shard_of(cursor) if cursor is not None else 0
+            upper = self.boundaries[shard] if shard < len(self.boundaries) else None
+            last_shard = upper is None or (maximum is not None and maximum < upper)
+            if last_shard:
+                stop, include_stop = maximum, include_max
+            else:
+                stop, include_stop = upper, False
+            request = ("scan", (cursor, stop, (include_cursor, include_stop), skip, page_size))
+            page = self._call({shard: request})[shard]
+            yield from page
+            if len(page) < page_size:
+                if last_shard:
+                    return
+                cursor, include_cursor, skip = upper, True, 0
+                continue
+            last = page[-1]
+            if include_cursor and cursor is not None and page[0] == last == cursor:
+                skip += len(page)  # still inside one run of duplicates
+            else:
+                skip = len(page) - bisect_left(page, last)
+            cursor, include_cursor = last, True
+
+    def __iter__(self):
+        return self.irange()
+
+    def traverse(self):
+        return list(self.irange())
+
+    # Rebalancing
+    def _maybe_rebalance(self):
+        if self.rebalance_skew is not None and self._skewed():
+            self.rebalance()
+
+    def _skewed(self):
+        total = len(self)
+        if total < self.min_rebalance_size or self.workers < 2:
+            return False
+        return max(self._sizes) >= self.rebalance_skew * total / self.workers
+
+    # Move the boundaries to equal-count quantiles of the current keys and
+    # ship every key to its new shard. Costs one pass over each shard (in
+    # parallel) plus moving the keys that change shard. Returns False if the
+    # index is too small to split.
+    def rebalance(self):
+        total = len(self)
+        workers = self.workers
+        if workers < 2 or total < workers:
+            return False
+        # Local ranks of the quantile keys, asked of the shards holding them.
+        wanted = {}
+        offset = 0
+        ranks = [total * i // workers for i in range(1, workers)]
+        for shard, size in enumerate(self._sizes):
+            local = [rank - offset for rank in ranks if offset <= rank < offset + size]
+            if local:
+                wanted[shard] = ("keys_at", (local,))
+            offset += size
+        results = self._call(wanted)
+        boundaries = [key for shard in sorted(results) for key in results[shard]]
+
+        bounds = [None] + boundaries + [None]
+        results = self._call({shard: ("take_outside", (bounds[shard], bounds[shard + 1]))
+                              for shard in range(workers)})
+        moving = []
+        for shard, (outside, size) in results.items():
+            moving.extend(outside)
+            self._sizes[shard] = size
+        moving.sort()
+        self.boundaries = boundaries
+        results = self._call({shard: ("load", (batch,)) for shard, batch in self._route(moving).items()})
+        for shard, size in results.items():
+            self._sizes[shard] = size
+        self.rebalances += 1
+        return True
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+try:
+    from .red_black_tree import RedBlackTree
+    from .async_red_black_tree import AsyncRedBlackTree
+except ImportError:
+    from red_black_tree import RedBlackTree
+    from async_red_black_tree import AsyncRedBlackTree
+
+class TestAsyncRedBlackTree(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_requests_are_batched_in_order(self):
+        tree = AsyncRedBlackTree(batch_window=0.01)
+        # Each search is queued after the insert of the same key, so it sees it.
+        requests = []
+        for key in range(100):
+            requests.append(tree.insert(key))
+            requests.append(tree.search(key))
+        requests.append(tree.delete(50))
+        requests.append(tree.delete(500))
+        results = await asyncio.gather(*requests)
+
+        self.assertEqual(tree.batches_applied, 1)
+        self.assertEqual(tree.requests_applied, 202)
+        self.assertEqual([node.key for node in results[1:200:2]], list(range(100)))
+        self.assertEqual(results[-2:], [True, False])
+        self.assertEqual(await tree.traverse(), [k for k in range(100) if k != 50])
+        self.assertTrue(await tree.contains(7))
+        self.assertFalse(await tree.contains(50))
+
+    async def test_max_batch_flushes_early(self):
+        tree = AsyncRedBlackTree(batch_window=10, max_batch=10)
+        await asyncio.wait_for(asyncio.gather(*[tree.insert(key) for key in range(30)]), timeout=1)
+        self.assertEqual(tree.batches_applied, 3)
+        self.assertEqual(len(tree), 30)
+
+    async def test_errors_reach_only_their_caller(self):
+        tree = AsyncRedBlackTree(RedBlackTree.from_sorted(range(10)))
+        good, bad = tree.search(3), tree.search("x")
+        self.assertEqual((await good).key, 3)
+        with self.assertRaises(TypeError):
+            await bad
+
+    async def test_big_operations_run_in_the_executor(self):
+        tree = AsyncRedBlackTree(offload_threshold=1000)
+        await tree.insert_many(range(5000))
+        threads = []
+        traverse = tree.tree.traverse
+        tree.tree.traverse = lambda: threads.append(threading.get_ident()) or traverse()
+        self.assertEqual(await tree.traverse(), list(range(5000)))
+        self.assertNotEqual(threads, [threading.get_ident()])
+        self.assertEqual(await tree.delete_many(range(0, 5000, 2)), 2500)
+        self.assertEqual(len(tree), 2500)
+        self.assertEqual(len(await tree.search_many(range(3))), 3)
+
+    async def test_range_scan_pages_across_writes(self):
+        tree = AsyncRedBlackTree(RedBlackTree.from_sorted([k for k in range(20) for _ in range(3)]))
+        scan = [key async for key in tree.irange(5, 15, page_size=2)]
+        self.assertEqual(scan, [k for k in range(5, 16) for _ in range(3)])
+
+        seen = []
+        async for key in tree.irange(page_size=4):
+            seen.append(key)
+            if key == 10 and seen.count(10) == 1:
+                await tree.delete(2)    # behind the scan: not seen again
+                await tree.insert(100)  # ahead of it: picked up by a later page
+        self.assertEqual(seen, [k for k in range(20) for _ in range(3)] + [100])
+
+    async def check_server(self, **address):
+        tree = AsyncRedBlackTree()
+        server = await tree.serve(**address)
+        if "path" in address:
+            reader, writer = await asyncio.open_unix_connection(address["path"])
+        else:
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+        requests = ["insert 5", "insert 1", "insert 9", "search 5", "search 6",
+                    "delete 9", "delete 9", "len", "range 0 6", "frobnicate 1"]
+        writer.write("".join(request + "\n" for request in requests).encode())  # pipelined
+        await writer.drain()
+        replies = [(await reader.readline()).decode().strip() for _ in requests]
+        writer.close()
+        await writer.wait_closed()
+        server.close()
+        await server.wait_closed()
+        self.assertEqual(replies[:9], ["ok", "ok", "ok", "1", "0", "1", "0", "2", "1 5"])
+        self.assertTrue(replies[9].startswith("error"))
+
+    async def test_server_shutdown_cancels_handlers_cleanly(self):
+        tree = AsyncRedBlackTree()
+        server = await tree.serve(host="127.0.0.1", port=0)
+        host, port = server.sockets[0].getsockname()[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"insert 1\n")
+        self.assertEqual(await reader.readline(), b"ok\n")
+        handlers = [task for task in asyncio.all_tasks()
+                    if task.get_coro().__name__ == "_handle_connection"]
+        self.assertEqual(len(handlers), 1)
+        handlers[0].cancel()
+        await asyncio.gather(*handlers)
+        self.assertFalse(handlers[0].cancelled())  # ended normally, connection closed
+        self.assertEqual(await reader.read(), b"")
+        writer.close()
+        await writer.wait_closed()
+        server.close()
+        await server.wait_closed()
+
+    async def test_tcp_server(self):
+        await self.check_server(host="127.0.0.1", port=0)
+
+    @unittest.skipUnless(hasattr(asyncio, "start_unix_server"), "no Unix sockets")
+    async def test_unix_server(self):
+        with tempfile.TemporaryDirectory() as directory:
+            await self.check_server(path=os.path.join(directory, "tree.sock"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+import math
+import random
+import unittest
+try:
+    from .avl import AVLTree
+except ImportError:
+    from avl import AVLTree
+
+class TestAVLTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = AVLTree()
+
+    def test_insert_search_delete(self):
+        keys = [7, 3, 18, 10, 22, 8, 11, 26]
+        for key in keys:
+            self.tree.insert(key)
+        self.tree.delete(18)
+        self.tree.delete(7)
+        self.tree.delete(100)
+
+        self.assertIsNone(self.tree.search(18))
+        self.assertIsNotNone(self.tree.search(22))
+        self.assertEqual(self.tree.traverse(), [3, 8, 10, 11, 22, 26])
+        self._check_balance(self.tree.root)
+
+    def test_sorted_input_stays_balanced(self):
+        size = 50_000
+        for key in range(size):
+            self.tree.insert(key)
+        self.assertLessEqual(self.tree.height(), 1.45 * math.log2(size + 2))
+
+        for key in range(0, size, 3):
+            self.tree.delete(key)
+        self._check_balance(self.tree.root)
+        self.assertEqual(len(self.tree.traverse()), size - len(range(0, size, 3)))
+
+    def test_random_operations(self):
+        rng = random.Random(3)
+        expected = []
+        for _ in range(3000):
+            key = rng.randrange(300)
+            if rng.random() < 0.6:
+                self.tree.insert(key)
+                expected.append(key)
+            elif key in expected:
+                self.tree.delete(key)
+                expected.remove(key)
+        self.assertEqual(self.tree.traverse(), sorted(expected))
+        self._check_balance(self.tree.root)
+
+    def _check_balance(self, node):
+        if node is None:
+            return 0
+        left = self._check_balance(node.left)
+        right = self._check_balance(node.right)
+        self.assertLessEqual(abs(left - right), 1)
+        self.assertEqual(node.height, max(left, right) + 1)
+        return node.height
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
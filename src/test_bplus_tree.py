@@ -0,0 +1,91 @@
+import math
+import random
+import unittest
+try:
+    from .red_black_tree import InvariantViolation
+    from .bplus_tree import BPlusTree
+except ImportError:
+    from red_black_tree import InvariantViolation
+    from bplus_tree import BPlusTree
+
+class TestBPlusTree(unittest.TestCase):
+
+    def test_insert_search_delete(self):
+        tree = BPlusTree(order=4)
+        keys = [7, 3, 18, 10, 22, 8, 11, 26, 3]
+        for key in keys:
+            tree.insert(key)
+        self.assertEqual(len(tree), 9)
+        self.assertTrue(tree.delete(18))
+        self.assertTrue(tree.delete(3))
+        self.assertFalse(tree.delete(100))
+
+        self.assertIsNone(tree.search(18))
+        self.assertEqual(tree.search(3), 3)  # one copy left
+        self.assertEqual(tree.traverse(), [3, 7, 8, 10, 11, 22, 26])
+        self.assertEqual(list(tree), tree.traverse())
+        tree.validate()
+
+    def test_random_operations_at_several_orders(self):
+        for order in [3, 4, 5, 16, 64]:
+            with self.subTest(order=order):
+                rng = random.Random(order)
+                tree = BPlusTree(order)
+                expected = []
+                for _ in range(5000):
+                    key = rng.randrange(400)
+                    if rng.random() < 0.6:
+                        tree.insert(key)
+                        expected.append(key)
+                    else:
+                        self.assertEqual(tree.delete(key), key in expected)
+                        if key in expected:
+                            expected.remove(key)
+                tree.validate()
+                self.assertEqual(tree.traverse(), sorted(expected))
+                for key in list(expected):
+                    tree.delete(key)
+                tree.validate()
+                self.assertEqual((len(tree), tree.traverse(), tree.height()), (0, [], 1))
+
+    def test_sorted_input_is_shallow(self):
+        size = 100_000
+        tree = BPlusTree(order=32)
+        for key in range(size):
+            tree.insert(key)
+        # Every node but the root holds at least order/2 keys.
+        self.assertLessEqual(tree.height(), 1 + math.log(size / 2, 16) + 1)
+        self.assertEqual(tree.validate(), tree.height())
+
+    def test_from_sorted_and_search_many(self):
+        keys = [k // 3 for k in range(3000)]
+        for order in [3, 8, 64]:
+            tree = BPlusTree.from_sorted(keys, order)
+            tree.validate()
+            self.assertEqual(len(tree), 3000)
+            self.assertEqual(tree.traverse(), keys)
+        probes = [5, -1, 999, 1000, 500, 5]
+        self.assertEqual(tree.search_many(probes), [5, None, 999, None, 500, 5])
+        with self.assertRaises(ValueError):
+            BPlusTree.from_sorted([2, 1])
+
+    def test_irange(self):
+        tree = BPlusTree.from_sorted([k for k in range(100) for _ in range(2)], order=4)
+        self.assertEqual(list(tree.irange(10, 12)), [10, 10, 11, 11, 12, 12])
+        self.assertEqual(list(tree.irange(10, 12, (False, False))), [11, 11])
+        self.assertEqual(list(tree.irange(maximum=1)), [0, 0, 1, 1])
+        self.assertEqual(list(tree.irange(98)), [98, 98, 99, 99])
+        self.assertEqual(list(tree.irange(50, 40)), [])
+
+    def test_validate_catches_corruption(self):
+        tree = BPlusTree.from_sorted(range(100), order=4)
+        leaf = tree.root
+        while hasattr(leaf, "children"):
+            leaf = leaf.children[-1]
+        leaf.keys[-1] = -1
+        with self.assertRaises(InvariantViolation):
+            tree.validate()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
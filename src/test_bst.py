@@ -0,0 +1,61 @@
+import random
+import sys
+import unittest
+try:
+    from .bst import BinarySearchTree
+except ImportError:
+    from bst import BinarySearchTree
+
+class TestBinarySearchTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = BinarySearchTree()
+
+    def test_import_leaves_recursion_limit_alone(self):
+        self.assertLess(sys.getrecursionlimit(), 1000000)
+
+    def test_insert_search_delete(self):
+        keys = [7, 3, 18, 10, 22, 8, 11, 26]
+        for key in keys:
+            self.tree.insert(key)
+        self.tree.delete(18)
+        self.tree.delete(7)
+        self.tree.delete(100)
+
+        self.assertIsNone(self.tree.search(18))
+        self.assertIsNotNone(self.tree.search(22))
+        self.assertEqual(self.tree.traverse(), [3, 8, 10, 11, 22, 26])
+
+    def test_degenerate_tree_deeper_than_recursion_limit(self):
+        size = sys.getrecursionlimit() + 2000
+        for key in range(size):
+            self.tree.insert(key)
+        self.assertEqual(self.tree.height(), size)
+        self.assertIsNotNone(self.tree.search(size - 1))
+        self.tree.delete(size - 1)
+        self.assertEqual(self.tree.traverse(), list(range(size - 1)))
+
+    def test_node_layouts(self):
+        slotted = BinarySearchTree()
+        plain = BinarySearchTree(slots=False)
+        for tree in (slotted, plain):
+            tree.insert(1)
+        self.assertFalse(hasattr(slotted.root, "__dict__"))
+        self.assertTrue(hasattr(plain.root, "__dict__"))
+
+    def test_random_operations(self):
+        rng = random.Random(5)
+        expected = []
+        for _ in range(3000):
+            key = rng.randrange(300)
+            if rng.random() < 0.6:
+                self.tree.insert(key)
+                expected.append(key)
+            elif key in expected:
+                self.tree.delete(key)
+                expected.remove(key)
+        self.assertEqual(self.tree.traverse(), sorted(expected))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
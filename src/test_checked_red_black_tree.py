@@ -0,0 +1,94 @@
+import random
+import unittest
+try:
+    from .red_black_tree import InvariantViolation, RedBlackTree
+    from .order_statistic_tree import OrderStatisticTree
+    from .checked_red_black_tree import CheckedRedBlackTree
+except ImportError:
+    from red_black_tree import InvariantViolation, RedBlackTree
+    from order_statistic_tree import OrderStatisticTree
+    from checked_red_black_tree import CheckedRedBlackTree
+
+class TestValidate(unittest.TestCase):
+
+    def test_valid_trees_pass(self):
+        rng = random.Random(5)
+        keys = [rng.randrange(500) for _ in range(2_000)]
+        for cls in (RedBlackTree, OrderStatisticTree):
+            tree = cls()
+            self.assertEqual(tree.validate(), 1)
+            for key in keys:
+                tree.insert(key)
+                tree.validate()
+            for key in keys[::3]:
+                tree.delete(key)
+            tree.validate()
+            self.assertEqual(cls.from_sorted(range(1000)).validate(), cls.from_sorted(range(1000)).validate())
+
+    def test_reports_each_kind_of_violation(self):
+        def corrupted(mutate):
+            tree = RedBlackTree.from_iterable(range(31))
+            mutate(tree)
+            with self.assertRaises(InvariantViolation) as context:
+                tree.validate()
+            return str(context.exception)
+
+        self.assertIn("root", corrupted(lambda t: setattr(t.root, "red", True)))
+        self.assertIn("out of order", corrupted(lambda t: setattr(t.root.left, "key", 100)))
+        self.assertIn("point back", corrupted(lambda t: setattr(t.root.left, "parent", t.root.right)))
+        self.assertIn("black heights", corrupted(lambda t: setattr(t.root.left, "red", True)))
+        self.assertIn("len()", corrupted(lambda t: setattr(t, "_count", 30)))
+
+        def red_red(tree):
+            node = tree.root.left
+            node.red = True
+            node.left.red = True
+            node.right.red = True
+        self.assertIn("red child", corrupted(red_red))
+
+    def test_order_statistic_sizes(self):
+        tree = OrderStatisticTree.from_sorted(range(15))
+        tree.root.left.size += 1
+        with self.assertRaises(InvariantViolation):
+            tree.validate()
+
+class TestCheckedRedBlackTree(unittest.TestCase):
+
+    def test_path_checks_on_every_write(self):
+        tree = CheckedRedBlackTree(sample_rate=0.05, seed=1)
+        rng = random.Random(6)
+        keys = rng.sample(range(10_000), 3_000)
+        for key in keys:
+            tree.insert(key)
+        for key in keys[:2_000]:
+            tree.delete(key)
+        self.assertEqual(tree.path_checks_run, 5_000)
+        self.assertGreater(tree.full_checks_run, 0)
+        self.assertEqual(tree.traverse(), sorted(keys[2_000:]))
+
+    def test_catches_corruption_on_the_next_write(self):
+        tree = CheckedRedBlackTree()
+        for key in range(64):
+            tree.insert(key)
+        node = tree.search(40)
+        node.parent.red = node.red = True  # red-red on 40's path
+        with self.assertRaises(InvariantViolation):
+            tree.insert(40.5)
+
+    def test_bulk_loads_are_fully_validated(self):
+        tree = CheckedRedBlackTree.from_sorted(range(100))
+        self.assertEqual(tree.full_checks_run, 1)
+        tree.delete_many(range(0, 300, 2))
+        self.assertEqual(tree.full_checks_run, 2)
+
+    def test_spliced_runs_are_path_checked(self):
+        tree = CheckedRedBlackTree.from_sorted(range(100))
+        checks = tree.path_checks_run
+        # 100-117 go in by descent (one check each), 118-299 as one spliced
+        # run past the end (one check per seam).
+        tree.insert_many(range(100, 300))
+        self.assertEqual(tree.path_checks_run, checks + 18 + 2)
+        self.assertEqual(tree.traverse(), list(range(300)))
+
+if __name__ == "__main__":
+    unittest.main()
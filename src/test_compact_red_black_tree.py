@@ -0,0 +1,105 @@
+import random
+import unittest
+try:
+    from .compact_red_black_tree import CompactRedBlackTree, NIL
+    from .red_black_tree import RedBlackTree
+except ImportError:
+    from compact_red_black_tree import CompactRedBlackTree, NIL
+    from red_black_tree import RedBlackTree
+
+class TestCompactRedBlackTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = CompactRedBlackTree()
+
+    def test_insert_and_search(self):
+        keys = [7, 3, 18, 10, 22, 8, 11, 26]
+        for key in keys:
+            self.tree.insert(key)
+
+        for key in keys:
+            node = self.tree.search(key)
+            self.assertEqual(node.key, key)
+            self.assertIsNone(node.value)
+            self.assertIn(node.color, ("red", "black"))
+            self.assertIn(key, self.tree)
+        self.assertEqual(self.tree.search(7), self.tree.search(7))
+        self.assertIsNone(self.tree.search(100))
+        self.assertNotIn(100, self.tree)
+        self.assertEqual(len(self.tree), len(keys))
+
+    def test_iteration_and_navigation_match_red_black_tree(self):
+        keys = random.Random(7).choices(range(0, 300, 3), k=200)
+        plain = RedBlackTree()
+        for key in keys:
+            self.tree.insert(key)
+            plain.insert(key)
+        for key in keys[:80]:
+            self.tree.delete(key)
+            plain.delete(key)
+        self.assertEqual(list(self.tree), list(plain))
+        self.assertEqual(list(reversed(self.tree)), list(reversed(plain)))
+        self.assertEqual((self.tree.min(), self.tree.max()), (plain.min(), plain.max()))
+        for key in range(-2, 302, 7):
+            for method in ("floor", "ceiling", "successor", "predecessor"):
+                self.assertEqual(getattr(self.tree, method)(key), getattr(plain, method)(key), (method, key))
+        for bounds in [(None, None), (30, 150), (31, 149), (200, 100)]:
+            for inclusive in [(True, True), (False, False), (True, False)]:
+                for reverse in (False, True):
+                    self.assertEqual(list(self.tree.irange(*bounds, inclusive, reverse)),
+                                     list(plain.irange(*bounds, inclusive, reverse)))
+        empty = CompactRedBlackTree()
+        self.assertEqual((list(empty), list(reversed(empty)), list(empty.irange(1, 5))), ([], [], []))
+        self.assertIsNone(empty.min())
+        self.assertIsNone(empty.floor(3))
+
+    def test_delete_reuses_free_slots(self):
+        for key in range(100):
+            self.tree.insert(key)
+        slots = len(self.tree.left)
+
+        for key in range(0, 100, 2):
+            self.assertTrue(self.tree.delete(key))
+        self.assertFalse(self.tree.delete(1000))
+        for key in range(1000, 1050):
+            self.tree.insert(key)
+
+        self.assertEqual(len(self.tree.left), slots)
+        self.assertEqual(self.tree.traverse(), list(range(1, 100, 2)) + list(range(1000, 1050)))
+
+    def test_random_operations_keep_invariants(self):
+        rng = random.Random(42)
+        expected = []
+        for _ in range(2000):
+            key = rng.randrange(200)
+            if rng.random() < 0.6:
+                self.tree.insert(key)
+                expected.append(key)
+            elif key in expected:
+                self.assertTrue(self.tree.delete(key))
+                expected.remove(key)
+        self.assertEqual(self.tree.traverse(), sorted(expected))
+        self._check_black_height(self.tree.root)
+        self.assertFalse(self.tree._is_red(self.tree.root))
+
+    def test_object_keys(self):
+        tree = CompactRedBlackTree(key_type=None)
+        for key in ["pear", "apple", "fig"]:
+            tree.insert(key)
+        tree.delete("fig")
+        self.assertEqual(tree.traverse(), ["apple", "pear"])
+
+    def _check_black_height(self, node):
+        if node == NIL:
+            return 1
+        left = self._check_black_height(self.tree.left[node])
+        right = self._check_black_height(self.tree.right[node])
+        self.assertEqual(left, right)
+        if self.tree._is_red(node):
+            self.assertFalse(self.tree._is_red(self.tree.left[node]))
+            self.assertFalse(self.tree._is_red(self.tree.right[node]))
+        return left + (0 if self.tree._is_red(node) else 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,79 @@
+import threading
+import unittest
+try:
+    from .concurrent_red_black_tree import ConcurrentRedBlackTree, ReadWriteLock
+except ImportError:
+    from concurrent_red_black_tree import ConcurrentRedBlackTree, ReadWriteLock
+
+class TestConcurrentRedBlackTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = ConcurrentRedBlackTree()
+
+    def test_concurrent_writers_and_readers(self):
+        errors = []
+
+        def writer(start):
+            for key in range(start, start + 500):
+                self.tree.insert(key)
+            for key in range(start, start + 500, 2):
+                if not self.tree.delete(key):
+                    errors.append(key)
+
+        def reader():
+            try:
+                for _ in range(200):
+                    keys = self.tree.traverse()
+                    if keys != sorted(keys):
+                        errors.append(keys)
+                    self.tree.search(250)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=writer, args=(i * 1000,)) for i in range(4)]
+        threads += [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        expected = [k for i in range(4) for k in range(i * 1000 + 1, i * 1000 + 500, 2)]
+        self.assertEqual(self.tree.traverse(), expected)
+        self.assertEqual(len(self.tree), len(expected))
+
+    def test_write_errors_reach_the_caller(self):
+        self.tree.insert(1)
+        with self.assertRaises(TypeError):
+            self.tree.insert("one")
+        self.assertFalse(self.tree.delete(2))
+        self.assertEqual(self.tree.irange(0, 5), [1])
+
+    def test_search_copies_the_item_out(self):
+        self.tree.insert(1, "one")
+        self.tree.insert(2, "two")
+        self.tree.insert(3, "three")
+        found = self.tree.search(2)
+        self.assertEqual(found, (2, "two"))
+        self.assertEqual(self.tree.search_many([3, 9, 1]), [(3, "three"), None, (1, "one")])
+        self.assertIsNone(self.tree.search(9))
+        # A delete after the lock is released cannot change what was returned.
+        self.assertTrue(self.tree.delete(2))
+        self.assertEqual(found, (2, "two"))
+        self.assertIsNone(self.tree.search(2))
+
+    def test_writer_waits_for_readers(self):
+        lock = ReadWriteLock()
+        order = []
+        lock.acquire_read()
+        writer = threading.Thread(target=lambda: (lock.acquire_write(), order.append("write"), lock.release_write()))
+        writer.start()
+        writer.join(0.05)
+        order.append("read done")
+        lock.release_read()
+        writer.join()
+        self.assertEqual(order, ["read done", "write"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
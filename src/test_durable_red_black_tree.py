@@ -0,0 +1,190 @@
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+try:
+    from .durable_red_black_tree import DurableRedBlackTree, RECORD_SIZE
+except ImportError:
+    from durable_red_black_tree import DurableRedBlackTree, RECORD_SIZE
+
+# Child process for the crash test: writes a fixed sequence of operations
+# and prints each one once it has returned (is durable), until killed.
+CRASH_WRITER = """
+import sys
+from durable_red_black_tree import DurableRedBlackTree
+tree = DurableRedBlackTree(sys.argv[1], checkpoint_every=int(sys.argv[2]))
+i = 0
+while True:
+    if i % 10 == 9:
+        tree.delete(i - 5)
+    else:
+        tree.insert(i)
+    print(i, flush=True)
+    i += 1
+"""
+
+def apply_crash_writer_ops(count):
+    keys = set()
+    for i in range(count):
+        if i % 10 == 9:
+            keys.discard(i - 5)
+        else:
+            keys.add(i)
+    return sorted(keys)
+
+class TestDurableRedBlackTree(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def files(self):
+        return sorted(os.listdir(self.path))
+
+    def test_reopen_replays_the_log(self):
+        with DurableRedBlackTree(self.path) as tree:
+            for key in [5, 3, 8, 3, 1.5]:
+                tree.insert(key)
+            self.assertTrue(tree.delete(8))
+            self.assertFalse(tree.delete(100))
+            tree.insert_many([10, 11, 12])
+            self.assertEqual(tree.delete_many([10, 12, 99]), 2)
+            expected = tree.traverse()
+        self.assertEqual(expected, [1.5, 3, 3, 5, 11])
+
+        with DurableRedBlackTree(self.path) as tree:
+            self.assertEqual(tree.traverse(), expected)
+            self.assertEqual(len(tree), 5)
+            tree.tree.validate()
+            tree.insert(4)
+        with DurableRedBlackTree(self.path) as tree:
+            self.assertEqual(tree.traverse(), [1.5, 3, 3, 4, 5, 11])
+
+    def test_checkpoints_replace_old_log(self):
+        rng = random.Random(5)
+        expected = []
+        with DurableRedBlackTree(self.path, checkpoint_every=50) as tree:
+            for _ in range(520):
+                key = rng.randrange(100)
+                if rng.random() < 0.7:
+                    tree.insert(key)
+                    expected.append(key)
+                elif tree.delete(key):
+                    expected.remove(key)
+            files = self.files()
+            self.assertEqual(len(files), 2, files)  # one checkpoint, one segment
+        with DurableRedBlackTree(self.path) as tree:
+            self.assertEqual(tree.traverse(), sorted(expected))
+            tree.checkpoint()
+            self.assertEqual(os.path.getsize(os.path.join(self.path, self.files()[-1])), 0)
+        with DurableRedBlackTree(self.path) as tree:
+            self.assertEqual(tree.traverse(), sorted(expected))
+
+    def test_torn_record_is_cut_off(self):
+        with DurableRedBlackTree(self.path) as tree:
+            tree.insert_many(range(10))
+        segment = os.path.join(self.path, self.files()[-1])
+        with open(segment, "ab") as f:
+            f.write(b"\x01q\x00\x00")  # the start of a record, as a crash would leave it
+        with DurableRedBlackTree(self.path) as tree:
+            self.assertEqual(tree.traverse(), list(range(10)))
+            self.assertEqual(os.path.getsize(segment), 10 * RECORD_SIZE)
+            tree.insert(10)
+        with DurableRedBlackTree(self.path) as tree:
+            self.assertEqual(tree.traverse(), list(range(11)))
+
+    def test_fsync_batches(self):
+        with DurableRedBlackTree(self.path, fsync_every=4) as tree:
+            segment = os.path.join(self.path, self.files()[-1])
+            for key in range(3):
+                tree.insert(key)
+            self.assertEqual(os.path.getsize(segment), 0)  # still buffered
+            tree.insert(3)
+            self.assertEqual(os.path.getsize(segment), 4 * RECORD_SIZE)
+            tree.insert(4)
+            tree.commit()
+            self.assertEqual(os.path.getsize(segment), 5 * RECORD_SIZE)
+            with self.assertRaises(TypeError):
+                tree.insert("not a number")
+            self.assertEqual(tree.traverse(), [0, 1, 2, 3, 4])
+
+    def test_failed_fsync_stops_the_log(self):
+        tree = DurableRedBlackTree(self.path, fsync_every=2)
+        tree.insert_many([0, 1])
+        tree.insert(2)
+        with mock.patch("os.fsync", side_effect=OSError("EIO")):
+            with self.assertRaisesRegex(OSError, "EIO"):
+                tree.insert(3)
+        # Nothing is retried or renumbered: later writes and commits fail
+        # without touching the tree, until the directory is reopened.
+        with self.assertRaisesRegex(OSError, "failed"):
+            tree.insert(4)
+        with self.assertRaisesRegex(OSError, "failed"):
+            tree.delete(0)
+        with self.assertRaisesRegex(OSError, "failed"):
+            tree.commit()
+        with self.assertRaisesRegex(OSError, "failed"):
+            tree.checkpoint()
+        self.assertEqual(tree.traverse(), [0, 1, 2, 3])
+        with self.assertRaises(OSError):
+            tree.close()
+        with DurableRedBlackTree(self.path) as tree:
+            self.assertEqual(tree.traverse(), [0, 1, 2, 3])  # written, just not fsynced
+            tree.insert(4)
+        with DurableRedBlackTree(self.path) as tree:
+            self.assertEqual(tree.traverse(), [0, 1, 2, 3, 4])
+            self.assertEqual(tree._lsn, 5)
+
+    def test_concurrent_writers_share_fsyncs(self):
+        threads, per_thread = 8, 100
+        with mock.patch("os.fsync", wraps=os.fsync) as fsync:
+            with DurableRedBlackTree(self.path) as tree:
+                def writer(start):
+                    for key in range(start, start + per_thread):
+                        tree.insert(key)
+                workers = [threading.Thread(target=writer, args=(i * per_thread,)) for i in range(threads)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            self.assertLess(fsync.call_count, threads * per_thread)
+        with DurableRedBlackTree(self.path) as tree:
+            self.assertEqual(tree.traverse(), list(range(threads * per_thread)))
+
+    @unittest.skipIf(sys.platform == "win32", "needs SIGKILL")
+    def test_recovers_after_being_killed_mid_write(self):
+        src = os.path.dirname(os.path.abspath(__file__))
+        rng = random.Random(7)
+        for attempt in range(4):
+            with self.subTest(attempt=attempt):
+                directory = os.path.join(self.path, str(attempt))
+                child = subprocess.Popen([sys.executable, "-c", CRASH_WRITER, directory, "150"],
+                                         cwd=src, stdout=subprocess.PIPE, text=True)
+                acknowledged = 0
+                kill_after = rng.randrange(100, 1500)
+                while acknowledged < kill_after:
+                    line = child.stdout.readline()
+                    self.assertTrue(line, "writer exited early")
+                    acknowledged += 1
+                child.kill()
+                acknowledged += sum(1 for _ in child.stdout)  # printed before the kill
+                child.wait()
+                child.stdout.close()
+
+                with DurableRedBlackTree(directory) as tree:
+                    recovered = tree.traverse()
+                    tree.tree.validate()
+                # Every acknowledged write survived; the one in flight may have too.
+                self.assertIn(recovered, [apply_crash_writer_ops(acknowledged),
+                                          apply_crash_writer_ops(acknowledged + 1)])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
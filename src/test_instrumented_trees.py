@@ -0,0 +1,111 @@
+import random
+import unittest
+try:
+    from .instrumented_trees import InstrumentedRedBlackTree, InstrumentedAVLTree, InstrumentedBinarySearchTree
+    from .red_black_tree import RedBlackTree
+except ImportError:
+    from instrumented_trees import InstrumentedRedBlackTree, InstrumentedAVLTree, InstrumentedBinarySearchTree
+    from red_black_tree import RedBlackTree
+
+class TestInstrumentedTrees(unittest.TestCase):
+
+    def test_behaves_like_the_plain_trees(self):
+        keys = random.Random(3).sample(range(10_000), 2_000)
+        for cls in (InstrumentedRedBlackTree, InstrumentedAVLTree, InstrumentedBinarySearchTree):
+            tree = cls()
+            for key in keys:
+                tree.insert(key)
+            for key in keys[::2]:
+                tree.delete(key)
+            self.assertEqual(tree.traverse(), sorted(keys[1::2]), cls.__name__)
+            self.assertIsNotNone(tree.search(keys[1]))
+            self.assertIsNone(tree.search(keys[0]))
+
+    def test_red_black_fixup_matches_plain_tree(self):
+        keys = random.Random(4).sample(range(10_000), 3_000)
+        plain = RedBlackTree()
+        counted = InstrumentedRedBlackTree()
+        for key in keys:
+            plain.insert(key)
+            counted.insert(key)
+        for key in keys[:1_500]:
+            plain.delete(key)
+            counted.delete(key)
+        shape = lambda tree: [(node.key, node.red) for node in tree._nodes()]
+        self.assertEqual(shape(counted), shape(plain))
+
+    def test_plain_tree_has_no_counting_hooks(self):
+        self.assertFalse(hasattr(RedBlackTree, "_recolour"))
+        self.assertIsNot(InstrumentedRedBlackTree.fix_delete, RedBlackTree.fix_delete)
+        tree = InstrumentedRedBlackTree()
+        for key in range(100):
+            tree.insert(key)
+        tree.reset_stats()
+        for key in range(100):
+            tree.delete(key)
+        stats = tree.stats()
+        self.assertGreater(stats["fixup_iterations"], 0)
+        self.assertGreater(stats["recolours"], 0)
+        self.assertEqual(tree.traverse(), [])
+
+    def test_sorted_inserts_rotate(self):
+        tree = InstrumentedRedBlackTree()
+        for key in range(3):
+            tree.insert(key)
+        stats = tree.stats()
+        # 0 (black root), 1 (red, no fixup), 2 -> red parent, black uncle: one rotation
+        self.assertEqual(stats["rotations"], 1)
+        self.assertEqual(stats["fixup_iterations"], 1)
+        self.assertEqual(stats["recolours"], 3)  # root on insert 0, then parent and grandparent
+        self.assertEqual(stats["operations"]["insert"], 3)
+        self.assertEqual(stats["depth"]["insert"], {0: 1, 1: 1, 2: 1})
+
+    def test_descent_depth_and_comparisons(self):
+        tree = InstrumentedAVLTree()
+        for key in [2, 1, 3]:
+            tree.insert(key)
+        tree.reset_stats()
+        tree.search(2)  # root: one == comparison
+        tree.search(3)  # root (==, <), then 3 (==)
+        tree.search(9)  # root (==, <), 3 (==, <), then falls off
+        stats = tree.stats()
+        self.assertEqual(stats["depth"]["search"], {1: 1, 2: 2})
+        self.assertEqual(stats["comparisons"], 1 + 3 + 4)
+        self.assertEqual(stats["rotations"], 0)
+
+    def test_comparisons_are_counted_where_they_happen(self):
+        tree = InstrumentedRedBlackTree()
+        for key in range(3):
+            tree.insert(key)
+        # Each multiset insert compares once per node on the way down, then
+        # once more to pick the side the new leaf goes on.
+        self.assertEqual(tree.stats()["comparisons"], 0 + 2 + 3)
+        tree.reset_stats()
+        tree.insert_many([10, 5, 7])
+        tree.search_many([7, 99])
+        self.assertGreater(tree.stats()["comparisons"], 0)
+        self.assertEqual(tree.stats()["operations"], {"insert": 3, "search": 2, "delete": 0})
+        tree.reset_stats()
+        left, right = tree.split(5)
+        self.assertGreater(tree.stats()["comparisons"], 0)
+        self.assertEqual((list(left), list(right)), ([0, 1, 2], [5, 7, 10]))
+        self.assertEqual(type(left.traverse()[0]), int)
+
+    def test_delete_is_not_counted_as_search(self):
+        tree = InstrumentedRedBlackTree()
+        tree.insert(1)
+        tree.delete(1)
+        tree.delete(1)
+        stats = tree.stats()
+        self.assertEqual(stats["operations"], {"insert": 1, "search": 0, "delete": 2})
+
+    def test_bst_degenerates_on_sorted_input(self):
+        tree = InstrumentedBinarySearchTree()
+        for key in range(100):
+            tree.insert(key)
+        stats = tree.stats()
+        self.assertEqual(stats["mean_depth"]["insert"], 49.5)
+        self.assertEqual(stats["rotations"] + stats["recolours"] + stats["fixup_iterations"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
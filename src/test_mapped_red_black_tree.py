@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+try:
+    from .red_black_tree import RedBlackTree
+except ImportError:
+    from red_black_tree import RedBlackTree
+
+class TestMappedRedBlackTree(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tree.rbt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        tree = RedBlackTree()
+        keys = [20, 15, 25, 10, 18, 22, 30, 15]
+        for key in keys:
+            tree.insert(key)
+        tree.dump(self.path)
+
+        with RedBlackTree.open_mmap(self.path, verify=True) as mapped:
+            self.assertEqual(len(mapped), len(keys))
+            self.assertEqual(mapped.traverse(), sorted(keys))
+            self.assertEqual(mapped.search(18), 18)
+            self.assertIsNone(mapped.search(19))
+            self.assertEqual(mapped.floor(24), 22)
+            self.assertEqual(mapped.ceiling(24), 25)
+            self.assertEqual(list(mapped.irange(15, 22)), [15, 15, 18, 20, 22])
+            self.assertEqual(list(mapped.irange(15, 22, (False, False), reverse=True)), [20, 18])
+
+    def test_float_keys_and_empty_tree(self):
+        RedBlackTree.from_sorted([0.5, 1, 2.25]).dump(self.path)
+        with RedBlackTree.open_mmap(self.path) as mapped:
+            self.assertEqual(mapped.traverse(), [0.5, 1.0, 2.25])
+
+        RedBlackTree().dump(self.path)
+        with RedBlackTree.open_mmap(self.path) as mapped:
+            self.assertEqual(mapped.traverse(), [])
+            self.assertIsNone(mapped.search(1))
+
+    def test_rejects_unsupported_keys(self):
+        with self.assertRaises(TypeError):
+            RedBlackTree.from_sorted(["a", "b"]).dump(self.path)
+
+    def test_detects_corruption(self):
+        RedBlackTree.from_sorted(range(100)).dump(self.path)
+        with open(self.path, "r+b") as f:
+            f.seek(-20, os.SEEK_END)
+            byte = f.read(1)[0]
+            f.seek(-20, os.SEEK_END)
+            f.write(bytes([byte ^ 1]))
+        with self.assertRaises(ValueError):
+            RedBlackTree.open_mmap(self.path, verify=True)
+
+        with open(self.path, "r+b") as f:
+            f.truncate(50)
+        with self.assertRaises(ValueError):
+            RedBlackTree.open_mmap(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
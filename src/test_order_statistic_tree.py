@@ -0,0 +1,78 @@
+import bisect
+import random
+import unittest
+try:
+    from .order_statistic_tree import OrderStatisticTree
+except ImportError:
+    from order_statistic_tree import OrderStatisticTree
+
+class TestOrderStatisticTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = OrderStatisticTree()
+
+    def test_rank_and_select(self):
+        keys = [20, 15, 25, 10, 18, 22, 30]
+        for key in keys:
+            self.tree.insert(key)
+
+        self.assertEqual(len(self.tree), 7)
+        self.assertEqual(self.tree.rank(10), 0)
+        self.assertEqual(self.tree.rank(19), 3)
+        self.assertEqual(self.tree.rank(100), 7)
+        self.assertEqual([self.tree.select(i) for i in range(7)], sorted(keys))
+        self.assertEqual(self.tree.select(-1), 30)
+        with self.assertRaises(IndexError):
+            self.tree.select(7)
+
+    def test_count_range(self):
+        self.tree.insert_many(range(0, 100, 2))
+        self.assertEqual(self.tree.count_range(10, 20), 6)
+        self.assertEqual(self.tree.count_range(11, 11), 0)
+        self.assertEqual(self.tree.count_range(50, 10), 0)
+        self.assertEqual(self.tree.count_range(-5, 500), 50)
+
+    def test_sizes_survive_random_updates(self):
+        rng = random.Random(7)
+        expected = []
+        for _ in range(3000):
+            key = rng.randrange(300)
+            if rng.random() < 0.6:
+                self.tree.insert(key)
+                bisect.insort(expected, key)
+            elif key in expected:
+                self.tree.delete(key)
+                expected.remove(key)
+        self.assertEqual(self._check_sizes(self.tree.root), len(expected))
+        for key in range(0, 300, 13):
+            self.assertEqual(self.tree.rank(key), bisect.bisect_left(expected, key))
+        self.assertEqual([self.tree.select(i) for i in range(len(expected))], expected)
+
+    def test_from_sorted_sets_sizes(self):
+        tree = OrderStatisticTree.from_sorted(range(1000))
+        self.assertEqual(self._check_sizes(tree.root, tree), 1000)
+        self.assertEqual(tree.select(500), 500)
+        with self.assertRaises(ValueError):
+            OrderStatisticTree(duplicates="counted")  # sizes count nodes, not copies
+
+    def test_split_and_union_keep_sizes(self):
+        tree = OrderStatisticTree.from_iterable(range(0, 1000, 2))
+        left, right = tree.split(500)
+        self.assertEqual((len(left), len(right)), (250, 250))
+        right.union_update(OrderStatisticTree.from_iterable(range(1, 1000, 2)))
+        right.validate()
+        self.assertEqual(len(right), 750)
+        self.assertEqual(right.rank(501), 251)
+        self.assertEqual(right.select(0), 1)
+
+    def _check_sizes(self, node, tree=None):
+        tree = self.tree if tree is None else tree
+        if node is tree.NIL:
+            return 0
+        size = self._check_sizes(node.left, tree) + self._check_sizes(node.right, tree) + 1
+        self.assertEqual(node.size, size)
+        return size
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
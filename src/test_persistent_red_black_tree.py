@@ -0,0 +1,108 @@
+import random
+import unittest
+from unittest import mock
+try:
+    from .persistent_red_black_tree import PersistentNode, PersistentRedBlackTree
+except ImportError:
+    from persistent_red_black_tree import PersistentNode, PersistentRedBlackTree
+
+class TestPersistentRedBlackTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = PersistentRedBlackTree()
+
+    def test_insert_search_delete(self):
+        keys = [7, 3, 18, 10, 22, 8, 11, 26]
+        for key in keys:
+            self.tree.insert(key)
+        self.assertTrue(self.tree.delete(18))
+        self.assertFalse(self.tree.delete(18))
+
+        self.assertIsNone(self.tree.search(18))
+        self.assertIsNotNone(self.tree.search(22))
+        self.assertEqual(self.tree.traverse(), sorted(k for k in keys if k != 18))
+        self.assertEqual(len(self.tree), 7)
+
+    def test_snapshots_are_unaffected_by_later_writes(self):
+        versions = []
+        expected = []
+        rng = random.Random(11)
+        for step in range(2000):
+            key = rng.randrange(300)
+            if rng.random() < 0.6:
+                self.tree.insert(key)
+                expected.append(key)
+            elif self.tree.delete(key):
+                expected.remove(key)
+            if step % 100 == 0:
+                versions.append((self.tree.snapshot(), sorted(expected)))
+
+        self.assertEqual(self.tree.traverse(), sorted(expected))
+        self._check_black_height(self.tree.root)
+        for snapshot, keys in versions:
+            self.assertEqual(snapshot.traverse(), keys)
+            self.assertEqual(len(snapshot), len(keys))
+            self._check_black_height(snapshot.root)
+
+    def test_versions_share_unchanged_subtrees(self):
+        for key in range(100):
+            self.tree.insert(key)
+        old = self.tree.snapshot()
+        self.tree.insert(1000)
+
+        shared = {id(node) for node in old._nodes()} & {id(node) for node in self.tree._nodes()}
+        self.assertGreater(len(shared), 80)
+
+    def test_iterating_a_snapshot_during_writes(self):
+        for key in range(50):
+            self.tree.insert(key)
+        reader = iter(self.tree.snapshot())
+        seen = [next(reader) for _ in range(10)]
+        for key in range(10, 50):
+            self.tree.delete(key)
+        seen.extend(reader)
+        self.assertEqual(seen, list(range(50)))
+
+    def test_snapshot_taken_during_a_write_stays_put(self):
+        # Take a snapshot every time a write copies a node, i.e. at every step
+        # of the path copy and the fixup, as a reader thread could.
+        rng = random.Random(3)
+        for key in rng.sample(range(1000), 200):
+            self.tree.insert(key)
+        copy = PersistentNode.copy
+        during = []
+
+        def copy_and_snapshot(node):
+            snapshot = self.tree.snapshot()
+            during.append((snapshot, snapshot.traverse(), len(snapshot)))
+            return copy(node)
+
+        for _ in range(300):
+            key = rng.randrange(1000)
+            before = self.tree.traverse()
+            during.clear()
+            with mock.patch.object(PersistentNode, "copy", copy_and_snapshot):
+                if rng.random() < 0.5:
+                    self.tree.insert(key)
+                else:
+                    self.tree.delete(key)
+            for snapshot, keys, length in during:
+                self.assertEqual((snapshot.traverse(), len(snapshot)), (keys, length))
+                self.assertEqual((keys, length), (before, len(before)))
+                self._check_black_height(snapshot.root)
+        self._check_black_height(self.tree.root)
+
+    def _check_black_height(self, node):
+        if node is None:
+            return 1
+        left = self._check_black_height(node.left)
+        right = self._check_black_height(node.right)
+        self.assertEqual(left, right)
+        if node.red:
+            self.assertFalse(node.left is not None and node.left.red)
+            self.assertFalse(node.right is not None and node.right.red)
+        return left + (0 if node.red else 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,168 @@
+# Differential tests: Hypothesis drives random insert/delete/search sequences
+# against every tree class and a sorted-list oracle, and checks the tree's
+# structural invariants after every step. Skipped when Hypothesis is not
+# installed (pip install hypothesis).
+import unittest
+from bisect import bisect_left, insort
+
+try:
+    from hypothesis import settings, strategies as st
+    from hypothesis.stateful import RuleBasedStateMachine, invariant, rule
+except ImportError:
+    raise unittest.SkipTest("hypothesis is not installed")
+
+try:
+    from .red_black_tree import RedBlackTree
+    from .order_statistic_tree import OrderStatisticTree
+    from .checked_red_black_tree import CheckedRedBlackTree
+    from .compact_red_black_tree import CompactRedBlackTree, NIL
+    from .persistent_red_black_tree import PersistentRedBlackTree
+    from .avl import AVLTree
+    from .bst import BinarySearchTree
+    from .bplus_tree import BPlusTree
+except ImportError:
+    from red_black_tree import RedBlackTree
+    from order_statistic_tree import OrderStatisticTree
+    from checked_red_black_tree import CheckedRedBlackTree
+    from compact_red_black_tree import CompactRedBlackTree, NIL
+    from persistent_red_black_tree import PersistentRedBlackTree
+    from avl import AVLTree
+    from bst import BinarySearchTree
+    from bplus_tree import BPlusTree
+
+# Check a binary search tree without recursion: in-order keys are sorted,
+# and, when the callbacks are given, no red node has a red child, every
+# path has the same black height and stored AVL heights/balance are right.
+# Returns the in-order keys.
+def check_shape(root, is_nil, left, right, key, red=None, height=None):
+    keys = []
+    stack = []
+    node = root
+    while stack or not is_nil(node):
+        while not is_nil(node):
+            stack.append(node)
+            node = left(node)
+        node = stack.pop()
+        keys.append(key(node))
+        node = right(node)
+    assert all(a <= b for a, b in zip(keys, keys[1:])), "keys out of order"
+
+    # Post-order: one (black height, height) pair per finished subtree.
+    results = []
+    stack = [(root, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if is_nil(node):
+            results.append((1, 0))
+            continue
+        if not children_done:
+            stack.append((node, True))
+            stack.append((right(node), False))
+            stack.append((left(node), False))
+            continue
+        right_bh, right_height = results.pop()
+        left_bh, left_height = results.pop()
+        if red is not None:
+            assert left_bh == right_bh, f"black heights differ below {key(node)!r}"
+            if red(node):
+                for child in (left(node), right(node)):
+                    assert is_nil(child) or not red(child), f"red node {key(node)!r} has a red child"
+        if height is not None:
+            assert abs(left_height - right_height) <= 1, f"{key(node)!r} is out of balance"
+            assert height(node) == max(left_height, right_height) + 1, f"stale height at {key(node)!r}"
+        results.append((left_bh + (0 if red is None or red(node) else 1), max(left_height, right_height) + 1))
+    return keys
+
+def check_red_black(tree):
+    tree.validate()
+    return tree.traverse()
+
+def check_compact(tree):
+    assert not tree._is_red(tree.root)
+    return check_shape(tree.root, lambda i: i == NIL, lambda i: tree.left[i], lambda i: tree.right[i],
+                       lambda i: tree.keys[i], red=tree._is_red)
+
+def check_persistent(tree):
+    assert tree.root is None or not tree.root.red
+    return check_shape(tree.root, lambda n: n is None, lambda n: n.left, lambda n: n.right,
+                       lambda n: n.key, red=lambda n: n.red)
+
+def check_avl(tree):
+    return check_shape(tree.root, lambda n: n is None, lambda n: n.left, lambda n: n.right,
+                       lambda n: n.value, height=lambda n: n.height)
+
+def check_bplus(tree):
+    tree.validate()
+    return tree.traverse()
+
+def check_bst(tree):
+    return check_shape(tree.root, lambda n: n is None, lambda n: n.left, lambda n: n.right, lambda n: n.key)
+
+# name: (factory, invariant check returning the in-order keys, keeps duplicates)
+STRUCTURES = {
+    "RedBlackTree": (RedBlackTree, check_red_black, True),
+    "RedBlackTreeReplace": (lambda: RedBlackTree(duplicates="replace"), check_red_black, False),
+    "RedBlackTreeCounted": (lambda: RedBlackTree(duplicates="counted"), check_red_black, True),
+    "OrderStatisticTree": (OrderStatisticTree, check_red_black, True),
+    "CheckedRedBlackTree": (lambda: CheckedRedBlackTree(sample_rate=0.1, seed=0), check_red_black, True),
+    "CompactRedBlackTree": (CompactRedBlackTree, check_compact, True),
+    "PersistentRedBlackTree": (PersistentRedBlackTree, check_persistent, True),
+    "AVLTree": (AVLTree, check_avl, True),
+    "BinarySearchTree": (BinarySearchTree, check_bst, True),
+    "BPlusTree": (lambda: BPlusTree(order=4), check_bplus, True),
+}
+
+# A small key range, so that repeats, hits and misses are all common.
+keys = st.integers(min_value=-40, max_value=40)
+
+class TreeMachine(RuleBasedStateMachine):
+    structure = None  # a key of STRUCTURES, set by the generated subclasses
+
+    def __init__(self):
+        super().__init__()
+        factory, self.check, self.duplicates = STRUCTURES[self.structure]
+        self.tree = factory()
+        self.oracle = []
+
+    def _contains(self, key):
+        i = bisect_left(self.oracle, key)
+        return i < len(self.oracle) and self.oracle[i] == key
+
+    @rule(key=keys)
+    def insert(self, key):
+        self.tree.insert(key)
+        if self.duplicates or not self._contains(key):
+            insort(self.oracle, key)
+
+    @rule(key=keys)
+    def delete(self, key):
+        present = self._contains(key)
+        result = self.tree.delete(key)
+        if result is not None:  # AVLTree and BinarySearchTree return nothing
+            assert result == present
+        if present:
+            del self.oracle[bisect_left(self.oracle, key)]
+
+    @rule(key=keys)
+    def search(self, key):
+        assert (self.tree.search(key) is not None) == self._contains(key)
+
+    @rule()
+    def delete_everything(self):
+        for key in list(self.oracle):
+            self.tree.delete(key)
+        self.oracle = []
+
+    @invariant()
+    def matches_oracle(self):
+        assert self.check(self.tree) == self.oracle
+        if hasattr(self.tree, "__len__"):
+            assert len(self.tree) == len(self.oracle)
+
+for _name in STRUCTURES:
+    _machine = type(f"{_name}Machine", (TreeMachine,), {"structure": _name})
+    _machine.TestCase.settings = settings(max_examples=60, stateful_step_count=60, deadline=None)
+    globals()[f"Test{_name}Properties"] = _machine.TestCase
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,21 @@
+import os
+import random
+import subprocess
+import sys
 import unittest
-from red_black_tree import RedBlackTree
+from unittest import mock
+try:
+    from .red_black_tree import DUPLICATE_POLICIES, RedBlackTree
+except ImportError:
+    from red_black_tree import DUPLICATE_POLICIES, RedBlackTree
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    from sortedcontainers import SortedDict
+except ImportError:
+    SortedDict = None
 
 class TestRedBlackTree(unittest.TestCase):
 
@@ -41,6 +57,7 @@ class TestRedBlackTree(unittest.TestCase):
 
         self.assertIsNotNone(self.tree.search(7))
         self.assertIsNotNone(self.tree.search(8))
+        self.tree.validate()
 
     def test_traversal(self):
         keys = [20, 15, 25, 10, 18, 22, 30]
@@ -52,6 +69,353 @@ class TestRedBlackTree(unittest.TestCase):
 
         self.assertEqual(traversal_result, expected_result)
 
+    def test_from_sorted(self):
+        for size in [0, 1, 2, 7, 8, 100, 1000]:
+            tree = RedBlackTree.from_sorted(range(size))
+            self.assertEqual(tree.traverse(), list(range(size)))
+            tree.validate()
+
+        tree = RedBlackTree.from_sorted(range(100))
+        tree.insert(250)
+        tree.delete(50)
+        self.assertIsNone(tree.search(50))
+        tree.validate()
+
+    def test_from_sorted_rejects_unsorted_input(self):
+        with self.assertRaises(ValueError):
+            RedBlackTree.from_sorted([3, 1, 2])
+
+    def test_from_iterable(self):
+        keys = [20, 15, 25, 10, 18, 22, 30, 15]
+        tree = RedBlackTree.from_iterable(keys)
+        self.assertEqual(tree.traverse(), sorted(keys))
+        tree.validate()
+
+    def test_insert_many(self):
+        self.tree.insert_many([50, 10, 30])
+        self.tree.insert_many([40, 20, 10, 60])  # small batch, applied with finger descents
+        self.assertEqual(self.tree.traverse(), [10, 10, 20, 30, 40, 50, 60])
+        self.tree.validate()
+
+    def test_insert_many_splices_long_runs(self):
+        tree = RedBlackTree.from_sorted(range(0, 1000, 10))
+        with mock.patch.object(tree, "_insert_run", wraps=tree._insert_run) as insert_run:
+            # Keys go in by descent 18 (2 * log2(311)) at a time: the keys
+            # between the tree's, the short run in one gap and 1001-1006.
+            # The rest of the long run past the end is spliced in.
+            tree.insert_many([5, 15, 25] + list(range(501, 510)) + list(range(1001, 1200)))
+        insert_run.assert_called_once_with(list(range(1007, 1200)))
+        self.assertEqual(tree.traverse(), sorted(list(range(0, 1000, 10)) + [5, 15, 25]
+                                                 + list(range(501, 510)) + list(range(1001, 1200))))
+        self.assertEqual(len(tree), 100 + 3 + 9 + 199)
+        tree.validate()
+
+    def test_insert_many_matches_insert_for_every_policy(self):
+        rng = random.Random(3)
+        for duplicates in DUPLICATE_POLICIES:
+            with self.subTest(duplicates):
+                batched = RedBlackTree(duplicates)
+                single = RedBlackTree(duplicates)
+                for batch in range(20):
+                    # Mostly clustered keys, with repeats and keys already in
+                    # the tree, so both paths of insert_many run.
+                    low = rng.randrange(5000)
+                    keys = [rng.randrange(low, low + 300) for _ in range(rng.randrange(1, 400))]
+                    batched.insert_many(keys)
+                    for key in keys:
+                        single.insert(key)
+                    batched.validate()
+                    self.assertEqual(len(batched), len(single))
+                self.assertEqual(batched.traverse(), single.traverse())
+
+    def test_search_many_keeps_input_order(self):
+        self.tree.insert_many(range(0, 100, 5))
+        results = self.tree.search_many([95, 3, 0, 50, 51])
+        self.assertEqual([r.key if r else None for r in results], [95, None, 0, 50, None])
+
+    def test_delete_many(self):
+        keys = list(range(100))
+        self.tree.insert_many(keys)
+        self.assertEqual(self.tree.delete_many([5, 1, 1000, 99]), 3)
+        self.assertEqual(self.tree.delete_many(range(0, 100, 2)), 50)
+        self.assertEqual(self.tree.traverse(), [k for k in range(3, 99, 2) if k != 5])
+        self.tree.validate()
+
+    def test_presorted_batches_are_checked(self):
+        self.tree.insert_many(range(0, 1000, 2))
+        before = self.tree.traverse()
+        for method in (self.tree.insert_many, self.tree.delete_many, self.tree.search_many):
+            with self.subTest(method.__name__):
+                with self.assertRaises(ValueError):
+                    method([6, 2, 4], presorted=True)
+                self.assertEqual(self.tree.traverse(), before)
+        self.tree.insert_many([1, 3, 3, 5], presorted=True)
+        self.assertEqual(self.tree.delete_many([0, 3, 5], presorted=True), 3)
+        self.assertEqual([n.key for n in self.tree.search_many([1, 3], presorted=True)], [1, 3])
+        self.tree.validate()
+
+    @unittest.skipIf(numpy is None, "needs NumPy")
+    def test_numpy_batches(self):
+        self.tree.insert_many(numpy.array([50, 10, 30, 10], dtype=numpy.int64))
+        self.assertEqual(self.tree.traverse(), [10, 10, 30, 50])
+        self.assertTrue(all(type(key) is int for key in self.tree))  # unboxed by tolist()
+        results = self.tree.search_many(numpy.array([30, 7, 10, 50]))
+        self.assertEqual([r.key if r else None for r in results], [30, None, 10, 50])
+        results = self.tree.search_many(numpy.array([10, 30, 31]), presorted=True)
+        self.assertEqual([r.key if r else None for r in results], [10, 30, None])
+        self.assertEqual(self.tree.delete_many(numpy.array([50, 10, 99])), 2)
+        self.assertEqual(self.tree.traverse(), [10, 30])
+        self.tree.insert_many(numpy.arange(100, 200), presorted=True)  # spliced in
+        self.assertEqual(len(self.tree), 102)
+        self.tree.validate()
+        with self.assertRaises(ValueError):
+            self.tree.insert_many(numpy.array([3, 1]), presorted=True)
+
+    def test_iteration(self):
+        keys = [20, 15, 25, 10, 18, 22, 30]
+        for key in keys:
+            self.tree.insert(key)
+        self.assertEqual(list(self.tree), sorted(keys))
+        self.assertEqual(list(reversed(self.tree)), sorted(keys, reverse=True))
+        self.assertEqual(list(RedBlackTree()), [])
+
+    def test_irange(self):
+        self.tree.insert_many(range(0, 100, 10))
+        self.assertEqual(list(self.tree.irange(20, 50)), [20, 30, 40, 50])
+        self.assertEqual(list(self.tree.irange(20, 50, inclusive=(False, False))), [30, 40])
+        self.assertEqual(list(self.tree.irange(maximum=25, reverse=True)), [20, 10, 0])
+        self.assertEqual(list(self.tree.irange(85)), [90])
+
+        # Iteration stops as soon as the caller does.
+        page = self.tree.irange(35)
+        self.assertEqual([next(page) for _ in range(3)], [40, 50, 60])
+
+    def test_navigation(self):
+        self.tree.insert_many([10, 20, 30])
+        self.assertEqual(self.tree.floor(25), 20)
+        self.assertEqual(self.tree.floor(20), 20)
+        self.assertIsNone(self.tree.floor(5))
+        self.assertEqual(self.tree.ceiling(25), 30)
+        self.assertIsNone(self.tree.ceiling(35))
+        self.assertEqual(self.tree.successor(20), 30)
+        self.assertEqual(self.tree.predecessor(20), 10)
+        self.assertIsNone(self.tree.predecessor(10))
+        self.assertEqual(self.tree.min(), 10)
+        self.assertEqual(self.tree.max(), 30)
+        self.assertIsNone(RedBlackTree().min())
+
+    def test_mapping_interface(self):
+        tree = RedBlackTree(duplicates="replace")
+        tree[20] = "twenty"
+        tree[10] = "ten"
+        tree.insert(30, "thirty")
+        tree[10] = "TEN"
+
+        self.assertEqual(len(tree), 3)
+        self.assertEqual(tree[10], "TEN")
+        self.assertIn(30, tree)
+        self.assertEqual(tree.get(40, "missing"), "missing")
+        self.assertEqual(tree.setdefault(40, "forty"), "forty")
+        self.assertEqual(tree.setdefault(40, "other"), "forty")
+        self.assertEqual(tree.pop(20), "twenty")
+        self.assertEqual(tree.pop(20, None), None)
+        with self.assertRaises(KeyError):
+            tree[20]
+        with self.assertRaises(KeyError):
+            del tree[20]
+        del tree[40]
+
+        self.assertEqual(list(tree.keys()), [10, 30])
+        self.assertEqual(list(tree.values()), ["TEN", "thirty"])
+        self.assertEqual(list(tree.items()), [(10, "TEN"), (30, "thirty")])
+        self.assertIn((30, "thirty"), tree.items())
+
+    def test_items_contains_checks_every_copy(self):
+        tree = RedBlackTree()
+        tree[1] = "a"
+        tree.insert(1, "b")  # multiset: a second node for key 1
+        self.assertEqual(list(tree.items()), [(1, "a"), (1, "b")])
+        self.assertIn((1, "b"), tree.items())
+        self.assertIn((1, "a"), tree.items())
+        self.assertNotIn((1, "c"), tree.items())
+        self.assertNotIn((2, "a"), tree.items())
+        words = RedBlackTree(duplicates="replace")
+        words.update([("b", 0)], b=2, a=1)
+        self.assertEqual(list(words.items()), [("a", 1), ("b", 2)])
+
+    def test_update_popitem_clear(self):
+        tree = RedBlackTree(duplicates="replace")
+        tree.update({3: "c", 1: "a"})
+        tree.update([(2, "b"), (3, "C")])
+        self.assertEqual(list(tree.items()), [(1, "a"), (2, "b"), (3, "C")])
+        self.assertEqual(tree.popitem(), (3, "C"))
+        self.assertEqual(tree.popitem(0), (1, "a"))
+        tree.update([(5, "e"), (4, "d")])
+        self.assertEqual(tree.popitem(1), (4, "d"))
+        self.assertEqual(tree.popitem(-2), (2, "b"))
+        with self.assertRaises(IndexError):
+            tree.popitem(5)
+        self.assertEqual(len(tree), 1)
+        tree.clear()
+        self.assertEqual((len(tree), tree.traverse()), (0, []))
+        with self.assertRaises(KeyError):
+            tree.popitem()
+        tree.validate()
+
+    @unittest.skipIf(SortedDict is None, "needs sortedcontainers")
+    def test_mapping_matches_sorted_dict(self):
+        rng = random.Random(6)
+        tree = RedBlackTree(duplicates="replace")
+        reference = SortedDict()
+        for step in range(2000):
+            key = rng.randrange(50)
+            action = rng.random()
+            if action < 0.5:
+                tree[key] = reference[key] = step
+            elif action < 0.7:
+                self.assertEqual(tree.pop(key, None), reference.pop(key, None))
+            elif action < 0.8:
+                self.assertEqual(tree.setdefault(key, step), reference.setdefault(key, step))
+            elif action < 0.9 and reference:
+                index = rng.randrange(-len(reference), len(reference))
+                self.assertEqual(tree.popitem(index), reference.popitem(index))
+            else:
+                self.assertEqual(tree.get(key), reference.get(key))
+        self.assertEqual(list(tree.items()), list(reference.items()))
+        tree.validate()
+
+    def test_duplicate_policies(self):
+        multiset = RedBlackTree()
+        replace = RedBlackTree(duplicates="replace")
+        for tree in (multiset, replace):
+            tree.insert_many([5, 5, 3])
+            tree.insert(5)
+        self.assertEqual(multiset.traverse(), [3, 5, 5, 5])
+        self.assertEqual(replace.traverse(), [3, 5])
+        with self.assertRaises(ValueError):
+            RedBlackTree(duplicates="ignore")
+
+    def test_counted_duplicates(self):
+        tree = RedBlackTree(duplicates="counted")
+        for key in [5, 3, 5, 8, 5, 3]:
+            tree.insert(key)
+        tree.validate()
+        self.assertEqual(len(tree), 6)
+        self.assertEqual(sum(1 for _ in tree._nodes()), 3)  # one node per distinct key
+        self.assertEqual(tree.traverse(), [3, 3, 5, 5, 5, 8])
+        self.assertEqual(list(reversed(tree)), [8, 5, 5, 5, 3, 3])
+        self.assertEqual(list(tree.irange(4, 8, (True, False))), [5, 5, 5])
+        self.assertEqual(list(tree.irange(3, 5, reverse=True)), [5, 5, 5, 3, 3])
+        self.assertEqual((tree.count(5), tree.count(3), tree.count(4)), (3, 2, 0))
+
+        self.assertTrue(tree.remove_one(5))
+        self.assertTrue(tree.delete(5))
+        self.assertEqual(tree.count(5), 1)
+        self.assertEqual(tree.remove_all(3), 2)
+        self.assertEqual(tree.remove_all(3), 0)
+        self.assertFalse(tree.remove_one(3))
+        tree.validate()
+        self.assertEqual((tree.traverse(), len(tree)), ([5, 8], 2))
+
+        # Batches and rebuilds carry the counts along.
+        tree.insert_many([8, 8, 1])
+        tree.insert_many([2] * 50)
+        self.assertEqual((tree.count(2), tree.count(8), len(tree)), (50, 3, 55))
+        self.assertEqual(tree.delete_many([2] * 10 + [8]), 11)
+        self.assertEqual(tree.delete_many([2] * 60), 40)
+        self.assertEqual(tree.copy().traverse(), [1, 5, 8, 8])
+        tree.validate()
+        tree = RedBlackTree.from_iterable([4, 1, 4, 4], duplicates="counted")
+        self.assertEqual((tree.count(4), len(tree), tree.traverse()), (3, 4, [1, 4, 4, 4]))
+
+        # The mapping interface acts on the key as a whole.
+        tree[4] = "four"
+        self.assertEqual((tree.count(4), tree[4]), (3, "four"))
+        self.assertEqual(list(tree.items())[-1], (4, "four"))
+        self.assertEqual(tree.pop(4), "four")
+        self.assertEqual((tree.traverse(), len(tree)), ([1], 1))
+
+        multiset = RedBlackTree.from_iterable([2, 1, 2, 2])
+        self.assertEqual((multiset.count(2), multiset.remove_all(2), multiset.traverse()), (3, 3, [1]))
+        with self.assertRaises(ValueError):
+            RedBlackTree(duplicates="counted").dump(os.devnull)
+
+    def test_from_sorted_with_values(self):
+        tree = RedBlackTree.from_iterable([3, 1, 2], ["c", "a", "b"])
+        self.assertEqual(list(tree.items()), [(1, "a"), (2, "b"), (3, "c")])
+
+    def test_split(self):
+        keys = list(range(0, 200, 2))
+        tree = RedBlackTree.from_iterable(keys)
+        left, right = tree.split(51)
+        left.validate()
+        right.validate()
+        self.assertEqual(left.traverse(), list(range(0, 51, 2)))
+        self.assertEqual(right.traverse(), list(range(52, 200, 2)))
+        self.assertEqual((len(left), len(right), len(tree)), (26, 74, 0))
+        right.insert(53)
+        right.delete(52)
+        right.validate()
+
+    def test_join(self):
+        left = RedBlackTree.from_iterable(range(10))
+        right = RedBlackTree.from_iterable(range(11, 1000))
+        tree = RedBlackTree.join(left, 10, right, "ten")
+        tree.validate()
+        self.assertEqual(tree.traverse(), list(range(1000)))
+        self.assertEqual(tree[10], "ten")
+        self.assertEqual(len(left), 0)
+        with self.assertRaises(ValueError):
+            RedBlackTree.join(RedBlackTree.from_iterable([5]), 3, RedBlackTree())
+
+    def test_set_operations(self):
+        a_keys = list(range(0, 300, 2))
+        b_keys = list(range(0, 300, 3))
+        for duplicates in ("multiset", "replace", "counted"):
+            def make(keys, tag):
+                return RedBlackTree.from_iterable(keys, [tag] * len(keys), duplicates=duplicates)
+
+            union, intersection, difference = make(a_keys, "a"), make(a_keys, "a"), make(a_keys, "a")
+            other = make(b_keys, "b")
+            union.union_update(other)
+            self.assertEqual(len(other), 0)  # consumed
+            intersection.intersection_update(make(b_keys, "b"))
+            difference.difference_update(make(b_keys, "b"))
+            for tree in (union, intersection, difference):
+                tree.validate()  # also checks that len() is exact
+            if duplicates != "replace":
+                self.assertEqual(union.traverse(), sorted(a_keys + b_keys))
+            else:
+                self.assertEqual(union.traverse(), sorted(set(a_keys) | set(b_keys)))
+                self.assertEqual(union[6], "b")
+            self.assertEqual(intersection.traverse(), list(range(0, 300, 6)))
+            self.assertEqual(set(intersection.values()), {"a"})
+            self.assertEqual(difference.traverse(), [k for k in a_keys if k % 3])
+
+    def test_split_and_set_operations_keep_len_exact(self):
+        rng = random.Random(4)
+        for duplicates in ("multiset", "replace", "counted"):
+            for _ in range(30):
+                a_keys = [rng.randrange(60) for _ in range(rng.randrange(80))]
+                b_keys = [rng.randrange(60) for _ in range(rng.randrange(80))]
+                make = lambda keys: RedBlackTree.from_iterable(keys, duplicates=duplicates)
+                for operation in ("union_update", "intersection_update", "difference_update"):
+                    a, b = make(a_keys), make(b_keys)
+                    getattr(a, operation)(b)
+                    self.assertEqual(len(a), len(a.traverse()), (duplicates, operation))
+                    self.assertEqual(len(b), 0)
+                left, right = make(a_keys).split(rng.randrange(60))
+                left.validate()
+                right.validate()
+                self.assertEqual(len(left) + len(right), len(make(a_keys)))
+
+    def test_import_has_no_plotting_dependencies(self):
+        # A fresh interpreter, so modules imported by other tests don't count.
+        src = os.path.dirname(os.path.abspath(__file__))
+        code = "import sys, red_black_tree; print(sorted(m for m in ('networkx', 'matplotlib') if m in sys.modules))"
+        output = subprocess.run([sys.executable, "-c", code], cwd=src, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
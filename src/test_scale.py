@@ -0,0 +1,148 @@
+# Scale tests: a million sorted and random keys through every tree, checking
+# that nothing recurses (no RecursionError at any depth) and that the height
+# stays within the structure's bound. They take a few minutes, so they only
+# run with RBT_SCALE_TESTS=1 (RBT_SCALE_SIZE overrides the key count).
+import math
+import os
+import random
+import unittest
+try:
+    from .red_black_tree import RedBlackTree
+    from .order_statistic_tree import OrderStatisticTree
+    from .compact_red_black_tree import CompactRedBlackTree, NIL
+    from .persistent_red_black_tree import PersistentRedBlackTree
+    from .avl import AVLTree
+    from .bst import BinarySearchTree
+    from .bplus_tree import BPlusTree
+except ImportError:
+    from red_black_tree import RedBlackTree
+    from order_statistic_tree import OrderStatisticTree
+    from compact_red_black_tree import CompactRedBlackTree, NIL
+    from persistent_red_black_tree import PersistentRedBlackTree
+    from avl import AVLTree
+    from bst import BinarySearchTree
+    from bplus_tree import BPlusTree
+
+SIZE = int(os.environ.get("RBT_SCALE_SIZE", 1_000_000))
+
+# Height in nodes, by breadth-first levels so it never recurses either.
+def height(root, children):
+    level = [root] if root is not None else []
+    levels = 0
+    while level:
+        levels += 1
+        level = [child for node in level for child in children(node) if child is not None]
+    return levels
+
+def rbt_children(tree):
+    nil = tree.NIL
+    return lambda node: [c for c in (node.left, node.right) if c is not nil]
+
+@unittest.skipUnless(os.environ.get("RBT_SCALE_TESTS"), "set RBT_SCALE_TESTS=1 to run the 1M-key tests")
+class TestScale(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sorted_keys = list(range(SIZE))
+        cls.random_keys = random.Random(0).sample(range(SIZE * 10), SIZE)
+
+    def inputs(self):
+        return [("sorted", self.sorted_keys), ("random", self.random_keys)]
+
+    def check_red_black(self, tree, keys):
+        self.assertEqual(len(tree), len(keys))
+        tree.validate()
+        self.assertEqual(tree.traverse(), sorted(keys))
+        self.assertLessEqual(height(tree.root, rbt_children(tree)), 2 * math.log2(len(keys) + 1))
+
+    def test_red_black_tree(self):
+        for name, keys in self.inputs():
+            with self.subTest(name):
+                tree = RedBlackTree()
+                for key in keys:
+                    tree.insert(key)
+                self.check_red_black(tree, keys)
+                for key in keys[::2]:
+                    tree.delete(key)
+                self.check_red_black(tree, keys[1::2])
+
+    def test_order_statistic_tree(self):
+        for name, keys in self.inputs():
+            with self.subTest(name):
+                tree = OrderStatisticTree()
+                for key in keys:
+                    tree.insert(key)
+                self.check_red_black(tree, keys)
+                self.assertEqual(tree.select(len(keys) // 2), sorted(keys)[len(keys) // 2])
+
+    def test_compact_red_black_tree(self):
+        for name, keys in self.inputs():
+            with self.subTest(name):
+                tree = CompactRedBlackTree()
+                for key in keys:
+                    tree.insert(key)
+                self.assertEqual(len(tree), len(keys))
+                root = tree.root if tree.root != NIL else None
+                children = lambda i: [c for c in (tree.left[i], tree.right[i]) if c != NIL]
+                self.assertLessEqual(height(root, children), 2 * math.log2(len(keys) + 1))
+
+    def test_persistent_red_black_tree(self):
+        for name, keys in self.inputs():
+            with self.subTest(name):
+                tree = PersistentRedBlackTree()
+                for key in keys:
+                    tree.insert(key)
+                self.assertEqual(len(tree), len(keys))
+                self.assertLessEqual(height(tree.root, lambda n: (n.left, n.right)), 2 * math.log2(len(keys) + 1))
+
+    def test_avl_tree(self):
+        for name, keys in self.inputs():
+            with self.subTest(name):
+                tree = AVLTree()
+                for key in keys:
+                    tree.insert(key)
+                self.assertEqual(len(tree.traverse()), len(keys))
+                self.assertLessEqual(height(tree.root, lambda n: (n.left, n.right)), 1.45 * math.log2(len(keys) + 2))
+                for key in keys[::2]:
+                    tree.delete(key)
+                self.assertEqual(tree.traverse(), sorted(keys[1::2]))
+
+    def test_bplus_tree(self):
+        for name, keys in self.inputs():
+            with self.subTest(name):
+                tree = BPlusTree()
+                for key in keys:
+                    tree.insert(key)
+                self.assertEqual(len(tree), len(keys))
+                # Non-root nodes have at least order/2 + 1 children (leaves
+                # order/2 keys), so the height is at most 1 + log_33(n / 32) + 1.
+                self.assertEqual(tree.validate(), tree.height())
+                self.assertLessEqual(tree.height(), 2 + math.log(len(keys) / tree.minimum, tree.minimum + 1))
+                for key in keys[::2]:
+                    tree.delete(key)
+                tree.validate()
+                self.assertEqual(tree.traverse(), sorted(keys[1::2]))
+
+    def test_binary_search_tree(self):
+        # Random keys only: expected height is about 4.3 ln n (60 for 1M).
+        # Sorted keys degenerate into a list and cost O(n^2) to insert, so
+        # that case runs at a size that is still far past the recursion limit.
+        tree = BinarySearchTree()
+        for key in self.random_keys:
+            tree.insert(key)
+        self.assertEqual(tree.traverse(), sorted(self.random_keys))
+        self.assertLessEqual(height(tree.root, lambda n: (n.left, n.right)), 6 * math.log(SIZE + 1))
+
+        tree = BinarySearchTree()
+        keys = range(5_000)
+        for key in keys:
+            tree.insert(key)
+        self.assertEqual(height(tree.root, lambda n: (n.left, n.right)), len(keys))
+        self.assertEqual(tree.traverse(), list(keys))
+        for key in keys:
+            tree.delete(key)
+        self.assertIsNone(tree.root)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
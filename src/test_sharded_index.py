@@ -0,0 +1,82 @@
+import random
+import unittest
+try:
+    from .sharded_index import ShardedIndex
+except ImportError:
+    from sharded_index import ShardedIndex
+
+class TestShardedIndex(unittest.TestCase):
+
+    def test_batches_match_a_sorted_list(self):
+        rng = random.Random(1)
+        with ShardedIndex(workers=3, boundaries=[300, 600], rebalance_skew=None) as index:
+            keys = [rng.randrange(900) for _ in range(2000)]
+            index.insert_many(keys)
+            expected = sorted(keys)
+            self.assertEqual(len(index), len(expected))
+            self.assertEqual(sum(index.shard_sizes()), len(expected))
+            self.assertTrue(all(size > 0 for size in index.shard_sizes()))
+
+            gone = [rng.randrange(900) for _ in range(500)]
+            removed = 0
+            for key in gone:
+                if key in expected:
+                    expected.remove(key)
+                    removed += 1
+            self.assertEqual(index.delete_many(gone), removed)
+            self.assertEqual(index.traverse(), expected)
+
+            probes = [rng.randrange(-10, 910) for _ in range(300)]
+            self.assertEqual(index.search_many(probes), [k if k in expected else None for k in probes])
+
+            index.insert(-5)
+            self.assertEqual(index.search(-5), -5)
+            self.assertTrue(index.delete(-5))
+            self.assertFalse(index.delete(-5))
+            self.assertNotIn(-5, index)
+
+    def test_range_scans_cross_shards(self):
+        with ShardedIndex(workers=4, boundaries=[10, 10, 20], rebalance_skew=None) as index:
+            keys = [k for k in range(30) for _ in range(3)]  # every key three times
+            index.insert_many(keys)
+            for minimum, maximum in [(None, None), (5, 25), (10, 20), (9, 10), (20, 20), (15, 3)]:
+                for inclusive in [(True, True), (False, False), (True, False)]:
+                    expected = [k for k in keys
+                                if (minimum is None or (k >= minimum if inclusive[0] else k > minimum))
+                                and (maximum is None or (k <= maximum if inclusive[1] else k < maximum))]
+                    for page_size in [1, 2, 4, 100]:
+                        scan = list(index.irange(minimum, maximum, inclusive, page_size=page_size))
+                        self.assertEqual(scan, expected, (minimum, maximum, inclusive, page_size))
+
+    def test_skewed_ingest_is_rebalanced(self):
+        with ShardedIndex(workers=3, min_rebalance_size=300) as index:
+            batches = [list(range(start, start + 100)) for start in range(0, 3000, 100)]
+            for batch in batches:
+                index.insert_many(batch)
+            self.assertGreater(index.rebalances, 0)
+            self.assertEqual(len(index.boundaries), 2)
+            self.assertLessEqual(max(index.shard_sizes()), 2 * len(index) / 3)
+            self.assertEqual(index.traverse(), list(range(3000)))
+            self.assertEqual(index.search_many([0, 1500, 2999, 3000]), [0, 1500, 2999, None])
+
+            index.rebalance()
+            sizes = index.shard_sizes()
+            self.assertLessEqual(max(sizes) - min(sizes), 1)
+            self.assertEqual(index.traverse(), list(range(3000)))
+
+    def test_errors_come_back_to_the_caller(self):
+        with ShardedIndex(workers=2, rebalance_skew=None) as index:
+            index.insert_many([1, 2, 3])
+            with self.assertRaises(TypeError):
+                index.search_many(["a"])  # raised in the worker, comparing "a" < 2
+            self.assertEqual(index.search_many([1, 2, 3]), [1, 2, 3])
+
+    def test_bad_boundaries(self):
+        with self.assertRaises(ValueError):
+            ShardedIndex(workers=2, boundaries=[1, 2])
+        with self.assertRaises(ValueError):
+            ShardedIndex(workers=3, boundaries=[2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
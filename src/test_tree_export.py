@@ -0,0 +1,75 @@
+import io
+import json
+import unittest
+try:
+    from .red_black_tree import RedBlackTree
+    from .order_statistic_tree import OrderStatisticTree
+    from .avl import AVLTree
+    from .tree_export import walk, write_dot, write_json
+except ImportError:
+    from red_black_tree import RedBlackTree
+    from order_statistic_tree import OrderStatisticTree
+    from avl import AVLTree
+    from tree_export import walk, write_dot, write_json
+
+class TestTreeExport(unittest.TestCase):
+
+    def test_layout_is_in_order(self):
+        tree = RedBlackTree.from_iterable(range(100))
+        rows = list(walk(tree))
+        self.assertEqual([row[1].key for row in rows], list(range(100)))
+        self.assertEqual([row[3] for row in rows], list(range(100)))  # x = in-order position
+        self.assertEqual(len({row[0] for row in rows}), 100)
+
+    def test_duplicate_keys_stay_separate(self):
+        tree = RedBlackTree()
+        for key in [5, 5, 5]:
+            tree.insert(key)
+        data = json.loads(self._export(write_json, tree))
+        self.assertEqual([node["key"] for node in data["nodes"]], [5, 5, 5])
+        self.assertEqual(len({node["id"] for node in data["nodes"]}), 3)
+
+    def test_depth_limit_marks_hidden_subtrees(self):
+        tree = OrderStatisticTree.from_sorted(range(1000))
+        data = json.loads(self._export(write_json, tree, max_depth=2))
+        nodes = [node for node in data["nodes"] if not node.get("more")]
+        markers = [node for node in data["nodes"] if node.get("more")]
+        self.assertEqual(len(nodes), 7)
+        self.assertEqual(len(markers), 8)
+        self.assertEqual(sum(marker["hidden"] for marker in markers) + len(nodes), 1000)
+
+    def test_subtree_view(self):
+        tree = RedBlackTree.from_sorted(range(15))
+        subtree = tree.root.left
+        rows = list(walk(tree, root=subtree))
+        self.assertEqual([row[1].key for row in rows], list(range(7)))
+        self.assertEqual(min(row[2] for row in rows), 0)
+
+    def test_dot_is_deterministic(self):
+        tree = RedBlackTree()
+        for key in [20, 15, 25, 10, 5, 1]:
+            tree.insert(key)
+        dot = self._export(write_dot, tree)
+        self.assertEqual(dot, self._export(write_dot, tree))
+        self.assertEqual(dot.count("->"), 5)
+        self.assertIn('[label="20" color=black', dot)
+        self.assertTrue(dot.rstrip().endswith("}"))
+
+    def test_other_tree_types(self):
+        tree = AVLTree()
+        for key in [3, 1, 2]:
+            tree.insert(key)
+        data = json.loads(self._export(write_json, tree))
+        self.assertEqual([node["key"] for node in data["nodes"]], [1, 2, 3])
+        self.assertIsNone(data["nodes"][0]["red"])
+
+    def test_empty_tree(self):
+        self.assertEqual(json.loads(self._export(write_json, RedBlackTree())), {"nodes": []})
+
+    def _export(self, writer, tree, **kwargs):
+        out = io.StringIO()
+        writer(tree, out, **kwargs)
+        return out.getvalue()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+
+# Streaming DOT/JSON export for the pointer-based trees (RedBlackTree and its
+# subclasses, AVLTree, BinarySearchTree). Output is written line by line from
+# one iterative in-order walk, so memory stays O(height) and only the nodes
+# actually shown are visited: a depth-limited view of the top of a 1M-node
+# tree touches a few thousand nodes.
+#
+# Every view has a deterministic layout: x is the node's in-order position
+# among the nodes shown and y is its depth, so the picture has the shape of
+# the tree and the same tree always exports identically. Nodes get
+# sequential ids ("n0", "n1", ...) rather than being named after their key,
+# so equal keys in a multiset stay separate nodes.
+
+def node_key(node):
+    try:
+        return node.key
+    except AttributeError:
+        return node.value  # AVL nodes keep their key in .value
+
+# Yield (id, node, depth, x, parent_id, side, more) in order for every node
+# of the view; side is "left"/"right" (None for the view's root). Subtrees
+# below max_depth are not entered: each is yielded once as a marker, with
+# more=True and node being the subtree's root.
+def walk(tree, root=None, max_depth=None):
+    nil = getattr(tree, "NIL", None)  # RedBlackTree's sentinel, else None
+    if root is None:
+        root = tree.root
+    next_id = 0
+    x = 0
+    stack = []
+
+    def descend(node, depth, parent_id, side):
+        nonlocal next_id, x
+        while node is not nil:
+            node_id = next_id
+            next_id += 1
+            if max_depth is not None and depth > max_depth:
+                yield node_id, node, depth, x, parent_id, side, True
+                x += 1
+                return
+            stack.append((node, depth, node_id, parent_id, side))
+            node, depth, parent_id, side = node.left, depth + 1, node_id, "left"
+
+    yield from descend(root, 0, None, None)
+    while stack:
+        node, depth, node_id, parent_id, side = stack.pop()
+        yield node_id, node, depth, x, parent_id, side, False
+        x += 1
+        yield from descend(node.right, depth + 1, node_id, "right")
+
+def _open(target):
+    if hasattr(target, "write"):
+        return target, False
+    return open(target, "w"), True
+
+def _hidden_count(subtree):
+    # Only trees that track subtree sizes (OrderStatisticTree) can say how many
+    # keys are hidden without walking them.
+    return getattr(subtree, "size", None)
+
+def _dot_quote(text):
+    return '"' + str(text).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def iter_dot(tree, root=None, max_depth=None, name="tree"):
+    yield f"// {type(tree).__name__}"
+    yield f"digraph {_dot_quote(name)} {{"
+    yield "\tgraph [ordering=out]"
+    yield "\tnode [style=filled fontcolor=white]"
+    for node_id, node, depth, x, parent_id, side, more in walk(tree, root, max_depth):
+        pos = f'pos="{x * 0.75:g},{-depth:g}!"'
+        if more:
+            hidden = _hidden_count(node)
+            label = f"+{hidden}" if hidden is not None else "..."
+            yield f"\tn{node_id} [label={_dot_quote(label)} shape=plaintext style=\"\" fontcolor=gray {pos}]"
+            yield f"\tn{parent_id} -> n{node_id} [style=dashed color=gray]"
+            continue
+        red = getattr(node, "red", None)
+        color = "red" if red else "black" if red is not None else "gray30"
+        yield f"\tn{node_id} [label={_dot_quote(node_key(node))} color={color} fillcolor={color} {pos}]"
+        if parent_id is not None:
+            yield f"\tn{parent_id} -> n{node_id}"
+    yield "}"
+
+# Write a Graphviz DOT file (a path or an open text file). Render with
+# `dot -Tsvg`, or `neato -n -Tsvg` to use the exported positions as they are.
+def write_dot(tree, target, root=None, max_depth=None, name="tree"):
+    f, close = _open(target)
+    try:
+        for line in iter_dot(tree, root, max_depth, name):
+            f.write(line)
+            f.write("\n")
+    finally:
+        if close:
+            f.close()
+
+# One JSON object per node (or cut-off marker), in order:
+#   {"id", "key", "red", "depth", "x", "parent", "side"} for nodes and
+#   {"id", "more": true, "hidden", "depth", "x", "parent", "side"} for markers.
+# Keys that are not JSON types are written with str().
+def iter_json(tree, root=None, max_depth=None):
+    encode = json.JSONEncoder(default=str).encode  # json.dumps(default=) builds one per call
+    yield '{"nodes": ['
+    first = True
+    for node_id, node, depth, x, parent_id, side, more in walk(tree, root, max_depth):
+        if more:
+            record = {"id": node_id, "more": True, "hidden": _hidden_count(node),
+                      "depth": depth, "x": x, "parent": parent_id, "side": side}
+        else:
+            record = {"id": node_id, "key": node_key(node), "red": getattr(node, "red", None),
+                      "depth": depth, "x": x, "parent": parent_id, "side": side}
+        yield ("  " if first else ", ") + encode(record)
+        first = False
+    yield "]}"
+
+def write_json(tree, target, root=None, max_depth=None):
+    f, close = _open(target)
+    try:
+        for line in iter_json(tree, root, max_depth):
+            f.write(line)
+            f.write("\n")
+    finally:
+        if close:
+            f.close()
@@ -0,0 +1,43 @@
+# Optional drawing support for RedBlackTree. networkx and matplotlib are only
+# imported when a tree is actually drawn, so the core data structures never
+# depend on them (install them separately: pip install networkx matplotlib).
+try:
+    from .tree_export import walk, node_key
+except ImportError:
+    from tree_export import walk, node_key
+
+def _plotting_modules():
+    try:
+        import networkx as nx
+        import matplotlib.pyplot as plt
+    except ImportError as error:
+        raise ImportError(
+            "visualize() needs networkx and matplotlib: pip install networkx matplotlib"
+        ) from error
+    return nx, plt
+
+def visualize(tree, title="Red-Black Tree Visualization", max_depth=None, root=None):
+    nx, plt = _plotting_modules()
+    G = nx.DiGraph()
+
+    # Graph nodes are the walk's unique ids (not keys, which may repeat), placed
+    # at (in-order position, -depth) so the drawing keeps the tree's shape.
+    pos = {}
+    labels = {}
+    node_colors = []
+    for node_id, node, depth, x, parent_id, side, more in walk(tree, root, max_depth):
+        G.add_node(node_id)
+        pos[node_id] = (x, -depth)
+        if more:
+            labels[node_id] = "..."
+            node_colors.append("white")
+        else:
+            labels[node_id] = node_key(node)
+            node_colors.append("red" if getattr(node, "red", False) else "lightgray")
+        if parent_id is not None:
+            G.add_edge(parent_id, node_id)
+
+    nx.draw(G, pos, labels=labels, with_labels=True, node_size=500, nodelist=list(pos), node_color=node_colors, font_weight="bold", font_size=10)
+
+    plt.title(title)
+    plt.show()